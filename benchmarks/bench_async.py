@@ -0,0 +1,84 @@
+"""Benchmark a crawl that writes to a slow sink, blocking versus the AsyncCrawler.
+
+The sink stands in for a network filesystem or object store: every batch of soundings
+costs a fixed latency.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_async
+"""
+import asyncio
+import tempfile
+import time
+from src import olieigra
+from src.olieigra.async_callbacks import AsyncCallbacks
+
+BATCH_SIZE = 100
+LATENCY = 0.02
+
+
+class BlockingSink(olieigra.Callbacks):
+    """Write every BATCH_SIZE soundings with a blocking call"""
+
+    def __init__(self):
+        super().__init__()
+        self.vectorized = True
+        self.pending = 0
+
+    def start_file(self, filename: str) -> bool:
+        return filename.endswith('-data.txt')
+
+    def finish_file(self, headers: int, rows: int,
+                    stats: olieigra.ReadStats | None = None):
+        if self.pending:
+            time.sleep(LATENCY)
+        self.pending = 0
+
+    def parse_header(self, header: olieigra.HeaderModel) -> bool:
+        return True
+
+    def parse_body_array(self, body) -> bool:
+        self.pending += 1
+        if self.pending == BATCH_SIZE:
+            time.sleep(LATENCY)
+            self.pending = 0
+        return True
+
+
+class AwaitingSink(AsyncCallbacks):
+    """Write every batch with an awaited call"""
+
+    def __init__(self):
+        super().__init__()
+        self.vectorized = True
+
+    async def start_file(self, source: str) -> bool:
+        """Accept the Igra2 data files"""
+        return source.endswith('-data.txt')
+
+    async def finish_file(self, source: str, headers: int, rows: int):
+        """Nothing is left to write once a file is finished"""
+        return rows
+
+    async def parse_batch(self, source: str, batch: list[olieigra.Sounding]) -> bool:
+        """Write the batch, awaiting the latency of the sink"""
+        await asyncio.sleep(LATENCY)
+        return True
+
+
+if __name__ == '__main__':
+    generator = olieigra.SyntheticIgra2(stations=4)
+
+    with tempfile.TemporaryDirectory() as path:
+        generator.write_archive(f'{path}/igra2.zip')
+
+        start = time.perf_counter()
+        olieigra.Crawler(olieigra.Reader(BlockingSink())).crawl(path)
+        blocking = time.perf_counter() - start
+
+        start = time.perf_counter()
+        asyncio.run(olieigra.AsyncCrawler(AwaitingSink(), batch_size=BATCH_SIZE).crawl(path))
+        overlapped = time.perf_counter() - start
+
+    print(f"blocking sink Crawler:      {blocking:.2f}s")
+    print(f"awaiting sink AsyncCrawler: {overlapped:.2f}s ({blocking / overlapped:.1f}x)")
@@ -0,0 +1,67 @@
+"""Benchmark crawling a directory of Igra2 files as text versus from a SoundingCache, with
+vectorized callbacks that receive every body. The first cached crawl builds the caches.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_cache
+"""
+import os
+import tempfile
+import time
+from src import olieigra
+
+
+class CountingCallbacks(olieigra.Callbacks):
+    """Accept every sounding and count the levels handed over"""
+
+    def __init__(self):
+        super().__init__()
+        self.vectorized = True
+        self.levels = 0
+
+    def start_file(self, filename: str) -> bool:
+        return filename.endswith('-data.txt')
+
+    def finish_file(self, headers: int, rows: int,
+                    stats: olieigra.ReadStats | None = None):
+        pass
+
+    def parse_header(self, header: olieigra.HeaderModel) -> bool:
+        return True
+
+    def parse_body_array(self, body) -> bool:
+        self.levels += len(body)
+        return True
+
+
+def crawl(path: str, cache_dir: str | None = None) -> tuple[float, int]:
+    """Crawl a directory, returning the seconds taken and the levels read"""
+    callbacks = CountingCallbacks()
+    crawler = olieigra.Crawler(reader=olieigra.Reader(callbacks=callbacks), cache_dir=cache_dir)
+    start = time.perf_counter()
+    crawler.crawl(path)
+    return time.perf_counter() - start, callbacks.levels
+
+
+def directory_size(path: str) -> int:
+    """Bytes in the files below a directory"""
+    return sum(os.path.getsize(f'{root}/{name}')
+               for root, _, names in os.walk(path) for name in names)
+
+
+if __name__ == '__main__':
+    generator = olieigra.SyntheticIgra2(stations=4, years=2)
+
+    with tempfile.TemporaryDirectory() as data, tempfile.TemporaryDirectory() as cache:
+        generator.write_directory(data)
+        text, levels = crawl(data)
+        build, _ = crawl(data, cache)
+        cached, cached_levels = crawl(data, cache)
+        assert levels == cached_levels
+
+        print(f"{generator.stations} files, {levels:,} levels, "
+              f"{directory_size(data) / 1e6:.1f} MB text, {directory_size(cache) / 1e6:.1f} MB "
+              "cache")
+        print(f"Text:          {text:.3f} s")
+        print(f"Build cache:   {build:.3f} s")
+        print(f"From cache:    {cached:.3f} s ({text / cached:.1f}x)")
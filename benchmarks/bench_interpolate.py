@@ -0,0 +1,41 @@
+"""Benchmark interpolating soundings onto 21 levels, per sounding with np.interp (as
+sample_gph20s10k.py did) versus one olieigra.interpolate call.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_interpolate
+"""
+import io
+import time
+import numpy as np
+from src import olieigra
+
+FIELDS = ['gph', 'pres', 'temp', 'dpdp', 'wdir', 'wspd']
+
+
+def per_sounding(bodies: list[np.ndarray], levels: np.ndarray) -> list[list[float]]:
+    """Interpolate each variable of each sounding with np.interp"""
+    return [[np.interp(level, body['gph'], body[field]) for level in levels for field in FIELDS]
+            for body in bodies]
+
+
+if __name__ == '__main__':
+    generator = olieigra.SyntheticIgra2(years=3, missing_ratio=0)
+    soundings = olieigra.Reader().iter_soundings(io.BytesIO(generator.station_bytes(0)))
+    bodies = [batch_item.body for batch in olieigra.batched(soundings, 1000)
+              for batch_item in batch]
+    targets = np.linspace(200, 10000, 21)
+
+    start = time.perf_counter()
+    per_sounding(bodies, targets)
+    looped = time.perf_counter() - start
+
+    start = time.perf_counter()
+    values, counts = olieigra.pad_bodies(bodies, FIELDS)
+    olieigra.interpolate(values[:, :, 0], values, targets, counts, clamp=True)
+    vectorized = time.perf_counter() - start
+
+    print(f"{len(bodies)} soundings onto {len(targets)} levels")
+    print(f"np.interp per sounding:   {looped:.3f}s {len(bodies) / looped:,.0f} soundings/s")
+    print(f"olieigra.interpolate:     {vectorized:.3f}s {len(bodies) / vectorized:,.0f} "
+          f"soundings/s ({looped / vectorized:.0f}x)")
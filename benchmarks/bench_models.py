@@ -0,0 +1,105 @@
+"""Benchmark the memory and throughput of the body record representations.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_models
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from src import olieigra
+from src.olieigra.io_wrapper import IOWrapper
+from benchmarks.bench_reader import LEVELS, REPEAT, SOUNDINGS, sample_file
+
+
+@dataclass
+class DictBodyModel:
+    """The body model as it was before it used slots"""
+    type: str
+    pres: int
+    gph: float
+    temp: float
+    rh: float
+    dpdp: float
+    wdir: float
+    wspd: float
+
+
+class DictReader(olieigra.Reader):
+    """Reader that builds the dict based model"""
+
+    def parse_body_line(self, line) -> DictBodyModel:
+        return DictBodyModel(
+            line[0:2].decode('ascii'),
+            int(line[9:15]),
+            self.parse_float(line[16:21]),
+            self.parse_float(line[22:27]),
+            self.parse_float(line[28:33]),
+            self.parse_float(line[34:39]),
+            self.parse_float(line[40:45]),
+            self.parse_float(line[46:51])
+        )
+
+
+class KeepingCallbacks(olieigra.Callbacks):
+    """Keep every body and read the fields a typical QA pass looks at"""
+
+    def __init__(self, keep: bool):
+        super().__init__()
+        self.keep = keep
+        self.bodies = []
+        self.total = 0.0
+
+    def parse_header(self, header: olieigra.HeaderModel) -> bool:
+        return True
+
+    def parse_body(self, body) -> bool:
+        for level in body:
+            if level.type == '21':
+                self.total += level.gph
+            self.total += level.temp
+
+        if self.keep:
+            self.bodies.append(body)
+        return True
+
+
+def measure(filename: str, factory, keep: bool) -> tuple[float, int]:
+    """Best wall time and peak traced memory of reading the file"""
+    best = float('inf')
+    peak = 0
+    wrapper = IOWrapper()
+
+    for _ in range(REPEAT):
+        reader = factory(KeepingCallbacks(keep))
+        stream = wrapper.open_binary_file(filename)
+        if keep:
+            tracemalloc.start()
+        start = time.perf_counter()
+        reader.read_from_stream(stream)
+        best = min(best, time.perf_counter() - start)
+        if keep:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        stream.close()
+
+    return best, peak
+
+
+if __name__ == '__main__':
+    levels = SOUNDINGS * LEVELS
+    with tempfile.NamedTemporaryFile('w', suffix='-data.txt', delete=False) as file:
+        file.write(sample_file())
+
+    for name, factory in [
+            ('dataclass      ', lambda c: DictReader(callbacks=c)),
+            ('slots dataclass', lambda c: olieigra.Reader(callbacks=c)),
+            ('lazy           ', lambda c: olieigra.Reader(callbacks=c, lazy=True))]:
+        elapsed, _ = measure(file.name, factory, False)
+        _, peak = measure(file.name, factory, True)
+        print(f"{name}: {levels / elapsed:,.0f} levels/s, "
+              f"{peak / levels:,.0f} bytes/level retained")
+
+    os.remove(file.name)
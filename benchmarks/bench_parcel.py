@@ -0,0 +1,58 @@
+"""Benchmark the surface parcel lifted index, per sounding with MetPy parcel_profile and
+lifted_index (as experiments/liftedindex_lr/11_calculate_li.ipynb does) versus batched
+olieigra.parcel_profile and lifted_index. MetPy is timed on the first METPY_SOUNDINGS.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_parcel
+"""
+import io
+import time
+import warnings
+import numpy as np
+from metpy.calc import lifted_index, parcel_profile
+from metpy.units import units
+from src import olieigra
+
+METPY_SOUNDINGS = 200
+
+
+def metpy_lifted_index(pres: np.ndarray, temp: np.ndarray, dew: np.ndarray,
+                       counts: np.ndarray) -> np.ndarray:
+    """Lifted index of each sounding with MetPy"""
+    result = []
+
+    for i, count in enumerate(counts):
+        p = pres[i, :count] * units.hPa
+        t = temp[i, :count] * units.degC
+        profile = parcel_profile(p, t[0], dew[i, 0] * units.degC)
+        result.append(lifted_index(p, t, profile).m[0])
+
+    return np.array(result)
+
+
+if __name__ == '__main__':
+    warnings.simplefilter('ignore')
+    generator = olieigra.SyntheticIgra2(years=3, missing_ratio=0.02)
+    soundings = olieigra.Reader().iter_soundings(io.BytesIO(generator.station_bytes(0)))
+    bodies = [item.body for batch in olieigra.batched(soundings, 1000) for item in batch]
+
+    start = time.perf_counter()
+    derived = olieigra.derive(np.concatenate(bodies))
+    lengths = [len(body) for body in bodies]
+    pres, temp, dew, counts = olieigra.drop_missing(
+        *(olieigra.pad_ragged(derived[name], lengths) for name in ['pres', 'temp', 'dewpoint']))
+    profile = olieigra.parcel_profile(pres, temp, dew, counts)
+    lifted = olieigra.lifted_index(pres, temp, profile, counts)
+    vectorized = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = metpy_lifted_index(pres, temp, dew, counts[:METPY_SOUNDINGS])
+    looped = time.perf_counter() - start
+    difference = np.nanmax(np.abs(expected - lifted[:METPY_SOUNDINGS]))
+
+    print(f"{len(bodies)} soundings of {generator.levels} levels")
+    print(f"MetPy per sounding:  {METPY_SOUNDINGS / looped:,.0f} soundings/s")
+    print(f"olieigra batched:    {len(bodies) / vectorized:,.0f} soundings/s "
+          f"({looped / METPY_SOUNDINGS * len(bodies) / vectorized:.0f}x)")
+    print(f"Largest lifted index difference: {difference:.2e} K")
@@ -0,0 +1,44 @@
+"""Benchmark crawling a zip archive with and without a read-ahead thread.
+
+The gain depends on a second core being free to inflate while the main thread parses.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_prefetch
+"""
+import os
+import tempfile
+import time
+from src import olieigra
+from benchmarks.suite import CountingCallbacks
+
+REPEAT = 3
+
+
+def measure(path: str, vectorized: bool, depth: int) -> float:
+    """Best wall time of crawling the archives of a folder"""
+    best = float('inf')
+
+    for _ in range(REPEAT):
+        crawler = olieigra.Crawler(olieigra.Reader(CountingCallbacks(vectorized)),
+                                   prefetch_depth=depth)
+        start = time.perf_counter()
+        crawler.crawl(path)
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+if __name__ == '__main__':
+    generator = olieigra.SyntheticIgra2(stations=4)
+    print(f"{os.cpu_count()} cpus")
+
+    with tempfile.TemporaryDirectory() as folder:
+        generator.write_archive(f'{folder}/igra2.zip')
+        megabytes = len(generator.station_bytes(0)) * generator.stations / 1e6
+
+        for vectorized in [False, True]:
+            mode = 'vectorized' if vectorized else 'list      '
+            for depth in [0, 4]:
+                elapsed = measure(folder, vectorized, depth)
+                print(f"{mode} prefetch_depth={depth}: {megabytes / elapsed:8.1f} MB/s")
@@ -0,0 +1,95 @@
+"""Benchmark the Reader body parsing modes against a generated Igra2 file.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_reader
+"""
+import os
+import tempfile
+import time
+from src import olieigra
+from src.olieigra.io_wrapper import IOWrapper
+from src.olieigra.synthetic import SyntheticIgra2
+
+LEVELS = 100
+GENERATOR = SyntheticIgra2(years=3, levels=LEVELS)
+SOUNDINGS = GENERATOR.soundings()
+REPEAT = 3
+
+
+class CountingCallbacks(olieigra.Callbacks):
+    """Accept every sounding and count the decoded levels"""
+
+    def __init__(self, vectorized: bool):
+        super().__init__()
+        self.vectorized = vectorized
+        self.levels = 0
+
+    def parse_header(self, header: olieigra.HeaderModel) -> bool:
+        return True
+
+    def parse_body(self, body: list[olieigra.BodyModel]) -> bool:
+        self.levels += len(body)
+        return True
+
+    def parse_body_array(self, body) -> bool:
+        self.levels += len(body)
+        return True
+
+
+def sample_file() -> str:
+    """Build a deterministic Igra2 file of one station"""
+    return GENERATOR.station_bytes(0).decode()
+
+
+def measure(open_stream, vectorized: bool, read=None) -> float:
+    """Best wall time of reading a stream with the given body mode"""
+    best = float('inf')
+
+    for _ in range(REPEAT):
+        reader = olieigra.Reader(callbacks=CountingCallbacks(vectorized))
+        stream = open_stream()
+        start = time.perf_counter()
+        if read is None:
+            reader.read_from_stream(stream)
+        else:
+            read(reader, stream)
+        best = min(best, time.perf_counter() - start)
+        stream.close()
+
+    return best
+
+
+if __name__ == '__main__':
+    rows = SOUNDINGS * (LEVELS + 1)
+    wrapper = IOWrapper()
+    with tempfile.NamedTemporaryFile('w', suffix='-data.txt', delete=False) as file:
+        file.write(sample_file())
+
+    sources = {
+        'text  ': lambda: wrapper.open_file(file.name),
+        'bytes ': lambda: wrapper.open_binary_file(file.name),
+        'mapped': lambda: wrapper.open_mapped_file(file.name)
+    }
+
+    for stream, source in sources.items():
+        list_time = measure(source, False)
+        array_time = measure(source, True)
+
+        print(f"{stream} parse_body (list[BodyModel]): {list_time:.3f}s "
+              f"{rows / list_time:,.0f} lines/s")
+        print(f"{stream} parse_body_array (vectorized): {array_time:.3f}s "
+              f"{rows / array_time:,.0f} lines/s")
+
+    with wrapper.open_binary_file(file.name) as stream:
+        index = olieigra.SoundingIndex.build(stream, os.path.getsize(file.name))
+    entries = index.entries[::10]
+    selected = len(entries) * (LEVELS + 1)
+
+    for stream in ['bytes ', 'mapped']:
+        index_time = measure(sources[stream], True,
+                             lambda reader, stream: reader.read_from_index(stream, entries))
+        print(f"{stream} read_from_index every 10th sounding: {index_time:.3f}s "
+              f"{selected / index_time:,.0f} lines/s")
+
+    os.remove(file.name)
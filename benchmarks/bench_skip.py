@@ -0,0 +1,79 @@
+"""Benchmark how fast the Reader skips soundings rejected by parse_header.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_skip
+"""
+import os
+import tempfile
+import time
+from zipfile import ZIP_DEFLATED, ZipFile
+from src import olieigra
+from src.olieigra.io_wrapper import IOWrapper
+from benchmarks.bench_reader import sample_file
+
+REPEAT = 3
+
+
+class RejectingCallbacks(olieigra.Callbacks):
+    """Reject every sounding"""
+
+    def parse_header(self, header: olieigra.HeaderModel) -> bool:
+        return False
+
+
+class LineByLineReader(olieigra.Reader):
+    """The Reader as it skipped before bulk skipping"""
+
+    def skip_body(self, reader, records: int):
+        for _ in range(records):
+            reader.readline()
+
+
+def measure(reader_class, open_stream) -> float:
+    """Best wall time of skipping every sounding of a stream"""
+    best = float('inf')
+
+    for _ in range(REPEAT):
+        reader = reader_class(callbacks=RejectingCallbacks())
+        stream = open_stream()
+        start = time.perf_counter()
+        reader.read_from_stream(stream)
+        best = min(best, time.perf_counter() - start)
+        stream.close()
+
+    return best
+
+
+if __name__ == '__main__':
+    io = IOWrapper()
+    data = sample_file()
+
+    with tempfile.TemporaryDirectory() as path:
+        with open(f'{path}/a-data.txt', 'w', encoding='UTF-8') as file:
+            file.write(data)
+        with ZipFile(f'{path}/a.zip', 'w', ZIP_DEFLATED) as archive:
+            archive.writestr('a-data.txt', data)
+        zip_file = ZipFile(f'{path}/a.zip')
+
+        sources = {
+            'text file': lambda: io.open_file(f'{path}/a-data.txt'),
+            'binary file': lambda: io.open_binary_file(f'{path}/a-data.txt'),
+            'zip member': lambda: io.read_as_text(io.open_archive_file(zip_file, 'a-data.txt')),
+            'binary zip': lambda: io.open_buffered(io.open_archive_file(zip_file, 'a-data.txt'))
+        }
+        megabytes = os.path.getsize(f'{path}/a-data.txt') / 1e6
+
+        for name, source in sources.items():
+            before = measure(LineByLineReader, source)
+            after = measure(olieigra.Reader, source)
+            print(f"{name:12s} line by line {megabytes / before:8.0f} MB/s  "
+                  f"bulk {megabytes / after:8.0f} MB/s  ({before / after:.1f}x)")
+
+        start = time.perf_counter()
+        with zip_file.open('a-data.txt') as member:
+            while member.read(1 << 20):
+                pass
+        print(f"{'inflate only':12s} {megabytes / (time.perf_counter() - start):8.0f} MB/s")
+
+        zip_file.close()
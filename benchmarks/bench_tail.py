@@ -0,0 +1,70 @@
+"""Benchmark the daily refresh of an append-only station file: reading it in full versus
+an incremental Crawler that only reads the soundings appended since its last run.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_tail
+"""
+import os
+import tempfile
+import time
+from src import olieigra
+
+
+class CountingCallbacks(olieigra.Callbacks):
+    """Accept every sounding and count the soundings handed over"""
+
+    def __init__(self):
+        super().__init__()
+        self.vectorized = True
+        self.soundings = 0
+
+    def start_file(self, filename: str) -> bool:
+        return filename.endswith('-data.txt')
+
+    def finish_file(self, headers: int, rows: int,
+                    stats: olieigra.ReadStats | None = None):
+        pass
+
+    def parse_header(self, header: olieigra.HeaderModel) -> bool:
+        return True
+
+    def parse_body_array(self, body) -> bool:
+        self.soundings += 1
+        return True
+
+
+def refresh(path: str, manifest: olieigra.CrawlManifest | None) -> tuple[float, int]:
+    """Crawl the directory, returning the seconds taken and the soundings read"""
+    callbacks = CountingCallbacks()
+    crawler = olieigra.Crawler(reader=olieigra.Reader(callbacks=callbacks), manifest=manifest,
+                               incremental=manifest is not None)
+    start = time.perf_counter()
+    crawler.crawl(path)
+    return time.perf_counter() - start, callbacks.soundings
+
+
+if __name__ == '__main__':
+    generator = olieigra.SyntheticIgra2(years=10)
+    data = generator.station_bytes(0)
+    cut = len(data) - len(data) // (365 * 10)
+    cut = data.index(b'#', cut)
+
+    with tempfile.TemporaryDirectory() as path:
+        os.mkdir(f'{path}/data')
+        filename = f'{path}/data/{generator.filenames()[0]}'
+        manifest = olieigra.CrawlManifest(f'{path}/manifest.jsonl')
+
+        with open(filename, 'wb') as file:
+            file.write(data[:cut])
+        refresh(f'{path}/data', manifest)
+
+        with open(filename, 'ab') as file:
+            file.write(data[cut:])
+        full, full_soundings = refresh(f'{path}/data', None)
+        tail, tail_soundings = refresh(f'{path}/data', manifest)
+
+    print(f"{len(data) / 1e6:.1f} MB station file, {len(data) - cut:,} bytes appended")
+    print(f"Full read:    {full:.3f} s, {full_soundings:,} soundings")
+    print(f"Tail only:    {tail * 1000:.1f} ms, {tail_soundings:,} soundings "
+          f"({full / tail:.0f}x)")
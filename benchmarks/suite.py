@@ -0,0 +1,180 @@
+"""Benchmark suite for the Reader and Crawler on synthetic Igra2 data.
+
+Every stage reports its throughput and the peak memory traced while it runs. Results are
+saved as JSON, and can be compared against a saved baseline to catch a regression before
+a release:
+
+    python -m benchmarks.suite
+    python -m benchmarks.suite --baseline benchmarks/results/baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from zipfile import ZipFile
+from src import olieigra
+from src.olieigra.io_wrapper import IOWrapper
+from src.olieigra.synthetic import SyntheticIgra2
+
+RESULTS_PATH = 'benchmarks/results'
+
+
+class CountingCallbacks(olieigra.Callbacks):
+    """Accept or reject every sounding and count the decoded levels"""
+
+    def __init__(self, vectorized: bool = False, accept: bool = True):
+        super().__init__()
+        self.vectorized = vectorized
+        self.accept = accept
+        self.levels = 0
+
+    def start_file(self, filename: str) -> bool:
+        return filename.endswith('-data.txt')
+
+    def finish_file(self, headers: int, rows: int,
+                    stats: olieigra.ReadStats | None = None):
+        return rows
+
+    def parse_header(self, header: olieigra.HeaderModel) -> bool:
+        return self.accept
+
+    def parse_body(self, body: list[olieigra.BodyModel]) -> bool:
+        self.levels += len(body)
+        return True
+
+    def parse_body_array(self, body) -> bool:
+        self.levels += len(body)
+        return True
+
+
+def measure(run, repeat: int) -> tuple[float, int]:
+    """Best wall time of run over repeat tries, then its peak traced memory in one more"""
+    best = float('inf')
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return best, peak
+
+
+def read_file(filename: str, callbacks: olieigra.Callbacks):
+    """Read a plain Igra2 file as a binary stream"""
+    with IOWrapper().open_binary_file(filename) as stream:
+        olieigra.Reader(callbacks=callbacks).read_from_stream(stream)
+
+
+def inflate(archive_filename: str):
+    """Decompress every member of an archive without parsing"""
+    with ZipFile(archive_filename) as archive:
+        for info in archive.filelist:
+            with archive.open(info) as member:
+                while member.read(1 << 20):
+                    pass
+
+
+def run_suite(generator: SyntheticIgra2, repeat: int) -> dict:
+    """Run every stage against the generated data"""
+    results = {}
+
+    with tempfile.TemporaryDirectory() as path:
+        os.makedirs(f'{path}/archives')
+        generator.write_directory(path)
+        generator.write_archive(f'{path}/archives/igra2.zip')
+        filename = f'{path}/{generator.filenames()[0]}'
+        megabytes = os.path.getsize(filename) / 1e6
+        soundings = generator.soundings()
+        lines = soundings * (generator.levels + 1)
+        archive_megabytes = megabytes * generator.stations
+
+        def stage(name: str, run, amount: float, unit: str):
+            seconds, peak = measure(run, repeat)
+            results[name] = {'seconds': seconds, 'rate': amount / seconds, 'unit': unit,
+                             'peak_bytes': peak}
+
+        stage('parse_list', lambda: read_file(filename, CountingCallbacks()), lines, 'lines/s')
+        stage('parse_vectorized', lambda: read_file(filename, CountingCallbacks(True)), lines,
+              'lines/s')
+        stage('skip', lambda: read_file(filename, CountingCallbacks(accept=False)), megabytes,
+              'MB/s')
+        stage('inflate', lambda: inflate(f'{path}/archives/igra2.zip'), archive_megabytes,
+              'MB/s')
+        stage('dispatch_single', lambda: read_file(filename, olieigra.MultiCallbacks(
+            [CountingCallbacks(True)])), soundings, 'soundings/s')
+        stage('dispatch_multi', lambda: read_file(filename, olieigra.MultiCallbacks(
+            [CountingCallbacks(True) for _ in range(3)])), soundings, 'soundings/s')
+        stage('crawl', lambda: olieigra.Crawler(olieigra.Reader(CountingCallbacks(True))).crawl(
+            f'{path}/archives'), 1, 'archives/s')
+
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """List the stages whose rate fell by more than tolerance against the baseline"""
+    regressions = []
+
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]['rate']
+        if result['rate'] < before * (1 - tolerance):
+            regressions.append(f"{name}: {result['rate']:,.1f} {result['unit']} "
+                               f"(baseline {before:,.1f}, {result['rate'] / before - 1:+.0%})")
+
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the suite, save the results and compare them against a baseline"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--stations', type=int, default=4)
+    parser.add_argument('--years', type=int, default=1)
+    parser.add_argument('--levels', type=int, default=100)
+    parser.add_argument('--missing-ratio', type=float, default=0.1)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='where to save the results')
+    parser.add_argument('--baseline', help='results to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='allowed drop of a rate against the baseline')
+    args = parser.parse_args(argv)
+
+    generator = SyntheticIgra2(stations=args.stations, years=args.years, levels=args.levels,
+                               missing_ratio=args.missing_ratio)
+    results = run_suite(generator, args.repeat)
+
+    for name, result in results.items():
+        print(f"{name:16s} {result['rate']:14,.1f} {result['unit']:12s} "
+              f"peak {result['peak_bytes'] / 1e6:8.1f} MB")
+
+    output = args.output or f"{RESULTS_PATH}/{datetime.now():%Y%m%d-%H%M%S}.json"
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='UTF-8') as file:
+        json.dump({'python': sys.version, 'platform': platform.platform(),
+                   'generator': vars(generator), 'results': results}, file, indent=2)
+    print(f"Saved {output}")
+
+    if args.baseline is None:
+        return 0
+
+    with open(args.baseline, 'r', encoding='UTF-8') as file:
+        regressions = compare(results, json.load(file)['results'], args.tolerance)
+
+    for regression in regressions:
+        print(f"Regression {regression}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
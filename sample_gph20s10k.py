@@ -2,7 +2,7 @@
 import io
 import math
 import os
-from datetime import datetime
+from datetime import date, datetime
 from dataclasses import dataclass
 import numpy as np
 import olieigra
@@ -14,7 +14,7 @@ DST_PATH = 'C:/Users/oliev/Downloads/silver'
 @dataclass
 class WriterState():
     """Keep track of running state"""
-    filtered: int
+    accepted: int
     rejected: int
     hout: str
     filepath: str
@@ -25,9 +25,8 @@ class WriterState():
 class GphTwentySurfaceToTenK(olieigra.Callbacks):
     """Contain the callback states"""
 
-    def __init__(self, min_effective_date: datetime):
+    def __init__(self):
         super().__init__()
-        self.min_effective_date = min_effective_date
         self.state = WriterState(0, 0, "", "", None, [])
         self.attr = ['gph','pres','temp','dp','u','v']
 
@@ -60,25 +59,26 @@ class GphTwentySurfaceToTenK(olieigra.Callbacks):
 
         return True
 
-    def finish_file(self, headers: int, rows: int):
+    def finish_file(self, headers: int, rows: int, stats: olieigra.ReadStats | None = None):
         """Callback for when processing is complete"""
         self.state.writer.close()
 
         dst_renamed = self.state.filepath.replace('.partial.csv', '.csv')
         os.rename(self.state.filepath, dst_renamed)
 
-        loaded = headers - self.state.filtered - self.state.rejected
+        # Headers rejected by the reader's header filter never reach parse_header
+        filtered = headers - self.state.accepted
+        loaded = self.state.accepted - self.state.rejected
 
-        print(f" Read {headers} headers, {rows} lines. Filtered {self.state.filtered}. " +
+        print(f" Read {headers} headers, {rows} lines. Filtered {filtered}. " +
               f"Rejected {self.state.rejected}. Wrote {loaded} records.")
+        if stats is not None:
+            print(f" {stats}")
 
     def parse_header(self, header: olieigra.HeaderModel):
         """Write the header portion of the line"""
         effective_date = datetime(header.year, header.month, header.day)
-
-        if effective_date < self.min_effective_date:
-            self.state.filtered += 1
-            return False
+        self.state.accepted += 1
 
         day_num = -math.cos(math.radians(effective_date.timetuple().tm_yday))
         self.state.hout = f'{header.id},{effective_date:%Y-%m-%d},{header.hour},{day_num:.2f}'
@@ -103,58 +103,33 @@ class GphTwentySurfaceToTenK(olieigra.Callbacks):
         out = ','.join([f"{item:.1f}" for item in pivoted])
         self.state.writer.write(f'{self.state.hout},{out}\n')
 
-    def filter_body(self, body: list[olieigra.BodyModel]) -> list[list[float]]:
+    def filter_body(self, body: list[olieigra.BodyModel]) -> list[np.ndarray]:
         """Filter out bad data"""
-        result = [[], [], [], [], [], []]
-        usable_count = 0
-        surface_nan = 1
-        last_gph = -1
-
-        for item in body:
-            if last_gph >= 10000:
-                break
-
-            if item.type[0] == '3':
-                continue
+        array = olieigra.to_body_array(body)
+        usable = ~np.char.startswith(array['type'], '3')
+        for name in ['dpdp', 'rh', 'temp', 'wdir', 'wspd', 'gph']:
+            usable &= ~np.isnan(array[name])
 
-            if math.isnan(item.dpdp) | math.isnan(item.rh) | math.isnan(item.temp) | \
-                    math.isnan(item.wdir) | math.isnan(item.wspd) | math.isnan(item.gph):
-                continue
+        array = array[usable]
+        top = np.flatnonzero(array['gph'] >= 10000)
 
-            result.append(self.transform_body(item, result))
-
-            if item.type == '21':
-                surface_nan = 0
-
-            last_gph = item.gph
-            usable_count += 1
-
-        if usable_count >= 20 and surface_nan == 0 and last_gph >= 10000:
-            return result
-        else:
+        if len(top) == 0 or top[0] < 19 or '21' not in array['type'][:top[0] + 1]:
             return []
 
-    def transform_body(self, item: olieigra.BodyModel, agg: list[list[float]]):
-        """Transform the body"""
-        wrad = math.radians(item.wdir)
-
-        agg[0].append(item.gph)
-        agg[1].append(item.pres / 100.0)
-        agg[2].append(item.temp / 10.0)
-        agg[3].append((item.temp - item.dpdp) / 10.0)
-        agg[4].append(-item.wspd * math.sin(wrad) / 10.0)
-        agg[5].append(-item.wspd * math.cos(wrad) / 10.0)
+        derived = olieigra.derive(array[:top[0] + 1])
+        return [derived[name] for name in ['gph', 'pres', 'temp', 'dewpoint', 'u', 'v']]
 
-    def body_pivot(self, body: list[list[float]]) -> list[float]:
+    def body_pivot(self, body: list[np.ndarray]) -> list[float]:
         """Pivot and interpolate the levels"""
-        return [np.interp(level, body[0], x)
-                for level in self.state.levels
-                for x in [body[0], body[1], body[2], body[3], body[4], body[5]]]
+        values = np.array(body).T[np.newaxis]
+        return olieigra.interpolate(values[:, :, 0], values, self.state.levels,
+                                    clamp=True)[0].ravel().tolist()
 
 
 if __name__ == '__main__':
-    callbacks = GphTwentySurfaceToTenK(datetime(2000, 1, 1))
-    reader = olieigra.Reader(callbacks=callbacks)
+    callbacks = GphTwentySurfaceToTenK()
+    header_filter = olieigra.SoundingFilter(start=date(2000, 1, 1))
+    reader = olieigra.Reader(callbacks=callbacks, header_filter=header_filter)
     crawler = olieigra.Crawler(reader=reader)
 
     crawler.crawl(SRC_PATH)
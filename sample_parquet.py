@@ -0,0 +1,25 @@
+"""CLI for converting Igra2 archives into a partitioned Parquet dataset"""
+import olieigra
+
+SRC_PATH = 'C:/Users/oliev/Downloads'
+DST_PATH = 'C:/Users/oliev/Downloads/silver/parquet'
+
+
+class RecentSoundings(olieigra.ArrowCallbacks):
+    """Only keep soundings from 2000 onwards"""
+
+    def accept_header(self, header: olieigra.HeaderModel) -> bool:
+        """Skip the record if it is too old"""
+        return header.year >= 2000 and header.numlev > 0
+
+
+if __name__ == '__main__':
+    # Set up for processing
+    sink = olieigra.ParquetSink(DST_PATH)
+    callbacks = RecentSoundings(sink, batch_size=5000)
+    reader = olieigra.Reader(callbacks=callbacks)
+    crawler = olieigra.Crawler(reader=reader)
+
+    # Crawl and write headers/levels to DST_PATH/headers and DST_PATH/levels
+    crawler.crawl(SRC_PATH)
+    sink.close()
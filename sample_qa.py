@@ -1,24 +1,19 @@
 """CLI for performing qa analysis on Igra2 files"""
-import math
 import os
-from datetime import datetime
+from datetime import date, datetime
 import olieigra
 
 
-class QualityAnalysis(olieigra.Callbacks):
+class QualityAnalysis(olieigra.QualityCallbacks):
     """Contain the callback states"""
 
-    def __init__(self, dst_path: str, min_effective_date: datetime):
+    def __init__(self, dst_path: str):
         super().__init__()
-        self.min_effective_date = min_effective_date
         self.dst_path = dst_path
-        self.filename = ""
-        self.filtered = 0
-        self.writer = None
+        self.dst_filename = ""
 
-    def start_file(self, filename: str) -> bool:
-        """Decide if we want to process the file. If so, reset state and start writing to a
-        temporary file."""
+    def accept_file(self, filename: str) -> bool:
+        """Decide if we want to process the file"""
 
         # An IGRA2 file should end with -data.txt
         if not filename.endswith('-data.txt'):
@@ -27,94 +22,39 @@ class QualityAnalysis(olieigra.Callbacks):
 
         # Set the desired destination filename
         dst_filename = f'{self.dst_path}/{filename}'
-        dst_filename = dst_filename.replace("-data.txt", "-data-qa.csv")
+        self.dst_filename = dst_filename.replace("-data.txt", "-data-qa.csv")
 
         # Skip this file if it has already been processed
-        if os.path.exists(dst_filename):
+        if os.path.exists(self.dst_filename):
             print(f'Skipping {filename}. Destination file already exists.')
             return False
 
         # If we got here, we are going to process the file
         print(f'Processing {filename}.')
-
-        # Write to a temp file
-        self.filename = dst_filename.replace('-data-qa.csv', '-data-qa.partial.csv')
-        self.writer = open(self.filename, 'w', encoding='UTF-8')
-
-        # Reset the filtered record count
-        self.filtered = 0
-
-        # Write the header row
-        self.writer.write('id,effective_date,hour,has_surface,usable_count\n')
-
-        # Tell olieigra to continue processing
         return True
 
-    def finish_file(self, headers: int, rows: int):
-        """File processing is complete. Clean up and provide user feedback."""
+    def finish_file(self, headers: int, rows: int, stats: olieigra.ReadStats | None = None):
+        """File processing is complete. The quality metrics of every sounding are in
+        self.soundings, write them out."""
+        super().finish_file(headers, rows, stats)
 
-        # Close the temporary file
-        self.writer.close()
+        # Write to a temp file
+        partial = self.dst_filename.replace('-data-qa.csv', '-data-qa.partial.csv')
+        with open(partial, 'w', encoding='UTF-8') as writer:
+            # Write the header row
+            writer.write('id,effective_date,hour,has_surface,usable_count\n')
+
+            # A usable record is a pressure level below 10km without NaN values. The
+            # has_surface column is 0 when a usable surface record was found.
+            columns = ['id', 'year', 'month', 'day', 'hour', 'usable_surface', 'usable_low']
+            for station, year, month, day, hour, surface, usable_count in \
+                    zip(*(self.soundings[name].tolist() for name in columns)):
+                effective_date = datetime(year, month, day)
+                writer.write(f'{station.decode()},{effective_date:%Y-%m-%d},{hour},'
+                             f'{int(not surface)},{usable_count}\n')
 
         # Rename the temporary file
-        dst_renamed = self.filename.replace('.partial.csv', '.csv')
-        os.rename(self.filename, dst_renamed)
-
-        # Calculate the number of records written
-        loaded = headers - self.filtered
-
-        # Provide feedback to the user
-        print(f" Read {headers} headers, {rows} lines. Filtered {self.filtered}. " +
-              f"Wrote {loaded} records.")
-
-    def parse_header(self, header: olieigra.HeaderModel) -> bool:
-        """Transform the header record and start writing a record"""
-
-        # Combine the separate fields into a date
-        effective_date = datetime(header.year, header.month, header.day)
-
-        # Skip the record if it is too old
-        if effective_date < self.min_effective_date:
-            self.filtered += 1
-            return False
-
-        # Start writing a line to the temp file
-        self.writer.write(f'{header.id},{effective_date:%Y-%m-%d},{header.hour},')
-
-        # Tell olieigra to process the body associated with this header
-        return True
-
-    def parse_body(self, body: list[olieigra.BodyModel]):
-        """Perform some analytics and finish writing a record"""
-
-        # Initialize
-        usable_count = 0
-        surface_nan = 1
-
-        # Iterate through each record in the body
-        for item in body:
-            # We don't care about non-pressure records
-            if item.type[0] == '3':
-                continue
-
-            # We don't care about records higher than 10km
-            if item.gph > 10000:
-                continue
-
-            # We don't care about records that contain a NaN value
-            if math.isnan(item.dpdp) | math.isnan(item.rh) | math.isnan(item.temp) | \
-                    math.isnan(item.wdir) | math.isnan(item.wspd) | math.isnan(item.gph):
-                continue
-
-            # Flag when we find a surface record
-            if item.type == '21':
-                surface_nan = 0
-
-            # If we got here, the record is usable
-            usable_count += 1
-
-        # Finish writing the record in the temporary file
-        self.writer.write(f'{surface_nan},{usable_count}\n')
+        os.rename(partial, self.dst_filename)
 
 
 if __name__ == '__main__':
@@ -123,8 +63,9 @@ if __name__ == '__main__':
     DST_PATH = 'C:/Users/oliev/Downloads/silver'
 
     # Set up for processing
-    callbacks = QualityAnalysis(DST_PATH, datetime(2000, 1, 1))
-    reader = olieigra.Reader(callbacks=callbacks)
+    callbacks = QualityAnalysis(DST_PATH)
+    header_filter = olieigra.SoundingFilter(start=date(2000, 1, 1))
+    reader = olieigra.Reader(callbacks=callbacks, header_filter=header_filter)
     crawler = olieigra.Crawler(reader=reader)
 
     # Crawl and process files
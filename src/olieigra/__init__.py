@@ -1,6 +1,48 @@
 """Package list"""
-from .body_model import BodyModel
+import importlib
+
+from .batch_callbacks import BatchCallbacks
+from .body_decoder import BODY_DTYPE, decode_body, to_body_array, to_body_models
+from .body_model import BodyModel, LazyBodyModel
 from .callbacks import Callbacks
+from .crawl_manifest import CrawlManifest
 from .crawler import Crawler
+from .derived import DERIVED_DTYPE, derive
 from .header_model import HeaderModel
+from .indexer import Indexer
+from .interpolation import interpolate, pad_bodies, pad_ragged
+from .mapped_stream import MappedStream
+from .multi_callbacks import MultiCallbacks
+from .parallel_crawler import CrawlResult, CrawlTask, ParallelCrawler
+from .parcel import cape_cin, drop_missing, lcl, lifted_index, parcel_profile
+from .prefetch_stream import PrefetchStream
+from .quality import QUALITY_DTYPE, SOUNDING_QUALITY_DTYPE, STATION_QUALITY_DTYPE, \
+    QualityCallbacks, merge_station_quality, quality, station_quality
+from .read_stats import ReadStats
 from .reader import Reader
+from .sharded_crawler import ShardReport, ShardedCrawler, assign_shards
+from .sounding_cache import SoundingCache
+from .sounding_filter import SoundingFilter
+from .sounding_index import INDEX_DTYPE, SoundingIndex
+from .sounding_iterator import Sounding, SoundingBody, batched
+from .station_catalog import Station, StationCatalog, maidenhead_bbox, station_id
+from .synthetic import SyntheticIgra2
+from .tail_checkpoint import TailCheckpoint
+
+# Imported on first use, so the package (and the olieigra command) starts without pyarrow
+# and asyncio
+LAZY_IMPORTS = {
+    'ArrowCallbacks': 'arrow_callbacks',
+    'AsyncCallbacks': 'async_callbacks',
+    'AsyncCrawler': 'async_crawler',
+    'HEADER_SCHEMA': 'arrow_callbacks',
+    'LEVEL_SCHEMA': 'arrow_callbacks',
+    'ParquetSink': 'parquet_sink'
+}
+
+
+def __getattr__(name: str):
+    if name not in LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    return getattr(importlib.import_module(f'.{LAZY_IMPORTS[name]}', __name__), name)
@@ -0,0 +1,6 @@
+"""Run the olieigra command as python -m olieigra"""
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,93 @@
+"""Callbacks that collect Igra2 soundings into columnar pyarrow.RecordBatch objects"""
+import numpy as np
+import pyarrow as pa
+
+from .batch_callbacks import BatchCallbacks
+from .header_model import HeaderModel
+from .read_stats import ReadStats
+
+HEADER_SCHEMA = pa.schema([
+    ('id', pa.string()),
+    ('sounding', pa.int64()),
+    ('year', pa.int16()),
+    ('month', pa.int8()),
+    ('day', pa.int8()),
+    ('hour', pa.int8()),
+    ('reltime', pa.int16()),
+    ('numlev', pa.int32()),
+    ('p_src', pa.string()),
+    ('np_src', pa.string()),
+    ('lat', pa.int32()),
+    ('lon', pa.int32())
+])
+
+LEVEL_SCHEMA = pa.schema([
+    ('id', pa.string()),
+    ('sounding', pa.int64()),
+    ('type', pa.string()),
+    ('pres', pa.int32()),
+    ('gph', pa.float64()),
+    ('temp', pa.float64()),
+    ('rh', pa.float64()),
+    ('dpdp', pa.float64()),
+    ('wdir', pa.float64()),
+    ('wspd', pa.float64())
+])
+
+
+class ArrowCallbacks(BatchCallbacks):
+    """Collect headers and levels into pyarrow.RecordBatch pairs and hand them to a sink.
+
+    Header and level batches are joined by (id, sounding), where sounding is the
+    sounding_key of the header: its date, hour and release time. The key doesn't depend on
+    the file or archive a sounding came from, so soundings of different files of a station
+    (e.g. the por and y2d archives) never share a key by accident, and a sounding converted
+    twice gets the same key both times, ready to be deduplicated. A batch never spans two
+    files. Soundings without levels are left out."""
+
+    def __init__(self, sink, batch_size: int = 1000):
+        super().__init__(batch_size, min_numlev=1)
+        self.sink = sink
+
+    def finish_file(self, headers: int, rows: int, stats: ReadStats | None = None):
+        """Flush the remaining soundings of the file"""
+        print(f"Arrow callback: Read {headers} headers and {rows} rows from {self.filename}.")
+        if stats is not None:
+            print(f"Arrow callback: {stats}")
+        self.flush()
+        self.sink.flush()
+
+    def process_batch(self):
+        """Write the queued soundings to the sink as one header and one level batch"""
+        self.sink.write(self.header_batch(), self.level_batch())
+
+    def header_batch(self) -> pa.RecordBatch:
+        """Build the header batch of the queued soundings"""
+        columns = list(zip(*[(h.id, sounding_key(h), h.year, h.month, h.day, h.hour, h.reltime,
+                              h.numlev, h.p_src, h.np_src, h.lat, h.lon)
+                             for _, h in self.headers]))
+
+        return pa.RecordBatch.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(columns, HEADER_SCHEMA)],
+            schema=HEADER_SCHEMA)
+
+    def level_batch(self) -> pa.RecordBatch:
+        """Build the level batch of the queued soundings"""
+        body = np.concatenate(self.bodies)
+        counts = [len(b) for b in self.bodies]
+        ids = np.repeat([h.id for _, h in self.headers], counts)
+        soundings = np.repeat(np.array([sounding_key(h) for _, h in self.headers],
+                                       dtype=np.int64), counts)
+
+        arrays = [pa.array(ids, type=pa.string()), pa.array(soundings)]
+        arrays.extend(pa.array(body[field.name], type=field.type)
+                      for field in list(LEVEL_SCHEMA)[2:])
+
+        return pa.RecordBatch.from_arrays(arrays, schema=LEVEL_SCHEMA)
+
+
+def sounding_key(header: HeaderModel) -> int:
+    """The key of a sounding within its station, its date, hour and release time as the
+    digits YYYYMMDDHHRRRR (e.g. 20231118121101, RRRR being 9999 without a release time)"""
+    return ((header.year * 100 + header.month) * 100 + header.day) * 1000000 + \
+        header.hour * 10000 + header.reltime
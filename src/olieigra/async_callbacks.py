@@ -0,0 +1,38 @@
+"""Default callbacks of the AsyncCrawler"""
+from .header_model import HeaderModel
+from .sounding_iterator import Sounding
+
+
+class AsyncCallbacks:
+    """Default callbacks of the AsyncCrawler.
+
+    start_file, parse_batch and finish_file are coroutines run on the event loop, so they
+    can await slow sinks. accept_header runs on the parsing thread and must not block. By
+    default it accepts the soundings with at least min_numlev levels. With vectorized set,
+    batch bodies are structured arrays, otherwise list[BodyModel], as with Callbacks."""
+
+    def __init__(self):
+        self.warn_batch = False
+        self.vectorized = False
+        self.min_numlev = 0
+
+    async def start_file(self, source: str) -> bool:
+        """Decide if the passed file should be processed"""
+        print(f"Default async callback: Skipping {source}.")
+        return False
+
+    async def finish_file(self, source: str, headers: int, rows: int):
+        """The file processing is complete"""
+        print(f"Default async callback: Read {headers} headers and {rows} rows from {source}.")
+
+    def accept_header(self, header: HeaderModel) -> bool:
+        """Decide if the body should be parsed. Runs on the parsing thread."""
+        return header.numlev >= self.min_numlev
+
+    async def parse_batch(self, source: str, batch: list[Sounding]) -> bool:
+        """Process a batch of soundings of a file, with their bodies decoded"""
+        if not self.warn_batch:
+            self.warn_batch = True
+            print(f">>>Please override parse_batch<<< {source}: {len(batch)}")
+
+        return False
@@ -0,0 +1,153 @@
+"""Crawl a directory of Igra2 files and archives as an asyncio pipeline."""
+import asyncio
+import concurrent.futures
+import threading
+from typing import Iterator
+from zipfile import ZipFile
+
+from .async_callbacks import AsyncCallbacks
+from .io_wrapper import IOWrapper
+from .parallel_crawler import CrawlResult, CrawlTask, list_tasks
+from .reader import Reader
+from .sounding_filter import SoundingFilter
+from .sounding_iterator import Sounding, batched
+
+FINISHED = object()
+
+
+class AsyncCrawler:
+    """Crawl a directory of Igra2 files and archives as an asyncio pipeline.
+
+    Discovery, parsing and the callbacks are stages linked by bounded queues: files are
+    parsed on worker threads into batches of batch_size soundings, while the callbacks await
+    their sinks on the event loop. A full queue blocks the stage feeding it, so at most
+    queue_depth batches are held in memory. With several parsers, batches of different
+    files interleave, but the batches of a file stay in order and are followed by its
+    finish_file. With stations set, only the files of those stations are crawled."""
+
+    def __init__(self, callbacks: AsyncCallbacks, header_filter: SoundingFilter | None = None,
+                 io=IOWrapper(), batch_size: int = 100, queue_depth: int = 8, parsers: int = 1,
+                 stations: set[str] | None = None):
+        self.callbacks = callbacks
+        self.header_filter = header_filter
+        self.io = io
+        self.batch_size = batch_size
+        self.queue_depth = queue_depth
+        self.parsers = parsers
+        self.stations = stations
+        self.archives = {}
+        self.archive_lock = threading.Lock()
+        self.cancelled = threading.Event()
+
+    async def crawl(self, path: str) -> list[CrawlResult]:
+        """Crawl a directory, largest members first. Returns the result of finish_file for
+        each file."""
+        tasks = asyncio.Queue(self.queue_depth)
+        batches = asyncio.Queue(self.queue_depth)
+        results = []
+        self.cancelled.clear()
+
+        try:
+            async with asyncio.TaskGroup() as group:
+                group.create_task(self.discover(path, tasks))
+                for _ in range(self.parsers):
+                    group.create_task(self.parse(tasks, batches))
+                group.create_task(self.consume(batches, results))
+        finally:
+            self.cancelled.set()
+            self.close_archives()
+
+        return results
+
+    async def discover(self, path: str, tasks: asyncio.Queue):
+        """List the files and archive members and queue them for the parsers"""
+        for task in await asyncio.to_thread(list_tasks, self.io, path, self.stations):
+            await tasks.put(task)
+
+        for _ in range(self.parsers):
+            await tasks.put(FINISHED)
+
+    async def parse(self, tasks: asyncio.Queue, batches: asyncio.Queue):
+        """Parse the files the callbacks accept into batches on a worker thread"""
+        loop = asyncio.get_running_loop()
+
+        while (task := await tasks.get()) is not FINISHED:
+            if await self.callbacks.start_file(task.filename):
+                await asyncio.to_thread(self.parse_task, task, loop, batches)
+            else:
+                await batches.put(CrawlResult(task, False, None))
+
+        await batches.put(FINISHED)
+
+    async def consume(self, batches: asyncio.Queue, results: list[CrawlResult]):
+        """Hand the batches to the callbacks and finish the files"""
+        running = self.parsers
+
+        while running > 0:
+            item = await batches.get()
+
+            if item is FINISHED:
+                running -= 1
+            elif isinstance(item, CrawlResult):
+                results.append(item)
+            elif item[0] == 'batch':
+                await self.callbacks.parse_batch(item[1].filename, item[2])
+            else:
+                _, task, headers, rows = item
+                result = await self.callbacks.finish_file(task.filename, headers, rows)
+                results.append(CrawlResult(task, True, result))
+
+    def parse_task(self, task: CrawlTask, loop: asyncio.AbstractEventLoop,
+                   batches: asyncio.Queue):
+        """Read a file into batches and queue them. Runs on a worker thread."""
+        reader = Reader(header_filter=self.header_filter)
+        counts = [0, 0]
+
+        with self.open_stream(task) as stream:
+            soundings = self.accepted(reader.iter_soundings(stream, task.filename), counts)
+            for batch in batched(soundings, self.batch_size, self.callbacks.vectorized):
+                self.put(loop, batches, ('batch', task, batch))
+
+        self.put(loop, batches, ('finish', task, counts[0], counts[1]))
+
+    def accepted(self, soundings: Iterator[Sounding], counts: list[int]) -> Iterator[Sounding]:
+        """Count the headers and rows offered and keep the soundings accept_header wants"""
+        for sounding in soundings:
+            counts[0] += 1
+            counts[1] += sounding.header.numlev + 1
+            if self.callbacks.accept_header(sounding.header):
+                yield sounding
+
+    def put(self, loop: asyncio.AbstractEventLoop, batches: asyncio.Queue, item):
+        """Queue an item from a worker thread, waiting while the queue is full"""
+        future = asyncio.run_coroutine_threadsafe(batches.put(item), loop)
+
+        while True:
+            try:
+                return future.result(timeout=0.1)
+            except concurrent.futures.TimeoutError:
+                if self.cancelled.is_set():
+                    future.cancel()
+                    raise asyncio.CancelledError() from None
+
+    def open_stream(self, task: CrawlTask):
+        """Open a buffered binary stream of a plain file or an archive member"""
+        if task.archive is None:
+            return self.io.open_binary_file(f'{task.path}/{task.filename}')
+
+        return self.io.open_buffered(self.io.open_archive_file(
+            self.open_archive(f'{task.path}/{task.archive}'), task.filename))
+
+    def open_archive(self, filename: str) -> ZipFile:
+        """Open an archive once and share it between the parsers"""
+        with self.archive_lock:
+            if filename not in self.archives:
+                self.archives[filename] = self.io.open_archive(filename)
+            return self.archives[filename]
+
+    def close_archives(self):
+        """Close the archives opened by the parsers"""
+        with self.archive_lock:
+            for archive in self.archives.values():
+                archive.close()
+            self.archives = {}
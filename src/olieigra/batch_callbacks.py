@@ -0,0 +1,74 @@
+"""Callbacks that queue vectorized Igra2 soundings and process them batch_size at a time"""
+import numpy as np
+
+from .callbacks import Callbacks
+from .header_model import HeaderModel
+
+
+class BatchCallbacks(Callbacks):
+    """Queue the accepted soundings of a file as (sounding, header) pairs in headers and
+    their bodies in bodies, sounding being the position of the header in the file. Once
+    batch_size soundings are queued, and on flush, process_batch is called and the queue is
+    emptied. A batch never spans two files, as long as finish_file flushes.
+
+    Soundings with fewer than min_numlev levels are left out. Override accept_file and
+    accept_header to filter the data, and process_batch to use it."""
+
+    def __init__(self, batch_size: int = 1000, min_numlev: int = 0):
+        super().__init__()
+        self.vectorized = True
+        self.batch_size = batch_size
+        self.min_numlev = min_numlev
+        self.filename = ""
+        self.sounding = -1
+        self.headers = []
+        self.bodies = []
+
+    def accept_file(self, filename: str) -> bool:
+        """Decide if the passed file should be processed"""
+        return filename.endswith('-data.txt')
+
+    def accept_header(self, header: HeaderModel) -> bool:
+        """Decide if the sounding should be included in the output"""
+        return header.numlev >= self.min_numlev
+
+    def start_file(self, filename: str) -> bool:
+        """Reset the per-file state"""
+        if not self.accept_file(filename):
+            return False
+
+        self.filename = filename
+        self.sounding = -1
+        return True
+
+    def parse_header(self, header: HeaderModel) -> bool:
+        """Hold on to an accepted header until its body arrives"""
+        self.sounding += 1
+
+        if not self.accept_header(header):
+            return False
+
+        self.headers.append((self.sounding, header))
+        return True
+
+    def parse_body_array(self, body: np.ndarray) -> bool:
+        """Queue the body and process the batch once it is full"""
+        self.bodies.append(body)
+
+        if len(self.headers) >= self.batch_size:
+            self.flush()
+
+        return True
+
+    def flush(self):
+        """Process the queued soundings, if any, and empty the queue"""
+        if len(self.headers) == 0:
+            return
+
+        self.process_batch()
+        self.headers = []
+        self.bodies = []
+
+    def process_batch(self):
+        """Use the queued headers and bodies"""
+        print(f"Batch callback: {len(self.headers)} soundings of {self.filename}.")
@@ -0,0 +1,125 @@
+"""Vectorized decoder for Igra2 body records"""
+import numpy as np
+
+from .body_model import BodyModel
+
+BODY_LINE_LENGTH = 53
+MIN_LINE_LENGTH = 52
+MISSING_VALUES = (-8888, -9999)
+
+BODY_DTYPE = np.dtype([
+    ('type', 'U2'),
+    ('pres', np.int32),
+    ('gph', np.float64),
+    ('temp', np.float64),
+    ('rh', np.float64),
+    ('dpdp', np.float64),
+    ('wdir', np.float64),
+    ('wspd', np.float64)
+])
+
+# Fixed-width columns of pres and the float fields, each six characters wide. The first
+# character of a float field is the flag of the preceding field, so it is masked out.
+FLOAT_FIELDS = ('gph', 'temp', 'rh', 'dpdp', 'wdir', 'wspd')
+FIELD_COLUMNS = np.array([np.arange(end - 6, end) for end in (15, 21, 27, 33, 39, 45, 51)])
+FLAG_MASK = np.zeros(FIELD_COLUMNS.shape, dtype=bool)
+FLAG_MASK[1:, 0] = True
+POWERS = 10 ** np.arange(FIELD_COLUMNS.shape[1] - 1, -1, -1, dtype=np.int32)
+
+ZERO, SPACE, MINUS, NEWLINE = (ord(c) for c in "0 -\n")
+
+
+def decode_body(lines: list) -> np.ndarray:
+    """Decode a list of body lines (str or bytes) into a structured array"""
+    if len(lines) == 0:
+        return np.empty(0, dtype=BODY_DTYPE)
+
+    if isinstance(lines[0], str):
+        block = ''.join(lines).encode('ascii')
+    else:
+        block = b''.join(lines)
+
+    chars = to_char_matrix(block, len(lines))
+    if chars is None:
+        chars = pad_char_matrix(lines)
+
+    return decode_chars(chars)
+
+
+def decode_body_block(block, records: int) -> np.ndarray:
+    """Decode a contiguous block of body lines into a structured array"""
+    if records == 0:
+        return np.empty(0, dtype=BODY_DTYPE)
+
+    chars = to_char_matrix(block, records)
+    if chars is None:
+        lines = bytes(block).splitlines(keepends=True)
+        if len(lines) != records:
+            raise ValueError(f"Expected {records} body lines, found {len(lines)}")
+        chars = pad_char_matrix(lines)
+
+    return decode_chars(chars)
+
+
+def to_char_matrix(block, records: int) -> np.ndarray | None:
+    """View a block of equal length lines as a (records, width) matrix of characters.
+    Returns None when the lines are not all the same length."""
+    width, remainder = divmod(len(block), records)
+
+    if remainder != 0 or width < MIN_LINE_LENGTH:
+        return None
+
+    chars = np.frombuffer(block, dtype=np.uint8).reshape(records, width)
+    if not np.all(chars[:, -1] == NEWLINE):
+        return None
+
+    return chars
+
+
+def pad_char_matrix(lines: list) -> np.ndarray:
+    """Build a character matrix from lines of differing length, padding with NUL"""
+    encoded = [line.encode('ascii') if isinstance(line, str) else bytes(line) for line in lines]
+    width = max(BODY_LINE_LENGTH, max(len(line) for line in encoded))
+    return np.array(encoded, dtype=f'S{width}').view(np.uint8).reshape(len(encoded), width)
+
+
+def decode_chars(chars: np.ndarray) -> np.ndarray:
+    """Decode a (records, width) matrix of characters into a structured array"""
+    result = np.empty(chars.shape[0], dtype=BODY_DTYPE)
+    values = decode_integers(chars[:, FIELD_COLUMNS])
+
+    result['type'] = np.ascontiguousarray(chars[:, 0:2]).view('S2').ravel()
+    result['pres'] = values[:, 0]
+
+    values = values[:, 1:].astype(np.float64)
+    values[(values == MISSING_VALUES[0]) | (values == MISSING_VALUES[1])] = np.nan
+    for i, name in enumerate(FLOAT_FIELDS):
+        result[name] = values[:, i]
+
+    return result
+
+
+def decode_integers(fields: np.ndarray) -> np.ndarray:
+    """Decode the right aligned ASCII integers of a (records, fields, width) character array"""
+    digits = fields - ZERO
+    is_digit = (digits <= 9) & ~FLAG_MASK
+    is_minus = fields == MINUS
+
+    if not np.all(is_digit | is_minus | (fields == SPACE) | FLAG_MASK) or \
+            not np.all(is_digit[..., -1]):
+        raise ValueError("Body line contains an invalid numeric field")
+
+    values = (digits * is_digit) @ POWERS
+
+    return np.where(is_minus.any(axis=-1), -values, values)
+
+
+def to_body_models(body: np.ndarray) -> list[BodyModel]:
+    """Convert a decoded body into the list[BodyModel] handed to parse_body"""
+    return [BodyModel(*record) for record in body.tolist()]
+
+
+def to_body_array(models: list[BodyModel]) -> np.ndarray:
+    """Convert a list[BodyModel] into a structured array"""
+    return np.array([(m.type, m.pres, m.gph, m.temp, m.rh, m.dpdp, m.wdir, m.wspd)
+                     for m in models], dtype=BODY_DTYPE)
@@ -2,7 +2,7 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class BodyModel:
     """Model for an Igra2 body record"""
     type: str
@@ -13,3 +13,69 @@ class BodyModel:
     dpdp: float
     wdir: float
     wspd: float
+
+
+class LazyField:
+    """Descriptor that decodes a fixed-width field of the line on first access and keeps
+    the value in a slot of the same name prefixed with an underscore"""
+
+    def __init__(self, start: int, end: int, convert):
+        self.start = start
+        self.end = end
+        self.convert = convert
+        self.slot = None
+
+    def __set_name__(self, owner, name: str):
+        self.slot = owner.__dict__[f'_{name}']
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+
+        try:
+            return self.slot.__get__(instance, owner)
+        except AttributeError:
+            value = self.convert(instance.line[self.start:self.end])
+            self.slot.__set__(instance, value)
+            return value
+
+
+def decode_type(my_slice: str | bytes) -> str:
+    """Decode the level type"""
+    return my_slice if isinstance(my_slice, str) else my_slice.decode('ascii')
+
+
+def decode_float(my_slice: str | bytes) -> float:
+    """Parse value, returning NaN for invalid/missing data"""
+    result = int(my_slice)
+
+    if result in (-8888, -9999):
+        return float("NaN")
+
+    return float(result)
+
+
+class LazyBodyModel:
+    """Igra2 body record that keeps a reference to its line and only decodes the fields that
+    are read. It has the same attributes as BodyModel."""
+    __slots__ = ('line', '_type', '_pres', '_gph', '_temp', '_rh', '_dpdp', '_wdir', '_wspd')
+
+    def __init__(self, line: str | bytes):
+        self.line = line
+
+    type = LazyField(0, 2, decode_type)
+    pres = LazyField(9, 15, int)
+    gph = LazyField(16, 21, decode_float)
+    temp = LazyField(22, 27, decode_float)
+    rh = LazyField(28, 33, decode_float)
+    dpdp = LazyField(34, 39, decode_float)
+    wdir = LazyField(40, 45, decode_float)
+    wspd = LazyField(46, 51, decode_float)
+
+    def to_model(self) -> BodyModel:
+        """Decode every field into a BodyModel"""
+        return BodyModel(self.type, self.pres, self.gph, self.temp, self.rh, self.dpdp,
+                         self.wdir, self.wspd)
+
+    def __repr__(self) -> str:
+        return f'Lazy{self.to_model()!r}'
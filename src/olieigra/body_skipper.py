@@ -0,0 +1,70 @@
+"""Skip Igra2 body lines in bulk instead of reading them one at a time"""
+import io
+
+from .body_decoder import BODY_LINE_LENGTH
+
+CHUNK_SIZE = 1 << 16
+
+
+def seek_lines(stream, records: int, line_length: int = BODY_LINE_LENGTH) -> bool:
+    """Jump past records fixed-width lines of a seekable binary stream. Returns False, leaving
+    the stream where it was, if the stream can't seek or the lines aren't line_length long.
+    The jump has to land on a newline followed by the next header (or the end), since with
+    longer lines (e.g. CRLF ones) a newline inside the body can sit at the same position.
+    Text streams are left alone: TextIOWrapper.tell costs more than reading a typical body."""
+    if not is_seekable_binary(stream):
+        return False
+
+    start = stream.tell()
+    end = start + records * line_length
+    stream.seek(end - 1)
+
+    if stream.read(2) in (b'\n#', b'\n'):
+        stream.seek(end)
+        return True
+
+    stream.seek(start)
+    return False
+
+
+def is_seekable_binary(stream) -> bool:
+    """Check if a stream is binary and seekable"""
+    seekable = getattr(stream, 'seekable', None)
+    return seekable is not None and not isinstance(stream, io.TextIOBase) and seekable()
+
+
+def count_lines(stream, records: int) -> bool:
+    """Skip records lines of a buffered binary stream by counting newlines in the buffered
+    chunks. Returns False if the stream can't peek."""
+    peek = getattr(stream, 'peek', None)
+    if peek is None:
+        return False
+
+    remaining = records
+    while remaining > 0:
+        chunk = peek(CHUNK_SIZE)
+        if len(chunk) == 0:
+            break
+
+        count = chunk.count(b'\n')
+        if count < remaining:
+            stream.read(len(chunk))
+            remaining -= count
+        else:
+            stream.read(nth_newline(chunk, remaining) + 1)
+            remaining = 0
+
+    return True
+
+
+def nth_newline(chunk: bytes, n: int) -> int:
+    """Position of the nth newline in a chunk that holds at least n newlines"""
+    guess = n * BODY_LINE_LENGTH - 1
+    if guess < len(chunk) and chunk[guess] == 10 and chunk.count(b'\n', 0, guess) == n - 1:
+        return guess
+
+    position = -1
+    for _ in range(n):
+        position = chunk.index(b'\n', position + 1)
+
+    return position
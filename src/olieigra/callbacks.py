@@ -1,6 +1,9 @@
 """Default callback implementation"""
+import numpy as np
+
 from .body_model import BodyModel
 from .header_model import HeaderModel
+from .read_stats import ReadStats
 
 
 class Callbacks:
@@ -8,15 +11,20 @@ class Callbacks:
 
     def __init__(self):
         self.warn_body = False
+        self.vectorized = False
+        self.wants_stats = False
 
     def start_file(self, filename: str) -> bool:
         """Decide if the passed file should be processed"""
         print(f"Default callback: Skipping {filename}.")
         return False
 
-    def finish_file(self, headers: int, rows: int):
-        """The file processing is complete"""
+    def finish_file(self, headers: int, rows: int, stats: ReadStats | None = None):
+        """The file processing is complete. stats is passed by an instrumented Crawler when
+        wants_stats is set."""
         print(f"Default callback: Read {headers} headers and {rows} rows.")
+        if stats is not None:
+            print(f"Default callback: {stats}")
 
     def parse_header(self, header: HeaderModel) -> bool:
         """Decide if the body should be parsed"""
@@ -31,3 +39,12 @@ class Callbacks:
             print(len(body))
 
         return False
+
+    def parse_body_array(self, body: np.ndarray) -> bool:
+        """Process the body records as a structured array (when vectorized is set)"""
+        if not self.warn_body:
+            self.warn_body = True
+            print(">>>Please override parse_body_array<<< ", end="")
+            print(len(body))
+
+        return False
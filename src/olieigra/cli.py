@@ -0,0 +1,225 @@
+"""The olieigra command: convert, index and measure a directory of Igra2 files and archives.
+
+Only NumPy and the core modules are imported at startup. pyarrow is imported by convert,
+when it creates its callbacks."""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from functools import partial
+
+import numpy as np
+
+from .callbacks import Callbacks
+from .crawler import Crawler
+from .indexer import Indexer
+from .io_wrapper import IOWrapper
+from .parallel_crawler import ARCHIVE_CACHE, CrawlResult, CrawlTask, ParallelCrawler, list_tasks
+from .quality import MAX_HEIGHT, STATION_QUALITY_DTYPE, QualityCallbacks, \
+    merge_station_quality, station_quality
+from .read_stats import ReadStats
+from .reader import Reader
+from .sharded_crawler import ShardedCrawler, assign_shards
+from .sounding_filter import SoundingFilter
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the olieigra command with the arguments of the command line (or argv)"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if not 0 <= args.shard_index < args.shard_count:
+        parser.error(f"--shard-index must be below --shard-count ({args.shard_count})")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    # index builds the indexes of its shard with a pool of its own, the crawling commands
+    # don't combine a pool with shards
+    if args.workers > 1 and args.command is not index_command and \
+            (args.shard_count > 1 or args.lock_dir or args.report):
+        parser.error("--workers can't be combined with --shard-count, --lock-dir or --report, "
+                     "start a process per shard instead")
+
+    return args.command(args)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """The parser of the olieigra command and its subcommands"""
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('src', help="directory of Igra2 files and zip archives")
+    common.add_argument('--stations', type=station_list,
+                        help="comma separated station ids to process (default: all)")
+    common.add_argument('--workers', type=int, default=1,
+                        help="worker processes (default: 1)")
+    common.add_argument('--shard-index', type=int, default=0,
+                        help="shard of the files this process handles (default: 0)")
+    common.add_argument('--shard-count', type=int, default=1,
+                        help="shards the files are split into (default: 1)")
+
+    job = argparse.ArgumentParser(add_help=False, parents=[common])
+    job.add_argument('dst', help="output directory")
+    job.add_argument('--start', type=date.fromisoformat,
+                     help="first date of the soundings to process, e.g. 2000-01-01")
+    job.add_argument('--end', type=date.fromisoformat,
+                     help="date after the last sounding to process")
+    job.add_argument('--lock-dir',
+                     help="shared directory of task locks, to steal the work of slow shards")
+    job.add_argument('--report', help="save the shard report as JSON to this file")
+
+    parser = argparse.ArgumentParser(prog='olieigra',
+                                     description=__doc__.split('\n', maxsplit=1)[0])
+    commands = parser.add_subparsers(required=True, metavar='command')
+
+    convert = commands.add_parser('convert', parents=[job],
+                                  help="convert to a Parquet dataset partitioned by station")
+    convert.add_argument('--batch-size', type=int, default=1000,
+                         help="soundings per record batch (default: 1000)")
+    convert.set_defaults(command=convert_command)
+
+    index = commands.add_parser('index', parents=[common],
+                                help="build the sidecar sounding indexes")
+    index.set_defaults(command=index_command)
+
+    stats = commands.add_parser('stats', parents=[job],
+                                help="write the quality metrics of every sounding and station")
+    stats.add_argument('--max-height', type=float, default=MAX_HEIGHT,
+                       help=f"top of the levels counted as low, m (default: {MAX_HEIGHT})")
+    stats.set_defaults(command=stats_command)
+
+    return parser
+
+
+def station_list(value: str) -> set[str]:
+    """Parse a comma separated list of station ids"""
+    return {station.strip() for station in value.split(',') if station.strip()}
+
+
+def convert_command(args: argparse.Namespace) -> int:
+    """Convert the Igra2 files to a Parquet dataset"""
+    crawl(args, partial(convert_callbacks, args.dst, args.batch_size))
+    return 0
+
+
+def convert_callbacks(dst: str, batch_size: int) -> Callbacks:
+    """ArrowCallbacks writing into a ParquetSink, importing pyarrow on first use"""
+    # pylint: disable=import-outside-toplevel
+    from .arrow_callbacks import ArrowCallbacks
+    from .parquet_sink import ParquetSink
+
+    return ArrowCallbacks(ParquetSink(dst), batch_size)
+
+
+def index_command(args: argparse.Namespace) -> int:
+    """Build the sidecar index of every Igra2 file and archive member of the shard"""
+    tasks = list_tasks(IOWrapper(), args.src, args.stations)
+    shards = assign_shards(tasks, args.shard_count)
+    tasks = [task for task, shard in zip(tasks, shards) if shard == args.shard_index]
+
+    if args.workers > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            built = sum(executor.map(index_task, tasks))
+    else:
+        built = sum(map(index_task, tasks))
+        ARCHIVE_CACHE.close()
+
+    print(f"Built {built} indexes for {len(tasks)} files.")
+    return 0
+
+
+def index_task(task: CrawlTask) -> int:
+    """Index one task unless its index is up to date. Returns the number of indexes built."""
+    indexer = Indexer()
+
+    if task.archive is None:
+        return indexer.index_file(task.path, task.filename) \
+            if task.filename.endswith('-data.txt') else 0
+
+    archive_path = f'{task.path}/{task.archive}'
+    archive = ARCHIVE_CACHE.open(indexer.io, archive_path)
+    return indexer.index_member(archive_path, archive, archive.getinfo(task.filename))
+
+
+def stats_command(args: argparse.Namespace) -> int:
+    """Write the quality metrics of every sounding, one CSV file per Igra2 file, and the
+    summary of every station, one row per station across its files. A station whose files
+    are split across shards gets a row in the table of each shard."""
+    os.makedirs(args.dst, exist_ok=True)
+    stations = [np.empty(0, dtype=STATION_QUALITY_DTYPE)]
+    callbacks = crawl(args, partial(StatsCallbacks, args.dst, args.max_height),
+                      lambda result: stations.append(result.result), instrument=True)
+
+    if callbacks is not None:
+        stations.append(callbacks.stations)
+
+    name = 'stations' if args.shard_count == 1 else f'stations-{args.shard_index}'
+    write_csv(f'{args.dst}/{name}.csv', merge_station_quality(
+        np.concatenate([s for s in stations if s is not None])))
+    return 0
+
+
+class StatsCallbacks(QualityCallbacks):
+    """QualityCallbacks writing the table of every file to {dst}/{station}-quality.csv, or
+    {dst}/{archive}.{station}-quality.csv for a member of {archive}.zip, so the same station
+    in two archives gets two tables. The archive comes from the ReadStats of an
+    instrumented Crawler. finish_file returns the station summary of the file."""
+
+    def __init__(self, dst: str, max_height: float = MAX_HEIGHT):
+        super().__init__(max_height=max_height)
+        self.wants_stats = True
+        self.dst = dst
+
+    def finish_file(self, headers: int, rows: int, stats: ReadStats | None = None
+                    ) -> np.ndarray:
+        """Write the quality table of the file"""
+        super().finish_file(headers, rows, stats)
+        name = self.filename.replace('-data.txt', '-quality.csv')
+        if stats is not None and stats.archive is not None:
+            name = f'{os.path.splitext(os.path.basename(stats.archive))[0]}.{name}'
+        write_csv(f'{self.dst}/{name}', self.soundings)
+
+        return station_quality(self.soundings)
+
+
+def crawl(args: argparse.Namespace, callbacks_factory, reduce=None,
+          instrument: bool = False) -> Callbacks | None:
+    """Crawl the src directory with the callbacks of the factory: across a pool of workers,
+    handing every CrawlResult to reduce, or as one shard in this process. With instrument
+    set, the crawlers collect the ReadStats of every file. Returns the callbacks of this
+    process, None for a pool."""
+    header_filter = None if args.start is None and args.end is None else \
+        SoundingFilter(start=args.start, end=args.end)
+    reader_factory = partial(Reader, header_filter=header_filter)
+
+    if args.workers > 1:
+        crawler = ParallelCrawler(callbacks_factory, args.workers, reader_factory,
+                                  instrument=instrument, stations=args.stations)
+        results: list[CrawlResult] = crawler.crawl(args.src, reduce)
+        print(f"Processed {sum(result.processed for result in results)} of "
+              f"{len(results)} files.")
+        return None
+
+    callbacks = callbacks_factory()
+    crawler = Crawler(reader=reader_factory(callbacks), instrument=instrument,
+                      stations=args.stations)
+    report = ShardedCrawler(crawler, args.shard_index, args.shard_count,
+                            args.lock_dir).crawl(args.src)
+
+    if args.report is not None:
+        report.save(args.report)
+
+    summary = report.summary()
+    print(f"Processed {summary['processed']} of {summary['tasks']} files in "
+          f"{summary['seconds']:.1f} s.")
+    return callbacks
+
+
+def write_csv(filename: str, table: np.ndarray):
+    """Write a structured array as CSV, replacing the file in one step"""
+    temporary = f'{filename}.partial'
+
+    with open(temporary, 'w', encoding='UTF-8') as file:
+        file.write(','.join(table.dtype.names) + '\n')
+        for row in table.tolist():
+            file.write(','.join(value.decode() if isinstance(value, bytes) else str(value)
+                                for value in row) + '\n')
+
+    os.replace(temporary, filename)
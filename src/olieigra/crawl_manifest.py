@@ -0,0 +1,88 @@
+"""Journal of crawled files, so a re-crawl can skip unchanged files and resume"""
+import json
+import os
+from dataclasses import asdict
+
+from .tail_checkpoint import TailCheckpoint
+
+STARTED = 'started'
+DONE = 'done'
+
+
+class CrawlManifest:
+    """Journal of crawled files, so a re-crawl can skip unchanged files and resume.
+
+    Every file is recorded with its size, CRC, modification time and status. Records are
+    appended as JSON lines when a file is started and when its consumer finishes, so an
+    interrupted crawl keeps everything it completed. The last record of a key wins. Keep
+    one manifest per consumer.
+
+    A finished file can carry the TailCheckpoint of where its processing stopped. It is
+    kept when the file is started again, until the next finish replaces it."""
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.entries = {}
+
+        if os.path.exists(filename):
+            self.load()
+
+    def load(self):
+        """Replay the journal. A line cut short by an interruption is ignored."""
+        with open(self.filename, 'r', encoding='UTF-8') as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self.entries[entry['key']] = entry
+
+    def is_done(self, key: str, size: int, crc: int, mtime) -> bool:
+        """Check if a file was finished and has not changed since"""
+        entry = self.entries.get(key)
+
+        return entry is not None and entry['status'] == DONE and entry['size'] == size and \
+            entry['crc'] == crc and entry['mtime'] == mtime
+
+    def tail(self, key: str) -> TailCheckpoint | None:
+        """The checkpoint a file was last finished at, if any"""
+        entry = self.entries.get(key)
+
+        if entry is None or entry.get('tail') is None:
+            return None
+
+        return TailCheckpoint(**entry['tail'])
+
+    def start(self, key: str, size: int, crc: int, mtime):
+        """Record that a file is being processed"""
+        entry = {'key': key, 'size': size, 'crc': crc, 'mtime': mtime, 'status': STARTED}
+        tail = self.entries.get(key, {}).get('tail')
+        if tail is not None:
+            entry['tail'] = tail
+
+        self.record(entry)
+
+    def finish(self, key: str, size: int, crc: int, mtime, tail: TailCheckpoint | None = None):
+        """Record that the consumer finished a file, up to tail if given"""
+        entry = {'key': key, 'size': size, 'crc': crc, 'mtime': mtime, 'status': DONE}
+        if tail is not None:
+            entry['tail'] = asdict(tail)
+
+        self.record(entry)
+
+    def record(self, entry: dict):
+        """Append a record to the journal"""
+        self.entries[entry['key']] = entry
+
+        with open(self.filename, 'a', encoding='UTF-8') as file:
+            file.write(json.dumps(entry) + '\n')
+
+    def compact(self):
+        """Rewrite the journal with only the last record of every key"""
+        partial = f'{self.filename}.partial'
+
+        with open(partial, 'w', encoding='UTF-8') as file:
+            for entry in self.entries.values():
+                file.write(json.dumps(entry) + '\n')
+
+        os.replace(partial, self.filename)
@@ -1,55 +1,357 @@
 """Crawl a directory to search for Igra2 files within archives and process them."""
-from zipfile import ZipFile
+import time
+from datetime import datetime
+from typing import Callable, Iterator
+from zipfile import ZipFile, ZipInfo
 
+from .crawl_manifest import CrawlManifest
 from .io_wrapper import IOWrapper
+from .read_stats import ReadStats, TimedStream
 from .reader import Reader
+from .sounding_cache import SoundingCache, cache_path
+from .sounding_index import SoundingIndex, index_filename, is_sidecar
+from .sounding_iterator import Sounding
+from .station_catalog import in_selection
+from .tail_checkpoint import TailCheckpoint
 
 
 class Crawler:
-    """Crawl a directory to search for Igra2 files within archives and process them."""
+    """Crawl a directory to search for Igra2 files within archives and process them.
+
+    With a manifest, files and archive members the consumer already finished are skipped
+    as long as their size, CRC and modification time are unchanged. An archive whose
+    members were all visited is skipped without being opened. Only a crawl without stations
+    visits them all, so only such a crawl marks an archive as done.
+
+    With instrument set, a ReadStats is kept for every file in file_stats and summed per
+    archive in archive_stats. Callbacks with wants_stats set get it from finish_file.
+
+    With mapped set, plain files are read in place through a memory map. Archive members
+    are always streamed. Page faults of a mapped file are not counted as io.
+
+    With prefetch_depth above zero, archive members are inflated on a background thread
+    into a queue of up to prefetch_depth chunks of prefetch_chunk_size bytes while the
+    current thread parses.
+
+    With stations set, only the files and archive members named after those stations are
+    offered to the callbacks. Archives named after another station are never opened.
+
+    With cache_dir set, every file and archive member is parsed once into a SoundingCache
+    under cache_dir and served from it afterwards, as long as the size, CRC and modification
+    time of the source are unchanged. Files whose values don't fit the cache are read as
+    text.
+
+    With incremental set, files are treated as append-only: only the soundings appended
+    since the TailCheckpoint the manifest recorded for a file are read, as long as the head
+    of the file and its last processed sounding are unchanged. Otherwise the file is read in
+    full. finish_file gets the counts of what was read. Needs a manifest, and bypasses the
+    sidecar index and the cache."""
+
+    def __init__(self, reader=Reader(), io=IOWrapper(), manifest: CrawlManifest | None = None,
+                 instrument: bool = False, mapped: bool = False, prefetch_depth: int = 0,
+                 prefetch_chunk_size: int = 1 << 20, stations: set[str] | None = None,
+                 cache_dir: str | None = None, incremental: bool = False):
+        if incremental and manifest is None:
+            raise ValueError("Incremental crawling needs a manifest")
 
-    def __init__(self, reader=Reader(), io=IOWrapper()):
         self.io = io
         self.reader = reader
         self.callbacks = reader.callbacks
+        self.manifest = manifest
+        self.instrument = instrument
+        self.mapped = mapped
+        self.prefetch_depth = prefetch_depth
+        self.prefetch_chunk_size = prefetch_chunk_size
+        self.stations = stations
+        self.cache_dir = cache_dir
+        self.incremental = incremental
+        self.tail: TailCheckpoint | None = None
+        self.file_stats: list[ReadStats] = []
+        self.archive_stats: dict[str, ReadStats] = {}
 
     def crawl(self, path: str):
         """Crawl a directory to search for Igra2 files within archives and process them."""
         for filename in self.io.list_dir(path):
             self.process_file(path, filename)
 
+    def iter_soundings(self, path: str, accept: Callable[[str], bool] | None = None
+                       ) -> Iterator[Sounding]:
+        """Yield the soundings of the Igra2 files and archive members of a directory that
+        accept lets through (all of them by default). The source of a sounding is the path of
+        its file, or the archive path and member name. Callbacks and manifest are not used."""
+        for filename in self.io.list_dir(path):
+            if is_sidecar(filename) or \
+                    not in_selection(self.stations, filename, filename.endswith('.zip')):
+                continue
+            if filename.endswith('.zip'):
+                yield from self.iter_archive(f'{path}/{filename}', accept)
+            elif accept is None or accept(filename):
+                file_path = f'{path}/{filename}'
+                cache = self.file_cache(file_path)
+                if cache is not None:
+                    yield from cache.iter_soundings(file_path, self.reader.header_filter)
+                    continue
+                if self.mapped:
+                    stream = self.io.open_mapped_file(file_path)
+                else:
+                    stream = self.io.open_binary_file(file_path)
+                with stream:
+                    yield from self.reader.iter_soundings(stream, file_path)
+
+    def iter_archive(self, archive_path: str, accept: Callable[[str], bool] | None
+                     ) -> Iterator[Sounding]:
+        """Yield the soundings of the accepted members of an archive"""
+        archive = self.io.open_archive(archive_path)
+
+        try:
+            for file in archive.filelist:
+                if in_selection(self.stations, file.filename) and \
+                        (accept is None or accept(file.filename)):
+                    cache = self.member_cache(archive, file.filename)
+                    if cache is not None:
+                        yield from cache.iter_soundings(f'{archive_path}/{file.filename}',
+                                                        self.reader.header_filter)
+                        continue
+                    member = self.io.open_archive_file(archive, file.filename)
+                    source = member
+                    if self.prefetch_depth > 0:
+                        source = self.io.open_prefetched(member, self.prefetch_chunk_size,
+                                                         self.prefetch_depth)
+                    with member, self.io.open_buffered(source) as stream:
+                        yield from self.reader.iter_soundings(
+                            stream, f'{archive_path}/{file.filename}')
+        finally:
+            archive.close()
+
     def process_file(self, path: str, filename: str):
-        """Figure out what to do with the file based on type"""
+        """Figure out what to do with the file based on type. Sidecar indexes are passed by."""
+        if is_sidecar(filename) or \
+                not in_selection(self.stations, filename, filename.endswith('.zip')):
+            return
+
         if filename.endswith('.zip'):
             self.crawl_archive(path, filename)
-        else:
-            if self.callbacks.start_file(filename):
-                self.process_igra2_file(path, filename)
+            return
+
+        self.offer_file(path, filename)
+
+    def offer_file(self, path: str, filename: str) -> bool:
+        """Process a plain Igra2 file, unless the manifest has it done or start_file declines
+        it. Returns whether it was processed."""
+        stamp = None
+        if self.manifest is not None:
+            file_path = f'{path}/{filename}'
+            stamp = (file_path, self.io.file_size(file_path), 0, self.io.file_mtime(file_path))
+            if self.manifest.is_done(*stamp):
+                return False
+
+        if not self.callbacks.start_file(filename):
+            return False
+
+        self.track(stamp, self.process_igra2_file, path, filename)
+        return True
 
     def crawl_archive(self, path: str, archive_filename: str):
         """Crawl through a zip file"""
-        archive = self.io.open_archive(f'{path}/{archive_filename}')
+        archive_path = f'{path}/{archive_filename}'
+        archive_stamp = None
+        if self.manifest is not None:
+            archive_stamp = (archive_path, self.io.file_size(archive_path), 0,
+                             self.io.file_mtime(archive_path))
+            if self.manifest.is_done(*archive_stamp):
+                return
+
+        archive = self.io.open_archive(archive_path)
+        first_stats = len(self.file_stats)
 
         for file in archive.filelist:
-            if self.callbacks.start_file(file.filename):
-                self.process_igra2_archive_file(archive, file.filename)
+            if in_selection(self.stations, file.filename):
+                self.offer_member(archive_path, archive, file)
 
         archive.close()
 
+        if self.instrument:
+            self.archive_stats[archive_path] = ReadStats.sum(
+                self.file_stats[first_stats:], archive_filename, archive_path)
+
+        if archive_stamp is not None and self.stations is None:
+            self.manifest.finish(*archive_stamp)
+
+    def offer_member(self, archive_path: str, archive: ZipFile, file: ZipInfo) -> bool:
+        """Process a member of an open archive, unless the manifest has it done or start_file
+        declines it. Returns whether it was processed."""
+        stamp = None
+        if self.manifest is not None:
+            stamp = (f'{archive_path}/{file.filename}', file.file_size, file.CRC,
+                     datetime(*file.date_time).isoformat())
+            if self.manifest.is_done(*stamp):
+                return False
+
+        if not self.callbacks.start_file(file.filename):
+            return False
+
+        self.track(stamp, self.process_igra2_archive_file, archive, file.filename)
+        return True
+
+    def track(self, stamp: tuple | None, process, *args):
+        """Run process, recording its start and finish in the manifest"""
+        if stamp is None:
+            return process(*args)
+
+        self.manifest.start(*stamp)
+        self.tail = None
+        result = process(*args)
+        if self.tail is None:
+            self.manifest.finish(*stamp)
+        else:
+            self.manifest.finish(*stamp, self.tail)
+
+        return result
+
     def process_igra2_archive_file(self, archive: ZipFile, filename: str):
         """Read an igra2 file from a zip file"""
+        start = time.perf_counter()
+        stats = self.start_stats(filename, archive)
+        cache = None if self.incremental else self.member_cache(archive, filename)
+        if cache is not None:
+            headers, rows = self.reader.read_from_cache(cache)
+            return self.complete_file(headers, rows, stats, start)
         reader = self.io.open_archive_file(archive, filename)
-        wrapper = self.io.read_as_text(reader)
-        headers, rows = self.reader.read_from_stream(wrapper)
+        source = reader
+        if self.prefetch_depth > 0 and not self.incremental:
+            source = self.io.open_prefetched(reader, self.prefetch_chunk_size, self.prefetch_depth)
+        wrapper = self.io.open_buffered(source if stats is None else TimedStream(source, stats))
+        if self.incremental:
+            headers, rows = self.read_tail(f'{archive.filename}/{filename}', wrapper)
+        else:
+            index = None
+            if self.reader.header_filter is not None:
+                info = archive.getinfo(filename)
+                index = self.load_index(index_filename(archive.filename, filename),
+                                        info.file_size, info.CRC)
+            headers, rows = self.read_stream(wrapper, index)
         wrapper.close()
         reader.close()
 
-        self.callbacks.finish_file(headers, rows)
+        return self.complete_file(headers, rows, stats, start)
 
     def process_igra2_file(self, path: str, filename: str):
         """Read an igra2 file"""
-        reader = self.io.open_file(f'{path}/{filename}')
-        headers, rows = self.reader.read_from_stream(reader)
+        start = time.perf_counter()
+        file_path = f'{path}/{filename}'
+        stats = self.start_stats(filename)
+        cache = None if self.incremental else self.file_cache(file_path)
+        if cache is not None:
+            headers, rows = self.reader.read_from_cache(cache)
+            return self.complete_file(headers, rows, stats, start)
+        if self.mapped:
+            reader = self.io.open_mapped_file(file_path)
+        elif stats is None:
+            reader = self.io.open_binary_file(file_path)
+        else:
+            reader = self.io.open_buffered(TimedStream(self.io.open_binary_file(file_path, 0),
+                                                       stats))
+        if self.incremental:
+            headers, rows = self.read_tail(file_path, reader)
+        else:
+            index = None
+            if self.reader.header_filter is not None:
+                index = self.load_index(index_filename(file_path), self.io.file_size(file_path),
+                                        mtime=self.io.file_mtime(file_path))
+            headers, rows = self.read_stream(reader, index)
         reader.close()
 
-        self.callbacks.finish_file(headers, rows)
+        return self.complete_file(headers, rows, stats, start)
+
+    def start_stats(self, filename: str, archive: ZipFile | None = None) -> ReadStats | None:
+        """Start collecting the stats of a file when instrumented"""
+        if not self.instrument:
+            return None
+
+        stats = ReadStats(filename, None if archive is None else archive.filename)
+        self.reader.stats = stats
+        return stats
+
+    def complete_file(self, headers: int, rows: int, stats: ReadStats | None, start: float):
+        """Complete the stats of a file and hand the file to the finish_file callback"""
+        if stats is None:
+            return self.callbacks.finish_file(headers, rows)
+
+        self.reader.stats = None
+        stats.headers = headers
+        stats.rows = rows
+        stats.total_seconds = time.perf_counter() - start
+        self.file_stats.append(stats)
+
+        if self.callbacks.wants_stats:
+            return self.callbacks.finish_file(headers, rows, stats)
+
+        return self.callbacks.finish_file(headers, rows)
+
+    def read_stream(self, reader, index: SoundingIndex | None) -> tuple[int, int]:
+        """Seek to the soundings selected by the header filter when there is an index,
+        otherwise read it all"""
+        if index is None:
+            return self.reader.read_from_stream(reader)
+
+        return self.reader.read_from_index(reader, index.entries)
+
+    def read_tail(self, key: str, reader) -> tuple[int, int]:
+        """Read the soundings appended since the checkpoint the manifest has for key. The new
+        checkpoint is kept in tail for track to record."""
+        headers, rows, self.tail = self.reader.read_tail(reader, self.manifest.tail(key))
+        return headers, rows
+
+    def load_index(self, sidecar: str, size: int, crc: int = 0, mtime: str = ''
+                   ) -> SoundingIndex | None:
+        """Load the sidecar index of a file if it exists and is up to date"""
+        if not self.io.exists(sidecar):
+            return None
+
+        index = SoundingIndex.load(sidecar)
+        return index if index.matches(size, crc, mtime) else None
+
+    def file_cache(self, file_path: str) -> SoundingCache | None:
+        """The SoundingCache of a file when there is a cache_dir"""
+        if self.cache_dir is None:
+            return None
+
+        return self.load_cache(cache_path(self.cache_dir, file_path),
+                               (self.io.file_size(file_path), 0, self.io.file_mtime(file_path)),
+                               self.io.open_binary_file, file_path)
+
+    def member_cache(self, archive: ZipFile, filename: str) -> SoundingCache | None:
+        """The SoundingCache of an archive member when there is a cache_dir"""
+        if self.cache_dir is None:
+            return None
+
+        info = archive.getinfo(filename)
+        return self.load_cache(cache_path(self.cache_dir, archive.filename, filename),
+                               (info.file_size, info.CRC, datetime(*info.date_time).isoformat()),
+                               self.io.open_archive_file, archive, filename)
+
+    def load_cache(self, path: str, stamp: tuple[int, int, str], open_source, *args
+                   ) -> SoundingCache | None:
+        """Load the cache of a source if it is up to date, otherwise build it from the
+        stream open_source(*args) returns. None if the source doesn't fit a cache, which is
+        recorded so it is only tried again once the source changes. A cache that fails to
+        load (e.g. truncated) is rebuilt."""
+        try:
+            if SoundingCache.is_unfit(path, *stamp):
+                return None
+            if self.io.exists(f'{path}/key.npy'):
+                cache = SoundingCache.load(path)
+                if cache.matches(*stamp):
+                    return cache
+        except Exception:  # pylint: disable=broad-exception-caught
+            pass
+
+        with open_source(*args) as stream:
+            try:
+                cache = SoundingCache.build(stream, *stamp)
+            except ValueError:
+                SoundingCache.mark_unfit(path, *stamp)
+                return None
+
+        cache.save(path)
+        return cache
@@ -0,0 +1,85 @@
+"""Derive physical quantities from decoded Igra2 bodies, whole columns at a time"""
+import numpy as np
+
+from .body_decoder import MISSING_VALUES
+
+KELVIN = 273.15
+KAPPA = 0.2857  # R/cp of dry air
+EPSILON = 622.0  # Ratio of the molar masses of water and dry air, in g/kg
+
+DERIVED_DTYPE = np.dtype([
+    ('pres', np.float64),          # hPa
+    ('gph', np.float64),           # m
+    ('temp', np.float64),          # degC
+    ('dewpoint', np.float64),      # degC
+    ('rh', np.float64),            # %
+    ('mixing_ratio', np.float64),  # g/kg
+    ('theta', np.float64),         # K
+    ('wspd', np.float64),          # m/s
+    ('u', np.float64),             # m/s
+    ('v', np.float64)              # m/s
+])
+
+
+def derive(body: np.ndarray) -> np.ndarray:
+    """Derive the quantities of DERIVED_DTYPE from a body in BODY_DTYPE, of any shape, e.g.
+    the concatenated bodies of a batch. Missing inputs give NaN. The reported relative
+    humidity is used where present, otherwise it is computed from the dewpoint."""
+    result = np.empty(body.shape, dtype=DERIVED_DTYPE)
+
+    pres = pressure_hpa(body['pres'])
+    temp = body['temp'] / 10.0
+    dew = dewpoint(temp, body['dpdp'] / 10.0)
+    rh = body['rh'] / 10.0
+
+    result['pres'] = pres
+    result['gph'] = body['gph']
+    result['temp'] = temp
+    result['dewpoint'] = dew
+    result['rh'] = np.where(np.isnan(rh), relative_humidity(temp, dew), rh)
+    result['mixing_ratio'] = mixing_ratio(pres, dew)
+    result['theta'] = potential_temperature(pres, temp)
+    result['wspd'] = body['wspd'] / 10.0
+    result['u'], result['v'] = wind_components(body['wdir'], result['wspd'])
+
+    return result
+
+
+def pressure_hpa(pres: np.ndarray) -> np.ndarray:
+    """Convert pressures in Pa to hPa. The integer missing sentinels become NaN."""
+    pres = np.asarray(pres)
+    missing = (pres == MISSING_VALUES[0]) | (pres == MISSING_VALUES[1])
+    return np.where(missing, np.nan, pres / 100.0)
+
+
+def dewpoint(temp: np.ndarray, depression: np.ndarray) -> np.ndarray:
+    """Dewpoint from the temperature and the dewpoint depression"""
+    return np.subtract(temp, depression)
+
+
+def wind_components(wdir: np.ndarray, wspd: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Eastward and northward wind from the direction the wind blows from, in degrees"""
+    radians = np.radians(wdir)
+    return -wspd * np.sin(radians), -wspd * np.cos(radians)
+
+
+def saturation_vapor_pressure(temp: np.ndarray) -> np.ndarray:
+    """Saturation vapor pressure over water in hPa at a temperature in degC (Bolton 1980)"""
+    temp = np.asarray(temp)
+    return 6.112 * np.exp(17.67 * temp / (temp + 243.5))
+
+
+def relative_humidity(temp: np.ndarray, dew: np.ndarray) -> np.ndarray:
+    """Relative humidity in % from the temperature and dewpoint in degC"""
+    return 100.0 * saturation_vapor_pressure(dew) / saturation_vapor_pressure(temp)
+
+
+def mixing_ratio(pres: np.ndarray, dew: np.ndarray) -> np.ndarray:
+    """Water vapor mixing ratio in g/kg from the pressure in hPa and dewpoint in degC"""
+    vapor = saturation_vapor_pressure(dew)
+    return EPSILON * vapor / (pres - vapor)
+
+
+def potential_temperature(pres: np.ndarray, temp: np.ndarray) -> np.ndarray:
+    """Potential temperature in K from the pressure in hPa and temperature in degC"""
+    return (np.asarray(temp) + KELVIN) * (1000.0 / np.asarray(pres)) ** KAPPA
@@ -2,7 +2,7 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class HeaderModel:
     """Model for an Igra2 header record"""
     id: str
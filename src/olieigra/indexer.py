@@ -0,0 +1,67 @@
+"""Build sidecar sounding indexes for a directory of Igra2 files and archives"""
+from zipfile import ZipFile, ZipInfo
+
+from .io_wrapper import IOWrapper
+from .sounding_index import SoundingIndex, index_filename
+
+
+class Indexer:
+    """Build sidecar sounding indexes for a directory of Igra2 files and archives"""
+
+    def __init__(self, io=IOWrapper()):
+        self.io = io
+
+    def crawl(self, path: str) -> int:
+        """Index every Igra2 file and archive member in a directory. Returns the number of
+        indexes that were (re)built."""
+        built = 0
+
+        for filename in self.io.list_dir(path):
+            if filename.endswith('.zip'):
+                built += self.index_archive(path, filename)
+            elif filename.endswith('-data.txt'):
+                built += self.index_file(path, filename)
+
+        return built
+
+    def index_archive(self, path: str, archive_filename: str) -> int:
+        """Index every member of a zip file that doesn't have an up to date index"""
+        archive_path = f'{path}/{archive_filename}'
+        archive = self.io.open_archive(archive_path)
+        built = 0
+
+        for file in archive.filelist:
+            built += self.index_member(archive_path, archive, file)
+
+        archive.close()
+        return built
+
+    def index_member(self, archive_path: str, archive: ZipFile, file: ZipInfo) -> int:
+        """Index a member of an open zip file unless it already has an up to date index"""
+        sidecar = index_filename(archive_path, file.filename)
+        if self.is_current(sidecar, file.file_size, file.CRC):
+            return 0
+
+        stream = self.io.open_buffered(self.io.open_archive_file(archive, file.filename))
+        SoundingIndex.build(stream, file.file_size, file.CRC).save(sidecar)
+        stream.close()
+        return 1
+
+    def index_file(self, path: str, filename: str) -> int:
+        """Index a plain Igra2 file unless it already has an up to date index"""
+        file_path = f'{path}/{filename}'
+        sidecar = index_filename(file_path)
+        size = self.io.file_size(file_path)
+        mtime = self.io.file_mtime(file_path)
+
+        if self.is_current(sidecar, size, mtime=mtime):
+            return 0
+
+        stream = self.io.open_binary_file(file_path)
+        SoundingIndex.build(stream, size, mtime=mtime).save(sidecar)
+        stream.close()
+        return 1
+
+    def is_current(self, sidecar: str, size: int, crc: int = 0, mtime: str = '') -> bool:
+        """Check if a sidecar index exists and was built from the same source"""
+        return self.io.exists(sidecar) and SoundingIndex.load(sidecar).matches(size, crc, mtime)
@@ -0,0 +1,113 @@
+"""Interpolate many soundings onto target levels in one vectorized call"""
+import numpy as np
+
+METHODS = ('linear', 'log')
+
+
+def interpolate(x: np.ndarray, values: np.ndarray, targets: np.ndarray,
+                counts: np.ndarray | None = None, method: str = 'linear',
+                clamp: bool = False) -> np.ndarray:
+    """Interpolate the variables of many soundings onto target levels.
+
+    x is the vertical coordinate, shape (soundings, levels), e.g. gph or pres. Each row must
+    be strictly monotonic, increasing or decreasing, over its first counts entries; the
+    entries after them are padding and are ignored. values holds the variables at those
+    levels, shape (soundings, levels) or (soundings, levels, variables). targets is shape
+    (targets,) for levels shared by every sounding, or (soundings, targets).
+
+    method 'linear' interpolates linearly in x, 'log' linearly in ln(x), the usual choice
+    for pressure. Targets outside a sounding are NaN, or the value at the nearest end with
+    clamp (as np.interp does). Returns shape (soundings, targets) or (soundings, targets,
+    variables)."""
+    if method not in METHODS:
+        raise ValueError(f"Unknown interpolation method {method}, expected one of {METHODS}")
+
+    x = np.asarray(x, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    squeeze = values.ndim == 2
+    if squeeze:
+        values = values[:, :, np.newaxis]
+
+    soundings, levels = x.shape
+    rows = np.arange(soundings)
+    counts = np.full(soundings, levels) if counts is None else np.asarray(counts)
+    targets = np.broadcast_to(np.asarray(targets, dtype=np.float64),
+                              (soundings, np.shape(targets)[-1]))
+
+    if method == 'log':
+        x = np.log(x)
+        targets = np.log(targets)
+
+    # Flip decreasing rows so every row increases
+    last = np.maximum(counts - 1, 0)
+    sign = np.where(x[rows, last] < x[:, 0], -1.0, 1.0)[:, np.newaxis]
+    x = x * sign
+    targets = targets * sign
+
+    upper = np.minimum(np.maximum(search_rows(x, counts, targets), 1), last[:, np.newaxis])
+    lower = np.maximum(upper - 1, 0)
+    x0 = x[rows[:, np.newaxis], lower]
+    x1 = x[rows[:, np.newaxis], upper]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        weight = np.where(x1 > x0, (targets - x0) / (x1 - x0), 0.0)
+
+    outside = (targets < x[:, :1]) | (targets > x[rows, last][:, np.newaxis])
+    weight = np.clip(weight, 0.0, 1.0)
+    v0 = values[rows[:, np.newaxis], lower]
+    v1 = values[rows[:, np.newaxis], upper]
+    result = v0 + weight[:, :, np.newaxis] * (v1 - v0)
+
+    missing = (counts == 0)[:, np.newaxis] | np.isnan(targets)
+    if not clamp:
+        missing = missing | outside
+    result[missing] = np.nan
+
+    return result[:, :, 0] if squeeze else result
+
+
+def search_rows(x: np.ndarray, counts: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """Row by row searchsorted(side='right') of targets within the first counts entries of
+    the increasing rows of x, done in a single sort"""
+    soundings, levels = x.shape
+    valid = np.arange(levels) < counts[:, np.newaxis]
+    x_rows = np.broadcast_to(np.arange(soundings)[:, np.newaxis], x.shape)[valid]
+    t_rows = np.repeat(np.arange(soundings), targets.shape[1])
+
+    keys = np.concatenate([x[valid], targets.ravel()])
+    rows = np.concatenate([x_rows, t_rows])
+    is_target = np.concatenate([np.zeros(len(x_rows), dtype=bool), np.ones(len(t_rows), bool)])
+
+    # Targets sort after equal levels, which matches side='right'
+    order = np.lexsort((is_target, keys, rows))
+    levels_before = np.cumsum(~is_target[order])
+    sorted_targets = order[is_target[order]]
+
+    result = np.empty(len(t_rows), dtype=np.int64)
+    result[sorted_targets - len(x_rows)] = levels_before[is_target[order]]
+    row_starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+    return result.reshape(targets.shape) - row_starts[:, np.newaxis]
+
+
+def pad_ragged(flat: np.ndarray, counts: np.ndarray, fill: float = np.nan) -> np.ndarray:
+    """Turn concatenated rows of differing length (e.g. the levels of many soundings) into
+    a (rows, max count, ...) array padded with fill"""
+    counts = np.asarray(counts)
+    rows = np.repeat(np.arange(len(counts)), counts)
+    columns = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+    result = np.full((len(counts), counts.max(initial=0)) + flat.shape[1:], fill,
+                     dtype=np.result_type(flat, type(fill)))
+    result[rows, columns] = flat
+
+    return result
+
+
+def pad_bodies(bodies: list[np.ndarray], fields: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Stack the fields of decoded bodies (BODY_DTYPE arrays) into a padded (soundings,
+    levels, fields) float array. Returns the array and the level count of each sounding."""
+    counts = np.array([len(body) for body in bodies], dtype=np.int64)
+    flat = np.concatenate(bodies) if bodies else np.empty(0, dtype=[(f, 'f8') for f in fields])
+    columns = np.stack([flat[field].astype(np.float64) for field in fields], axis=-1)
+
+    return pad_ragged(columns, counts), counts
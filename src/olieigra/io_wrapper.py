@@ -2,9 +2,13 @@
 import io
 import os
 
+from datetime import datetime
 from typing import IO
 from zipfile import ZipFile
 
+from .mapped_stream import MappedStream
+from .prefetch_stream import PrefetchStream
+
 
 class IOWrapper:
     """Wrapper class for IO to make unit tests easier to write"""
@@ -13,6 +17,18 @@ class IOWrapper:
         """Wrapper for os.listdir"""
         return os.listdir(path)
 
+    def exists(self, filename: str) -> bool:
+        """Wrapper for os.path.exists"""
+        return os.path.exists(filename)
+
+    def file_size(self, filename: str) -> int:
+        """Wrapper for os.path.getsize"""
+        return os.path.getsize(filename)
+
+    def file_mtime(self, filename: str) -> str:
+        """Modification time of a file as an ISO 8601 string"""
+        return datetime.fromtimestamp(os.path.getmtime(filename)).isoformat()
+
     def open_archive(self, archive: str) -> ZipFile:
         """Open a zip file"""
         return ZipFile(archive, "r")
@@ -25,6 +41,23 @@ class IOWrapper:
         """Convert a binary stream into a text stream"""
         return io.TextIOWrapper(stream, encoding='UTF-8')
 
+    def open_buffered(self, stream: IO[bytes], buffer_size: int = 1 << 20) -> io.BufferedReader:
+        """Wrap a binary stream in a large read buffer that can be peeked into"""
+        return io.BufferedReader(stream, buffer_size)
+
+    def open_prefetched(self, stream: IO[bytes], chunk_size: int = 1 << 20,
+                        depth: int = 4) -> PrefetchStream:
+        """Read a binary stream ahead on a background thread"""
+        return PrefetchStream(stream, chunk_size, depth)
+
     def open_file(self, filename: str) -> io.TextIOWrapper:
         """Return a text reader for the given file"""
         return open(filename, 'r', encoding='UTF-8')
+
+    def open_binary_file(self, filename: str, buffer_size: int = 1 << 20) -> io.BufferedReader:
+        """Return a buffered binary reader for the given file"""
+        return open(filename, 'rb', buffering=buffer_size)
+
+    def open_mapped_file(self, filename: str) -> MappedStream:
+        """Return a memory mapped binary reader for the given file"""
+        return MappedStream(open(filename, 'rb'))
@@ -0,0 +1,73 @@
+"""Read an uncompressed Igra2 file in place through a memory map"""
+import io
+import mmap
+
+
+class MappedStream(io.BufferedIOBase):
+    """Binary stream over a memory mapped file.
+
+    readline and read return bytes like a BufferedReader. read_view returns a zero-copy
+    memoryview into the map, which the Reader uses to hand body blocks straight to the
+    vectorized decoder. Seeking is free, so index driven random access reads only the pages
+    it touches. If views are still alive on close, the map is released with the last one."""
+
+    def __init__(self, file):
+        super().__init__()
+        self.file = file
+        if self.file_size() > 0:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.map = io.BytesIO()
+        self.view = memoryview(self.map) if isinstance(self.map, mmap.mmap) else memoryview(b'')
+
+    def file_size(self) -> int:
+        """Size of the underlying file"""
+        self.file.seek(0, io.SEEK_END)
+        return self.file.tell()
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readline(self, size: int | None = -1) -> bytes:
+        line = self.map.readline()
+
+        if size is not None and 0 <= size < len(line):
+            self.map.seek(size - len(line), io.SEEK_CUR)
+            return line[:size]
+
+        return line
+
+    def read(self, size: int | None = -1) -> bytes:
+        return self.map.read(-1 if size is None else size)
+
+    def read1(self, size: int = -1) -> bytes:
+        return self.read(size)
+
+    def read_view(self, size: int) -> memoryview:
+        """Read up to size bytes as a memoryview into the map, without copying"""
+        start = self.map.tell()
+        end = min(start + size, len(self.view))
+        self.map.seek(end)
+        return self.view[start:end]
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self.map.seek(offset, whence)
+        return self.map.tell()
+
+    def tell(self) -> int:
+        return self.map.tell()
+
+    def close(self):
+        if self.closed:
+            return
+
+        self.view.release()
+        try:
+            self.map.close()
+        except BufferError:
+            pass
+        self.file.close()
+        super().close()
@@ -0,0 +1,73 @@
+"""Run several Callbacks implementations from a single parse pass"""
+import numpy as np
+
+from .body_decoder import to_body_models
+from .body_model import BodyModel
+from .callbacks import Callbacks
+from .header_model import HeaderModel
+from .read_stats import ReadStats
+
+
+class MultiCallbacks(Callbacks):
+    """Run several Callbacks implementations from a single parse pass.
+
+    Each consumer keeps its own start_file/finish_file lifecycle: it only sees the files it
+    accepted, and only the bodies whose header it accepted. A body is parsed once, and only
+    if at least one consumer asked for it. If any consumer is vectorized the body is decoded
+    as an array and converted once for the consumers that want list[BodyModel]. The same
+    body object is shared between consumers, so they must not modify it."""
+
+    def __init__(self, consumers: list[Callbacks]):
+        super().__init__()
+        self.consumers = consumers
+        self.vectorized = any(consumer.vectorized for consumer in consumers)
+        self.wants_stats = any(consumer.wants_stats for consumer in consumers)
+        self.active = []
+        self.wanting = []
+
+    def start_file(self, filename: str) -> bool:
+        """Offer the file to every consumer. Process it if at least one accepts."""
+        self.active = [consumer for consumer in self.consumers if consumer.start_file(filename)]
+        return len(self.active) > 0
+
+    def finish_file(self, headers: int, rows: int, stats: ReadStats | None = None) -> list:
+        """Finish the file for the consumers that accepted it. Returns their results in
+        consumer order, with None for the consumers that skipped the file."""
+        active = {id(consumer) for consumer in self.active}
+
+        return [self.finish_consumer(consumer, headers, rows, stats) if id(consumer) in active
+                else None for consumer in self.consumers]
+
+    def finish_consumer(self, consumer: Callbacks, headers: int, rows: int,
+                        stats: ReadStats | None):
+        """Finish the file for a consumer, with the stats if it wants them"""
+        if stats is not None and consumer.wants_stats:
+            return consumer.finish_file(headers, rows, stats)
+
+        return consumer.finish_file(headers, rows)
+
+    def parse_header(self, header: HeaderModel) -> bool:
+        """Offer the header to the active consumers. Parse the body if any wants it."""
+        self.wanting = [consumer for consumer in self.active if consumer.parse_header(header)]
+        return len(self.wanting) > 0
+
+    def parse_body(self, body: list[BodyModel]) -> bool:
+        """Hand the body to the consumers that asked for it"""
+        for consumer in self.wanting:
+            consumer.parse_body(body)
+
+        return True
+
+    def parse_body_array(self, body: np.ndarray) -> bool:
+        """Hand the decoded body to the consumers that asked for it, in the form they use"""
+        models = None
+
+        for consumer in self.wanting:
+            if consumer.vectorized:
+                consumer.parse_body_array(body)
+            else:
+                if models is None:
+                    models = to_body_models(body)
+                consumer.parse_body(models)
+
+        return True
@@ -0,0 +1,140 @@
+"""Crawl a directory of Igra2 files and archives across a pool of worker processes."""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Callable
+from zipfile import ZipFile
+
+from .callbacks import Callbacks
+from .crawler import Crawler
+from .io_wrapper import IOWrapper
+from .read_stats import ReadStats
+from .reader import Reader
+from .sounding_index import is_sidecar
+from .station_catalog import in_selection
+
+
+@dataclass
+class CrawlTask:
+    """A unit of work: one plain Igra2 file or one member of a zip archive"""
+    path: str
+    archive: str | None
+    filename: str
+    size: int
+
+
+@dataclass
+class CrawlResult:
+    """The outcome of a CrawlTask, sent back from the worker to the parent"""
+    task: CrawlTask
+    processed: bool
+    result: Any
+    stats: ReadStats | None = None
+
+
+class ParallelCrawler:
+    """Crawl a directory of Igra2 files and archives across a pool of worker processes.
+
+    Every task gets fresh callbacks from callbacks_factory inside the worker, so
+    start_file/finish_file run in the worker. Whatever finish_file returns is sent back to
+    the parent and handed to reduce. Both factories must be picklable (e.g. module level
+    classes or functions). With instrument set, every result carries the ReadStats of its
+    file. With stations set, only the files of those stations are crawled."""
+
+    def __init__(self, callbacks_factory: Callable[[], Callbacks], max_workers: int | None = None,
+                 reader_factory: Callable[[Callbacks], Reader] = Reader, io=IOWrapper(),
+                 instrument: bool = False, stations: set[str] | None = None):
+        self.callbacks_factory = callbacks_factory
+        self.reader_factory = reader_factory
+        self.max_workers = max_workers
+        self.io = io
+        self.instrument = instrument
+        self.stations = stations
+
+    def crawl(self, path: str, reduce: Callable[[CrawlResult], None] | None = None
+              ) -> list[CrawlResult]:
+        """Crawl a directory, largest members first, and collect the results as they finish"""
+        tasks = self.list_tasks(path)
+        results = []
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(crawl_task, self.callbacks_factory, self.reader_factory,
+                                       task, self.instrument) for task in tasks]
+
+            for future in as_completed(futures):
+                result = future.result()
+                if reduce is not None:
+                    reduce(result)
+                results.append(result)
+
+        return results
+
+    def list_tasks(self, path: str) -> list[CrawlTask]:
+        """List every file and archive member, ordered by uncompressed size, largest first"""
+        return list_tasks(self.io, path, self.stations)
+
+
+def list_tasks(io: IOWrapper, path: str, stations: set[str] | None = None) -> list[CrawlTask]:
+    """List every file and archive member of the station selection (all of them by
+    default), ordered by uncompressed size, largest first. Sidecar indexes are left out."""
+    tasks = []
+
+    for filename in io.list_dir(path):
+        if is_sidecar(filename) or not in_selection(stations, filename, filename.endswith('.zip')):
+            continue
+        if filename.endswith('.zip'):
+            archive = io.open_archive(f'{path}/{filename}')
+            tasks.extend(CrawlTask(path, filename, file.filename, file.file_size)
+                         for file in archive.filelist if in_selection(stations, file.filename))
+            archive.close()
+        else:
+            tasks.append(CrawlTask(path, None, filename, io.file_size(f'{path}/{filename}')))
+
+    return sorted(tasks, key=lambda task: task.size, reverse=True)
+
+
+class ArchiveCache:
+    """Keep the most recently used archive of a worker open between tasks"""
+
+    def __init__(self):
+        self.filename = None
+        self.archive = None
+
+    def open(self, io: IOWrapper, filename: str) -> ZipFile:
+        """Return the archive, reusing the open one when it is the same file"""
+        if self.filename != filename:
+            if self.archive is not None:
+                self.archive.close()
+            self.archive = io.open_archive(filename)
+            self.filename = filename
+
+        return self.archive
+
+    def close(self):
+        """Close the open archive, if any"""
+        if self.archive is not None:
+            self.archive.close()
+        self.filename = None
+        self.archive = None
+
+
+ARCHIVE_CACHE = ArchiveCache()
+
+
+def crawl_task(callbacks_factory: Callable[[], Callbacks],
+               reader_factory: Callable[[Callbacks], Reader], task: CrawlTask,
+               instrument: bool = False) -> CrawlResult:
+    """Process one task inside a worker process"""
+    io = IOWrapper()
+    callbacks = callbacks_factory()
+    crawler = Crawler(reader=reader_factory(callbacks), io=io, instrument=instrument)
+
+    if not callbacks.start_file(task.filename):
+        return CrawlResult(task, False, None)
+
+    if task.archive is None:
+        result = crawler.process_igra2_file(task.path, task.filename)
+    else:
+        archive = ARCHIVE_CACHE.open(io, f'{task.path}/{task.archive}')
+        result = crawler.process_igra2_archive_file(archive, task.filename)
+
+    return CrawlResult(task, True, result, crawler.file_stats[-1] if instrument else None)
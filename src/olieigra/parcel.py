@@ -0,0 +1,292 @@
+"""Surface parcel thermodynamics for many soundings in one vectorized call.
+
+The formulas and constants follow MetPy 1.7 (Romps 2017 LCL, Ambaum 2020 saturation vapor
+pressure, the pseudo-adiabatic lapse rate of moist_lapse) so the results agree with
+metpy.calc. Soundings are padded (soundings, levels) arrays in hPa and degC, ordered from
+the surface up, with counts giving the levels in use in each row."""
+from typing import NamedTuple
+import numpy as np
+
+from .interpolation import interpolate
+
+# MetPy's constants, in SI units
+RD = 287.04749097718457  # Gas constant of dry air
+RV = 461.52311572606084  # Gas constant of water vapor
+CP_D = 1004.6662184201462  # Specific heat of dry air
+CP_V = 1860.078011865639  # Specific heat of water vapor
+CP_L = 4219.4  # Specific heat of liquid water
+LV = 2500840.0  # Latent heat of vaporization at the triple point
+T0 = 273.16  # Triple point of water
+SAT_PRESSURE_0C = 611.2
+EPSILON = RD / RV
+KAPPA = RD / CP_D
+KELVIN = 273.15
+
+# Largest integration step of the moist adiabat, in ln(pressure)
+MAX_STEP = 0.05
+
+
+class Crossings(NamedTuple):
+    """Where the buoyancy changes sign between consecutive levels"""
+    pressure: np.ndarray
+    rising: np.ndarray
+    falling: np.ndarray
+
+
+def lcl(pres: np.ndarray, temp: np.ndarray, dew: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Pressure (hPa) and temperature (degC) of the lifting condensation level of parcels
+    at pres, temp and dew, using the exact solution of Romps (2017)"""
+    temp = np.asarray(temp, dtype=np.float64) + KELVIN
+    dew = np.asarray(dew, dtype=np.float64) + KELVIN
+    pres = np.asarray(pres, dtype=np.float64)
+
+    mixing = saturation_mixing_ratio(pres * 100.0, dew)
+    specific = mixing / (1 + mixing)
+    heat_ratio = (CP_D + specific * (CP_V - CP_D)) / (RD + specific * (RV - RD))
+    a = heat_ratio + (CP_L - CP_V) / RV
+    c = -(LV + (CP_L - CP_V) * T0) / (RV * temp) / a
+    humidity = saturation_vapor_pressure(dew) / saturation_vapor_pressure(temp)
+
+    t_lcl = c / lambert_w_minus1(humidity ** (1 / a) * c * np.exp(c)) * temp
+    p_lcl = pres * (t_lcl / temp) ** heat_ratio
+
+    return p_lcl, t_lcl - KELVIN
+
+
+def parcel_profile(pres: np.ndarray, temp: np.ndarray, dew: np.ndarray,
+                   counts: np.ndarray | None = None) -> np.ndarray:
+    """Temperature (degC) of the surface parcel of each sounding at its levels: dry
+    adiabatic up to the LCL, then pseudo-adiabatic. Padding levels are NaN."""
+    pres, temp, dew = (np.asarray(column, dtype=np.float64) for column in (pres, temp, dew))
+    valid = level_mask(pres, counts)
+
+    p_lcl, _ = lcl(pres[:, 0], temp[:, 0], dew[:, 0])
+    surface = temp[:, 0] + KELVIN
+    dry = surface[:, np.newaxis] * (pres / pres[:, :1]) ** KAPPA
+    lcl_temp = surface * (p_lcl / pres[:, 0]) ** KAPPA
+    moist = moist_profile(np.where(valid, pres, np.nan), p_lcl, lcl_temp)
+
+    result = np.where(pres >= p_lcl[:, np.newaxis], dry, moist) - KELVIN
+    result[~valid] = np.nan
+
+    return result
+
+
+def moist_profile(pres: np.ndarray, start_pres: np.ndarray, start_temp: np.ndarray) -> np.ndarray:
+    """Temperature (K) along the pseudo-adiabat of each row from start_pres (hPa) and
+    start_temp (K) up to the levels above it. Levels below the start keep start_temp."""
+    result = np.empty(pres.shape)
+    log_p = np.log(start_pres * 100.0)
+    temp = np.array(start_temp, dtype=np.float64)
+
+    # Integrate level by level with RK4 in ln(p), every row at once
+    for level in range(pres.shape[1]):
+        step = np.log(pres[:, level] * 100.0) - log_p
+        step = np.where(step < 0, step, 0.0)
+        substeps = int(np.ceil(-np.min(step, initial=0.0) / MAX_STEP))
+
+        for _ in range(substeps):
+            temp = runge_kutta(log_p, temp, step / substeps)
+            log_p = log_p + step / substeps
+
+        result[:, level] = temp
+
+    return result
+
+
+def runge_kutta(log_p: np.ndarray, temp: np.ndarray, step: np.ndarray) -> np.ndarray:
+    """One RK4 step of the moist lapse rate"""
+    k1 = moist_gradient(log_p, temp)
+    k2 = moist_gradient(log_p + step / 2, temp + step * k1 / 2)
+    k3 = moist_gradient(log_p + step / 2, temp + step * k2 / 2)
+    k4 = moist_gradient(log_p + step, temp + step * k3)
+
+    return temp + step * (k1 + 2 * k2 + 2 * k3 + k4) / 6
+
+
+def moist_gradient(log_p: np.ndarray, temp: np.ndarray) -> np.ndarray:
+    """dT/dln(p) of a saturated parcel, as in metpy.calc.moist_lapse"""
+    mixing = saturation_mixing_ratio(np.exp(log_p), temp)
+    return (RD * temp + LV * mixing) / (CP_D + LV * LV * mixing * EPSILON / (RD * temp * temp))
+
+
+def lifted_index(pres: np.ndarray, temp: np.ndarray, profile: np.ndarray,
+                 counts: np.ndarray | None = None, level: float = 500.0) -> np.ndarray:
+    """Environment minus parcel temperature at level hPa, linearly interpolated in
+    pressure. NaN when a sounding does not span the level."""
+    values = np.stack([temp, profile], axis=-1)
+    result = interpolate(pres, values, [level], counts)[:, 0]
+
+    return result[:, 0] - result[:, 1]
+
+
+def cape_cin(pres: np.ndarray, temp: np.ndarray, dew: np.ndarray, profile: np.ndarray,
+             counts: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """CAPE and CIN (J/kg) of the parcel profiles, as metpy.calc.cape_cin with its default
+    bottom LFC and top EL: virtual temperatures are used and the area is integrated in
+    ln(p) between the levels and the zero crossings of the buoyancy. The levels in use must
+    not contain NaN, see drop_missing."""
+    pres, temp, dew, profile = (np.asarray(column, dtype=np.float64)
+                                for column in (pres, temp, dew, profile))
+    valid = level_mask(pres, counts)
+    buoyancy, env = virtual_buoyancy(pres, temp, dew, profile, valid)
+
+    # MetPy locates the LFC and EL relative to the LCL of the virtual temperature
+    p_lcl, _ = lcl(pres[:, 0], env[:, 0] - KELVIN, dew[:, 0])
+    crossings = sign_changes(pres, buoyancy)
+    positive = (pres < p_lcl[:, np.newaxis]) & (buoyancy > 1e-8 + 1e-5 * np.abs(env))
+
+    lfc = find_lfc(crossings, p_lcl, positive.any(axis=1))[:, np.newaxis]
+    el = find_el(crossings, p_lcl, top_level(buoyancy, valid))
+    el = np.where(np.isnan(el), top_level(pres, valid), el)[:, np.newaxis]
+
+    cape = area(pres, buoyancy, crossings.pressure,
+                lambda p: less_or_close(p, lfc) & less_or_close(el, p))
+    cin = area(pres, buoyancy, crossings.pressure, lambda p: less_or_close(lfc, p))
+
+    return (np.where(np.isnan(lfc[:, 0]), 0.0, cape),
+            np.where(np.isnan(lfc[:, 0]), 0.0, np.minimum(cin, 0.0)))
+
+
+def virtual_buoyancy(pres: np.ndarray, temp: np.ndarray, dew: np.ndarray, profile: np.ndarray,
+                     valid: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Parcel minus environment virtual temperature, and the environment virtual
+    temperature (K). Below the LCL the parcel keeps the surface mixing ratio."""
+    p_lcl, _ = lcl(pres[:, 0], temp[:, 0], dew[:, 0])
+    surface_mixing = saturation_mixing_ratio(pres[:, :1] * 100.0, dew[:, :1] + KELVIN)
+    parcel_mixing = np.where(pres > p_lcl[:, np.newaxis], surface_mixing,
+                             saturation_mixing_ratio(pres * 100.0, profile + KELVIN))
+    env = virtual_temperature(temp + KELVIN,
+                              saturation_mixing_ratio(pres * 100.0, dew + KELVIN))
+    parcel = virtual_temperature(profile + KELVIN, parcel_mixing)
+
+    return np.where(valid, parcel - env, np.nan), env
+
+
+def sign_changes(pres: np.ndarray, buoyancy: np.ndarray) -> Crossings:
+    """The sign changes of the buoyancy between the levels above the first, located
+    linearly in ln(p). Element i is the segment from level i + 1 to i + 2."""
+    y0, y1 = buoyancy[:, 1:-1], buoyancy[:, 2:]
+    rising = np.sign(y1) > np.sign(y0)
+    falling = np.sign(y1) < np.sign(y0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_p = np.log(pres)
+        crossing = np.exp(log_p[:, 1:-1] + y0 / (y0 - y1) * (log_p[:, 2:] - log_p[:, 1:-1]))
+
+    return Crossings(np.where(rising | falling, crossing, np.nan), rising, falling)
+
+
+def find_lfc(crossings: Crossings, p_lcl: np.ndarray, positive: np.ndarray) -> np.ndarray:
+    """The bottom level of free convection of each row, NaN if there is none. positive
+    tells whether the parcel is warmer than the environment anywhere above the LCL."""
+    above_lcl = crossings.rising & (crossings.pressure < p_lcl[:, np.newaxis])
+    bottom = np.take_along_axis(crossings.pressure, np.argmax(above_lcl, axis=1)[:, np.newaxis],
+                                axis=1)[:, 0]
+    top_el = np.min(np.where(crossings.falling, crossings.pressure, np.inf), axis=1)
+    el_below_lcl = crossings.falling.any(axis=1) & (top_el > p_lcl)
+
+    at_lcl = np.where(crossings.rising.any(axis=1), ~el_below_lcl, positive)
+    return np.where(above_lcl.any(axis=1), bottom, np.where(at_lcl, p_lcl, np.nan))
+
+
+def find_el(crossings: Crossings, p_lcl: np.ndarray, top_buoyancy: np.ndarray) -> np.ndarray:
+    """The top equilibrium level of each row, NaN if there is none"""
+    top = np.min(np.where(crossings.falling, crossings.pressure, np.inf), axis=1)
+    found = crossings.falling.any(axis=1) & (top < p_lcl) & ~(top_buoyancy > 0)
+
+    return np.where(found, top, np.nan)
+
+
+def area(pres: np.ndarray, buoyancy: np.ndarray, crossing: np.ndarray, included) -> np.ndarray:
+    """Trapezoid integral of Rd * buoyancy over ln(p), between the consecutive levels and
+    crossings that are both included. Like MetPy, no crossing is placed in the first
+    segment."""
+    crossing = np.concatenate([np.full((len(pres), 1), np.nan), crossing], axis=1)
+    p0, p1 = pres[:, :-1], pres[:, 1:]
+    y0, y1 = buoyancy[:, :-1], buoyancy[:, 1:]
+    crossed = ~np.isnan(crossing)
+
+    with np.errstate(invalid='ignore'):
+        whole = trapezoid(p0, y0, p1, y1) * (included(p0) & included(p1))
+        lower = trapezoid(p0, y0, crossing, 0.0) * (included(p0) & included(crossing))
+        upper = trapezoid(crossing, 0.0, p1, y1) * (included(crossing) & included(p1))
+
+    total = np.where(crossed, lower + upper, whole)
+    return RD * np.nansum(total, axis=1)
+
+
+def trapezoid(p0: np.ndarray, y0: np.ndarray, p1: np.ndarray, y1: np.ndarray) -> np.ndarray:
+    """Trapezoid area of y over ln(p) from p1 up to p0"""
+    return (y0 + y1) / 2 * (np.log(p0) - np.log(p1))
+
+
+def less_or_close(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """a <= b, allowing for rounding as MetPy does"""
+    return (a <= b) | np.isclose(a, b)
+
+
+def drop_missing(*columns: np.ndarray, counts: np.ndarray | None = None) -> tuple:
+    """Move the levels where any of the padded columns is NaN into the padding, keeping the
+    order of the others. Returns the columns followed by the new counts."""
+    columns = [np.asarray(column, dtype=np.float64) for column in columns]
+    valid = level_mask(columns[0], counts) & ~np.any([np.isnan(c) for c in columns], axis=0)
+    order = np.argsort(~valid, axis=1, kind='stable')
+    new_counts = valid.sum(axis=1)
+    in_use = level_mask(columns[0], new_counts)
+
+    return (*(np.where(in_use, np.take_along_axis(c, order, axis=1), np.nan) for c in columns),
+            new_counts)
+
+
+def level_mask(pres: np.ndarray, counts: np.ndarray | None) -> np.ndarray:
+    """The levels in use of each row"""
+    if counts is None:
+        return np.ones(pres.shape, dtype=bool)
+
+    return np.arange(pres.shape[1]) < np.asarray(counts)[:, np.newaxis]
+
+
+def top_level(values: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """The value at the last level in use of each row"""
+    top = np.maximum(valid.sum(axis=1) - 1, 0)[:, np.newaxis]
+    return np.take_along_axis(values, top, axis=1)[:, 0]
+
+
+def saturation_vapor_pressure(temp: np.ndarray) -> np.ndarray:
+    """Saturation vapor pressure over liquid water (Pa) at temp (K), after Ambaum (2020)"""
+    latent_heat = LV - (CP_L - CP_V) * (temp - T0)
+    return SAT_PRESSURE_0C * (T0 / temp) ** ((CP_L - CP_V) / RV) * \
+        np.exp((LV / T0 - latent_heat / temp) / RV)
+
+
+def saturation_mixing_ratio(pres: np.ndarray, temp: np.ndarray) -> np.ndarray:
+    """Saturation mixing ratio (kg/kg) at pres (Pa) and temp (K)"""
+    vapor = saturation_vapor_pressure(temp)
+    return np.where(vapor >= pres, np.nan, EPSILON * vapor / (pres - vapor))
+
+
+def virtual_temperature(temp: np.ndarray, mixing: np.ndarray) -> np.ndarray:
+    """Virtual temperature of air at temp with the given mixing ratio"""
+    return temp * (mixing + EPSILON) / (EPSILON * (1 + mixing))
+
+
+def lambert_w_minus1(z: np.ndarray) -> np.ndarray:
+    """The lower branch W(-1) of the Lambert W function, for -1/e <= z < 0"""
+    z = np.asarray(z, dtype=np.float64)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        branch = -np.sqrt(np.maximum(2 * (1 + np.e * z), 0))
+        near = -1 + branch - branch * branch / 3 + 11 / 72 * branch ** 3
+        log_z = np.log(-z)
+        far = log_z - np.log(-log_z) + np.log(-log_z) / log_z
+        w = np.where(z < -0.25, near, far)
+
+        # Halley iterations
+        for _ in range(6):
+            exp_w = np.exp(w)
+            error = w * exp_w - z
+            slope = exp_w * (w + 1) - (w + 2) * error / (2 * w + 2)
+            w = np.where(slope != 0, w - error / slope, w)
+
+    return w
@@ -0,0 +1,67 @@
+"""Stream header and level record batches into a hive partitioned Parquet dataset"""
+import os
+import uuid
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+
+class ParquetSink:
+    """Stream header and level record batches into a hive partitioned Parquet dataset.
+
+    Batches are written to {root}/headers/{partition}=value/part-{name}-n.parquet and
+    {root}/levels/{partition}=value/part-{name}-n.parquet, name being unique to the sink
+    (a random one by default) and n counting its flushes. Sinks of other workers, shards or
+    runs writing into the same dataset never pick the same file. Files are written under a
+    .partial name and renamed into place on flush."""
+
+    def __init__(self, root: str, partition: str = 'id', compression: str = 'zstd',
+                 name: str | None = None):
+        self.root = root
+        self.name = uuid.uuid4().hex if name is None else name
+        self.parts = 0
+        self.partition = partition
+        self.compression = compression
+        self.writers = {}
+
+    def write(self, headers: pa.RecordBatch, levels: pa.RecordBatch):
+        """Write a pair of header and level batches"""
+        self.write_batch('headers', headers)
+        self.write_batch('levels', levels)
+
+    def write_batch(self, table: str, batch: pa.RecordBatch):
+        """Split a batch by partition value and append each part to its writer"""
+        column = batch.column(self.partition)
+        data = batch.drop_columns([self.partition])
+
+        for value in pc.unique(column).to_pylist():
+            part = data.filter(pc.equal(column, value))
+            self.writer(table, value, part.schema).write_batch(part)
+
+    def writer(self, table: str, value, schema: pa.Schema) -> pq.ParquetWriter:
+        """Get the open writer for a partition, starting a new part file if needed"""
+        key = (table, value)
+
+        if key not in self.writers:
+            folder = f'{self.root}/{table}/{self.partition}={value}'
+            os.makedirs(folder, exist_ok=True)
+            filename = f'{folder}/part-{self.name}-{self.parts}.partial'
+            self.writers[key] = (filename, pq.ParquetWriter(
+                filename, schema, compression=self.compression))
+
+        return self.writers[key][1]
+
+    def flush(self):
+        """Close every open writer and rename the part files into place"""
+        for filename, writer in self.writers.values():
+            writer.close()
+            os.rename(filename, filename.replace('.partial', '.parquet'))
+
+        if self.writers:
+            self.parts += 1
+        self.writers = {}
+
+    def close(self):
+        """Publish anything still being written"""
+        self.flush()
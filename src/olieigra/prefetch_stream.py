@@ -0,0 +1,118 @@
+"""Read a stream ahead on a background thread"""
+import io
+import queue
+import threading
+from collections import deque
+
+
+class PrefetchStream(io.RawIOBase):
+    """Raw stream that reads its source ahead on a background thread.
+
+    The thread reads chunk_size chunks into a queue of up to depth chunks while the caller
+    parses, which overlaps inflating a zip member (zlib releases the GIL) with parsing it.
+    Place it under a BufferedReader. Seeking forward reads ahead and discards. Seeking back
+    works within the last history chunks, which covers the seek back of a failed bulk skip."""
+
+    def __init__(self, source, chunk_size: int = 1 << 20, depth: int = 4, history: int = 2):
+        super().__init__()
+        self.source = source
+        self.chunk_size = chunk_size
+        self.history = history
+        self.queue = queue.Queue(depth)
+        self.chunks = deque()
+        self.position = 0
+        self.end = 0
+        self.eof = False
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.fill, daemon=True)
+        self.thread.start()
+
+    def fill(self):
+        """Read chunks from the source until it is exhausted or the stream is closed"""
+        try:
+            while not self.stopped.is_set():
+                chunk = self.source.read(self.chunk_size)
+                self.put(chunk)
+                if not chunk:
+                    return
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            self.put(error)
+
+    def put(self, item):
+        """Queue an item, giving up once the stream is closed"""
+        while not self.stopped.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def fetch(self) -> bool:
+        """Take the next chunk from the queue. Returns False at the end of the source."""
+        if self.eof:
+            return False
+
+        item = self.queue.get()
+        if isinstance(item, Exception):
+            raise item
+        if not item:
+            self.eof = True
+            return False
+
+        self.chunks.append((self.end, item))
+        self.end += len(item)
+        while len(self.chunks) > self.history + 1:
+            self.chunks.popleft()
+
+        return True
+
+    def readinto(self, buffer) -> int:
+        while self.position >= self.end:
+            if not self.fetch():
+                return 0
+
+        for offset, chunk in reversed(self.chunks):
+            if offset <= self.position:
+                start = self.position - offset
+                count = min(len(buffer), len(chunk) - start)
+                buffer[:count] = chunk[start:start + count]
+                self.position += count
+                return count
+
+        raise io.UnsupportedOperation("Position is before the prefetch history")
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("Can only seek from the start or current position")
+
+        start = self.chunks[0][0] if self.chunks else self.end
+        if offset < start:
+            raise io.UnsupportedOperation("Can't seek back past the prefetch history")
+
+        while offset > self.end and self.fetch():
+            pass
+
+        self.position = offset
+        return offset
+
+    def tell(self) -> int:
+        return self.position
+
+    def close(self):
+        if not self.closed:
+            self.stopped.set()
+            while self.thread.is_alive():
+                try:
+                    self.queue.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            self.source.close()
+        super().close()
@@ -0,0 +1,233 @@
+"""Per-sounding and per-station quality metrics of decoded Igra2 bodies"""
+import numpy as np
+
+from .body_decoder import FLOAT_FIELDS, MISSING_VALUES
+from .batch_callbacks import BatchCallbacks
+from .read_stats import ReadStats
+
+MAX_HEIGHT = 10000  # m, the top of the levels counted by usable_low
+HEADER_FIELDS = ('id', 'sounding', 'year', 'month', 'day', 'hour', 'numlev', 'lat', 'lon')
+
+QUALITY_DTYPE = np.dtype([
+    ('levels', np.int32),
+    ('standard_levels', np.int32),      # type 1x, standard pressure levels
+    ('other_levels', np.int32),         # type 2x, other pressure levels
+    ('non_pressure_levels', np.int32),  # type 3x
+    ('surface_levels', np.int32),       # type 21, the surface record
+    ('tropopause_levels', np.int32),    # type x2
+    ('usable', np.int32),               # pressure levels with every field present
+    ('usable_low', np.int32),           # usable levels up to max_height
+    ('has_surface', np.bool_),          # a surface level
+    ('usable_surface', np.bool_),       # a usable surface level up to max_height
+    ('max_gph', np.float64),            # highest level reached, m
+    ('min_pres', np.float64),           # lowest pressure reached, Pa
+    ('usable_max_gph', np.float64),
+    ('usable_min_pres', np.float64)
+] + [(f'missing_{name}', np.float32) for name in FLOAT_FIELDS])
+
+SOUNDING_QUALITY_DTYPE = np.dtype([
+    ('id', 'S11'),
+    ('sounding', np.int32),
+    ('year', np.int16),
+    ('month', np.int8),
+    ('day', np.int8),
+    ('hour', np.int8),
+    ('numlev', np.int32),
+    ('lat', np.int32),
+    ('lon', np.int32)
+] + QUALITY_DTYPE.descr)
+
+STATION_QUALITY_DTYPE = np.dtype([
+    ('id', 'S11'),
+    ('soundings', np.int32),
+    ('first_year', np.int16),
+    ('last_year', np.int16),
+    ('levels', np.int64),
+    ('usable_surface', np.int32),       # soundings with a usable surface level
+    ('mean_levels', np.float64),
+    ('mean_usable_low', np.float64),
+    ('max_gph', np.float64)
+] + [(f'missing_{name}', np.float32) for name in FLOAT_FIELDS])
+
+
+def quality(body: np.ndarray, counts: np.ndarray, max_height: float = MAX_HEIGHT
+            ) -> np.ndarray:
+    """Quality metrics of QUALITY_DTYPE for each sounding of the concatenated bodies of a
+    batch, counts giving the number of levels of each. The missing ratios and extremes of a
+    sounding without levels are NaN. A surface level is a record of type 21, as in the
+    Igra2 format description; types 11 and 31 don't count."""
+    counts = np.asarray(counts)
+    result = np.empty(len(counts), dtype=QUALITY_DTYPE)
+    kind = np.ascontiguousarray(body['type'], dtype='U2').view('U1').reshape(-1, 2)
+    pressure = (kind[:, 0] == '1') | (kind[:, 0] == '2')
+    surface = (kind[:, 0] == '2') & (kind[:, 1] == '1')
+    gph = body['gph']
+    pres = np.where(np.isin(body['pres'], MISSING_VALUES), np.nan, body['pres'])
+
+    present = pressure.copy()
+    for name in FLOAT_FIELDS:
+        missing = np.isnan(body[name])
+        present &= ~missing
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result[f'missing_{name}'] = count_segments(missing, counts) / counts
+    low = present & (gph <= max_height)
+
+    result['levels'] = counts
+    result['standard_levels'] = count_segments(kind[:, 0] == '1', counts)
+    result['other_levels'] = count_segments(kind[:, 0] == '2', counts)
+    result['non_pressure_levels'] = count_segments(kind[:, 0] == '3', counts)
+    result['surface_levels'] = count_segments(surface, counts)
+    result['tropopause_levels'] = count_segments(kind[:, 1] == '2', counts)
+    result['usable'] = count_segments(present, counts)
+    result['usable_low'] = count_segments(low, counts)
+    result['has_surface'] = result['surface_levels'] > 0
+    result['usable_surface'] = count_segments(low & surface, counts) > 0
+    result['max_gph'] = reduce_segments(np.fmax, gph, counts)
+    result['min_pres'] = reduce_segments(np.fmin, pres, counts)
+    result['usable_max_gph'] = reduce_segments(np.fmax, np.where(present, gph, np.nan), counts)
+    result['usable_min_pres'] = reduce_segments(np.fmin, np.where(present, pres, np.nan),
+                                                counts)
+
+    return result
+
+
+def station_quality(soundings: np.ndarray) -> np.ndarray:
+    """Summarize a table of SOUNDING_QUALITY_DTYPE per station, in STATION_QUALITY_DTYPE.
+    The missing ratios are weighted by the number of levels of each sounding."""
+    ids, station = np.unique(soundings['id'], return_inverse=True)
+    result = np.empty(len(ids), dtype=STATION_QUALITY_DTYPE)
+    levels = soundings['levels'].astype(np.float64)
+
+    def total(values) -> np.ndarray:
+        return np.bincount(station, weights=values, minlength=len(ids))
+
+    result['id'] = ids
+    result['soundings'] = np.bincount(station, minlength=len(ids))
+    result['first_year'] = np.iinfo(np.int16).max
+    result['last_year'] = np.iinfo(np.int16).min
+    np.minimum.at(result['first_year'], station, soundings['year'])
+    np.maximum.at(result['last_year'], station, soundings['year'])
+    result['levels'] = total(levels)
+    result['usable_surface'] = total(soundings['usable_surface'])
+    result['mean_levels'] = result['levels'] / result['soundings']
+    result['mean_usable_low'] = total(soundings['usable_low']) / result['soundings']
+    result['max_gph'] = np.nan
+    np.fmax.at(result['max_gph'], station, soundings['max_gph'])
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for name in FLOAT_FIELDS:
+            missing = np.nan_to_num(soundings[f'missing_{name}']) * levels
+            result[f'missing_{name}'] = total(missing) / result['levels']
+
+    return result
+
+
+def merge_station_quality(stations: np.ndarray) -> np.ndarray:
+    """Merge the rows of a table of STATION_QUALITY_DTYPE that share a station (e.g. the
+    summaries of its por and y2d files) into one row each, as station_quality would have
+    summarized their soundings together"""
+    ids, station = np.unique(stations['id'], return_inverse=True)
+    result = np.empty(len(ids), dtype=STATION_QUALITY_DTYPE)
+    soundings = stations['soundings'].astype(np.float64)
+    levels = stations['levels'].astype(np.float64)
+
+    def total(values) -> np.ndarray:
+        return np.bincount(station, weights=values, minlength=len(ids))
+
+    result['id'] = ids
+    result['soundings'] = total(soundings)
+    result['first_year'] = np.iinfo(np.int16).max
+    result['last_year'] = np.iinfo(np.int16).min
+    np.minimum.at(result['first_year'], station, stations['first_year'])
+    np.maximum.at(result['last_year'], station, stations['last_year'])
+    result['levels'] = total(levels)
+    result['usable_surface'] = total(stations['usable_surface'])
+    result['max_gph'] = np.nan
+    np.fmax.at(result['max_gph'], station, stations['max_gph'])
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result['mean_levels'] = result['levels'] / result['soundings']
+        result['mean_usable_low'] = total(
+            np.nan_to_num(stations['mean_usable_low']) * soundings) / result['soundings']
+        for name in FLOAT_FIELDS:
+            missing = np.nan_to_num(stations[f'missing_{name}']) * levels
+            result[f'missing_{name}'] = total(missing) / result['levels']
+
+    return result
+
+
+def count_segments(mask: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Count the set values of each consecutive segment of counts values"""
+    return reduce_segments(np.add, mask.astype(np.int32), counts, 0)
+
+
+def reduce_segments(ufunc: np.ufunc, values: np.ndarray, counts: np.ndarray,
+                    empty: float = np.nan) -> np.ndarray:
+    """Reduce each consecutive segment of counts values with a ufunc, empty segments
+    giving empty"""
+    result = np.full(len(counts), empty, dtype=np.result_type(values, type(empty)))
+    filled = counts > 0
+
+    if np.any(filled):
+        result[filled] = ufunc.reduceat(values, (np.cumsum(counts) - counts)[filled])
+
+    return result
+
+
+class QualityCallbacks(BatchCallbacks):
+    """Compute the quality metrics of every sounding while a file is parsed, batch_size
+    soundings at a time. When a file is finished, soundings holds its table of
+    SOUNDING_QUALITY_DTYPE: the header of each sounding alongside its metrics, so it can be
+    filtered (e.g. with SoundingFilter.mask) without going back to the bodies. The summary
+    of every station seen so far, across all of its files, is kept in stations.
+
+    A sink, if given, gets write(filename, soundings) for every file. Override accept_file
+    and accept_header to filter the data."""
+
+    def __init__(self, sink=None, batch_size: int = 1000, max_height: float = MAX_HEIGHT):
+        super().__init__(batch_size)
+        self.sink = sink
+        self.max_height = max_height
+        self.tables = []
+        self.soundings = np.empty(0, dtype=SOUNDING_QUALITY_DTYPE)
+        self.stations = np.empty(0, dtype=STATION_QUALITY_DTYPE)
+
+    def start_file(self, filename: str) -> bool:
+        """Reset the per-file state"""
+        if not super().start_file(filename):
+            return False
+
+        self.tables = []
+        return True
+
+    def finish_file(self, headers: int, rows: int, stats: ReadStats | None = None):
+        """Build the quality table of the file and add its stations to the summary"""
+        self.flush()
+        self.soundings = np.concatenate(self.tables) if self.tables else \
+            np.empty(0, dtype=SOUNDING_QUALITY_DTYPE)
+        self.tables = []
+        self.stations = merge_station_quality(
+            np.concatenate([self.stations, station_quality(self.soundings)]))
+
+        if self.sink is not None:
+            self.sink.write(self.filename, self.soundings)
+
+        print(f"Quality callback: Read {headers} headers and {rows} rows from "
+              f"{self.filename}. Measured {len(self.soundings)} soundings.")
+        if stats is not None:
+            print(f"Quality callback: {stats}")
+
+    def process_batch(self):
+        """Measure the queued soundings into a table"""
+        table = np.empty(len(self.headers), dtype=SOUNDING_QUALITY_DTYPE)
+        columns = zip(*[(h.id, s, h.year, h.month, h.day, h.hour, h.numlev, h.lat, h.lon)
+                        for s, h in self.headers])
+        for name, column in zip(HEADER_FIELDS, columns):
+            table[name] = column
+
+        counts = [len(body) for body in self.bodies]
+        metrics = quality(np.concatenate(self.bodies), counts, self.max_height)
+        for name in QUALITY_DTYPE.names:
+            table[name] = metrics[name]
+
+        self.tables.append(table)
@@ -0,0 +1,88 @@
+"""Counters and per-stage timing of reading Igra2 files"""
+import io
+import time
+from dataclasses import dataclass, fields
+
+
+@dataclass(slots=True)
+class ReadStats:
+    """Counters and per-stage timing of reading one Igra2 file, or the sum of several.
+
+    The stages don't overlap: io_seconds is reading and inflating the source,
+    header_seconds is the header filter and parse_header, body_seconds is decoding bodies,
+    skip_seconds is skipping rejected bodies and callback_seconds is the time spent in the
+    callbacks. Whatever total_seconds has left is the read loop itself."""
+    filename: str = ''
+    archive: str | None = None
+    bytes_read: int = 0
+    headers: int = 0
+    rows: int = 0
+    accepted: int = 0
+    skipped: int = 0
+    io_seconds: float = 0.0
+    header_seconds: float = 0.0
+    body_seconds: float = 0.0
+    skip_seconds: float = 0.0
+    callback_seconds: float = 0.0
+    total_seconds: float = 0.0
+
+    def add(self, other: 'ReadStats'):
+        """Add the counters and timings of another ReadStats to this one"""
+        for field in fields(self):
+            if field.type in (int, float):
+                setattr(self, field.name, getattr(self, field.name) + getattr(other, field.name))
+
+    @classmethod
+    def sum(cls, stats: list['ReadStats'], filename: str = '',
+            archive: str | None = None) -> 'ReadStats':
+        """Sum the stats of several files"""
+        result = cls(filename, archive)
+
+        for item in stats:
+            result.add(item)
+
+        return result
+
+    def __str__(self) -> str:
+        return (f"{self.filename}: {self.bytes_read / 1e6:.1f} MB, {self.headers} headers "
+                f"({self.accepted} accepted, {self.skipped} skipped), {self.rows} rows in "
+                f"{self.total_seconds:.3f}s (io {self.io_seconds:.3f}s, header "
+                f"{self.header_seconds:.3f}s, body {self.body_seconds:.3f}s, skip "
+                f"{self.skip_seconds:.3f}s, callback {self.callback_seconds:.3f}s)")
+
+
+class TimedStream(io.RawIOBase):
+    """Raw stream that counts the bytes read from a source and the time it takes. Placed
+    under a BufferedReader it is only called once per buffer refill."""
+
+    def __init__(self, raw, stats: ReadStats):
+        super().__init__()
+        self.raw = raw
+        self.stats = stats
+
+    def readinto(self, buffer) -> int:
+        start = time.perf_counter()
+        count = self.raw.readinto(buffer)
+        self.stats.io_seconds += time.perf_counter() - start
+        self.stats.bytes_read += count or 0
+        return count
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return self.raw.seekable()
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        start = time.perf_counter()
+        position = self.raw.seek(offset, whence)
+        self.stats.io_seconds += time.perf_counter() - start
+        return position
+
+    def tell(self) -> int:
+        return self.raw.tell()
+
+    def close(self):
+        if not self.closed:
+            self.raw.close()
+        super().close()
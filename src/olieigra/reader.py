@@ -1,64 +1,267 @@
 """Read an Igra2 file"""
-from .body_model import BodyModel
+import time
+from typing import Iterator
+
+import numpy as np
+
+from .body_decoder import BODY_LINE_LENGTH, decode_body, decode_chars, to_body_models, \
+    to_char_matrix
+from .body_skipper import count_lines, is_seekable_binary, seek_lines
+from .body_model import BodyModel, LazyBodyModel
 from .callbacks import Callbacks
 from .header_model import HeaderModel
+from .read_stats import ReadStats
+from .sounding_filter import SoundingFilter
+from .sounding_iterator import Sounding, SoundingBody
+from .tail_checkpoint import TailCheckpoint
 
 
 class Reader:
-    """Read an Igra2 file"""
+    """Read an Igra2 file. With lazy set, parse_body hands out LazyBodyModel records that
+    only decode the fields a callback reads. While stats is set, every sounding adds its
+    counters and per-stage timings to it."""
 
-    def __init__(self, callbacks=Callbacks()):
+    def __init__(self, callbacks=Callbacks(), header_filter: SoundingFilter | None = None,
+                 lazy: bool = False):
         self.callbacks = callbacks
+        self.header_filter = header_filter
+        self.lazy = lazy
+        self.stats: ReadStats | None = None
+        self.seek_skip = True
 
-    def parse_header(self, header_line: str) -> HeaderModel:
+    def parse_header(self, header_line: str | bytes) -> HeaderModel:
         """Parse an Igra2 header row"""
-        if header_line[0:1] != "#":
+        if header_line[0:1] not in ("#", b"#"):
             raise ValueError(f"This line isn't a header row: {header_line}")
 
         return HeaderModel(
-            header_line[1:12],              # id
-            int(header_line[13:17]),        # year
-            int(header_line[18:20]),        # month
-            int(header_line[21:23]),        # day
-            int(header_line[24:26]),        # hour
-            int(header_line[27:31]),        # reltime
-            int(header_line[32:36]),        # numlev
-            header_line[37:45].strip(),     # p_src
-            header_line[46:54].strip(),     # np_src
-            int(header_line[55:62]),        # lat
-            int(header_line[63:71])         # lon
+            as_text(header_line[1:12]),             # id
+            int(header_line[13:17]),                # year
+            int(header_line[18:20]),                # month
+            int(header_line[21:23]),                # day
+            int(header_line[24:26]),                # hour
+            int(header_line[27:31]),                # reltime
+            int(header_line[32:36]),                # numlev
+            as_text(header_line[37:45]).strip(),    # p_src
+            as_text(header_line[46:54]).strip(),    # np_src
+            int(header_line[55:62]),                # lat
+            int(header_line[63:71])                 # lon
         )
 
     def read_from_stream(self, reader) -> tuple[int, int]:
         """Read Igra2 file from stream"""
         header_count = 0
         line_count = 0
+        self.seek_skip = True
+
+        while True:
+            line = reader.readline()
+
+            if not line:
+                break
+
+            header_count += 1
+            line_count += self.read_sounding(reader, line) + 1
+
+        return header_count, line_count
+
+    def read_from_index(self, reader, entries: np.ndarray) -> tuple[int, int]:
+        """Read the soundings of a seekable Igra2 stream at the offsets of the index entries
+        the header filter selects. The counts are the ones read_from_stream would return for
+        the entries, whether or not their soundings were selected."""
+        selected = entries if self.header_filter is None else self.header_filter.select(entries)
+        self.seek_skip = True
+
+        for offset in selected['offset']:
+            reader.seek(int(offset))
+            self.read_sounding(reader, reader.readline())
+
+        if self.stats is not None:
+            self.stats.skipped += len(entries) - len(selected)
+
+        return len(entries), int(entries['numlev'].sum()) + len(entries)
+
+    def read_tail(self, reader, checkpoint: TailCheckpoint | None
+                  ) -> tuple[int, int, TailCheckpoint | None]:
+        """Read the soundings appended to a seekable binary stream since a checkpoint, or
+        all of them without one or when the checkpoint doesn't match anymore (the file was
+        rewritten rather than appended to). Returns the counts of what was read and the
+        checkpoint at the new end, None for an empty stream."""
+        if checkpoint is None or not checkpoint.matches(reader):
+            checkpoint = None
+            reader.seek(0)
+
+        header_count = 0
+        line_count = 0
+        start = None
+        self.seek_skip = True
+
+        while True:
+            position = reader.tell()
+            line = reader.readline()
+
+            if not line:
+                break
+
+            start = position
+            header_count += 1
+            line_count += self.read_sounding(reader, line) + 1
+
+        if start is not None:
+            checkpoint = TailCheckpoint.build(reader, start, reader.tell())
+
+        return header_count, line_count, checkpoint
+
+    def read_from_cache(self, cache) -> tuple[int, int]:
+        """Read the soundings of a SoundingCache instead of a stream. Soundings the header
+        filter rejects are left out up front, the counts are the ones read_from_stream would
+        return."""
+        selected = cache.select(self.header_filter)
+
+        for header, body in cache.read(selected):
+            if not self.callbacks.parse_header(header):
+                if self.stats is not None:
+                    self.stats.skipped += 1
+                continue
+
+            if self.callbacks.vectorized:
+                self.callbacks.parse_body_array(body)
+            else:
+                self.callbacks.parse_body(to_body_models(body))
+
+            if self.stats is not None:
+                self.stats.accepted += 1
+
+        if self.stats is not None:
+            self.stats.skipped += len(cache.headers) - len(selected)
+
+        return len(cache.headers), int(cache.headers['numlev'].sum()) + len(cache.headers)
+
+    def iter_soundings(self, reader, source: str = '',
+                       header_filter: SoundingFilter | None = None) -> Iterator[Sounding]:
+        """Yield the soundings of an Igra2 stream instead of calling back. A body is only
+        parsed when asked for, and skipped in bulk otherwise. header_filter defaults to the
+        one of the Reader."""
+        if header_filter is None:
+            header_filter = self.header_filter
+        self.seek_skip = True
 
         while True:
             line = reader.readline()
 
-            if line == "":
+            if not line:
                 break
 
+            if header_filter is not None and line[0:1] in ("#", b"#") and \
+                    not header_filter.accepts(line):
+                self.skip_body(reader, int(line[32:36]))
+                continue
+
             header = self.parse_header(line)
-            if self.callbacks.parse_header(header):
+            body = SoundingBody(self, reader, header.numlev)
+            yield Sounding(source, header, body)
+
+            if not body.is_read:
+                self.skip_body(reader, header.numlev)
+            body.expired = True
+
+    def read_sounding(self, reader, line: str | bytes) -> int:
+        """Process a header line and its body. Returns the number of body lines."""
+        if self.stats is not None:
+            return self.read_sounding_timed(reader, line)
+
+        if self.header_filter is not None and line[0:1] in ("#", b"#") and \
+                not self.header_filter.accepts(line):
+            numlev = int(line[32:36])
+            self.skip_body(reader, numlev)
+            return numlev
+
+        header = self.parse_header(line)
+        if self.callbacks.parse_header(header):
+            if self.callbacks.vectorized:
+                body = self.parse_body_array(reader, header.numlev)
+                self.callbacks.parse_body_array(body)
+            else:
                 body = self.parse_body(reader, header.numlev)
                 self.callbacks.parse_body(body)
-            else:
-                self.skip_body(reader, header.numlev)
+        else:
+            self.skip_body(reader, header.numlev)
 
-            header_count += 1
-            line_count += header.numlev + 1
+        return header.numlev
 
-        return header_count, line_count
+    def read_sounding_timed(self, reader, line: str | bytes) -> int:
+        """read_sounding that adds its counters and stage timings to stats. The io time of
+        the stream is taken out of the stage that triggered it."""
+        stats = self.stats
+        clock = time.perf_counter
+        start = clock()
+
+        if self.header_filter is not None and line[0:1] in ("#", b"#") and \
+                not self.header_filter.accepts(line):
+            numlev = int(line[32:36])
+            mark = clock()
+            stats.header_seconds += mark - start
+            self.skip_timed(reader, numlev, mark)
+            return numlev
+
+        header = self.parse_header(line)
+        mark = clock()
+        stats.header_seconds += mark - start
+        accepted = self.callbacks.parse_header(header)
+        start = clock()
+        stats.callback_seconds += start - mark
+
+        if not accepted:
+            self.skip_timed(reader, header.numlev, start)
+            return header.numlev
+
+        io_seconds = stats.io_seconds
+        if self.callbacks.vectorized:
+            body = self.parse_body_array(reader, header.numlev)
+            mark = clock()
+            self.callbacks.parse_body_array(body)
+        else:
+            body = self.parse_body(reader, header.numlev)
+            mark = clock()
+            self.callbacks.parse_body(body)
+
+        stats.body_seconds += mark - start - (stats.io_seconds - io_seconds)
+        stats.callback_seconds += clock() - mark
+        stats.accepted += 1
+
+        return header.numlev
+
+    def skip_timed(self, reader, records: int, start: float):
+        """skip_body, adding its time without io to stats"""
+        stats = self.stats
+        io_seconds = stats.io_seconds
+        self.skip_body(reader, records)
+        stats.skip_seconds += time.perf_counter() - start - (stats.io_seconds - io_seconds)
+        stats.skipped += 1
 
     def skip_body(self, reader, records: int):
-        """Read a body without processing it"""
+        """Read a body without processing it. Seekable streams jump past the fixed-width lines
+        and buffered binary streams count newlines in bulk. Anything else, or a file whose
+        lines turn out not to be fixed-width, falls back to reading line by line."""
+        if records == 0:
+            return
+
+        if self.seek_skip:
+            if seek_lines(reader, records):
+                return
+            self.seek_skip = False
+
+        if count_lines(reader, records):
+            return
+
         for _ in range(records):
             reader.readline()
 
-    def parse_body(self, reader, records: int) -> list[BodyModel]:
+    def parse_body(self, reader, records: int) -> list[BodyModel] | list[LazyBodyModel]:
         """Read a body with processing"""
+        if self.lazy:
+            return [LazyBodyModel(reader.readline()) for _ in range(records)]
+
         result = []
 
         for _ in range(records):
@@ -67,10 +270,25 @@ class Reader:
 
         return result
 
-    def parse_body_line(self, line: str) -> BodyModel:
+    def parse_body_array(self, reader, records: int) -> np.ndarray:
+        """Read a body as one block and decode it into a structured array. Seekable binary
+        streams read the fixed-width block in one call, without a copy if the stream offers
+        read_view (see MappedStream). Anything else reads line by line."""
+        if records > 0 and self.seek_skip and is_seekable_binary(reader):
+            start = reader.tell()
+            read = getattr(reader, 'read_view', reader.read)
+            chars = to_char_matrix(read(records * BODY_LINE_LENGTH), records)
+            if chars is not None:
+                return decode_chars(chars)
+            reader.seek(start)
+            self.seek_skip = False
+
+        return decode_body([reader.readline() for _ in range(records)])
+
+    def parse_body_line(self, line: str | bytes) -> BodyModel:
         """Parse a line from a body section"""
         return BodyModel(
-            line[0:2],                      # type
+            as_text(line[0:2]),             # type
             int(line[9:15]),                # pres
             self.parse_float(line[16:21]),  # gph
             self.parse_float(line[22:27]),  # temp
@@ -80,7 +298,7 @@ class Reader:
             self.parse_float(line[46:51])   # wspd
         )
 
-    def parse_float(self, my_slice: str) -> float:
+    def parse_float(self, my_slice: str | bytes) -> float:
         """Parse value, returning NaN for invalid/missing data"""
         result = int(my_slice)
 
@@ -88,3 +306,8 @@ class Reader:
             return float("NaN")
 
         return float(result)
+
+
+def as_text(value: str | bytes) -> str:
+    """Decode a field sliced from a binary line. Text fields are returned as they are."""
+    return value if isinstance(value, str) else value.decode('ascii')
@@ -0,0 +1,205 @@
+"""Split one crawl across several nodes, without a coordinator"""
+import json
+import os
+import socket
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Iterator
+
+from .crawler import Crawler
+from .parallel_crawler import ArchiveCache, CrawlTask, list_tasks
+
+
+@dataclass
+class ShardReport:
+    """Completion report of one or more shards of a crawl: an entry for every task a shard
+    ran, with where it was assigned, who ran it, whether the callbacks processed it and how
+    long it took (plus headers and rows for an instrumented Crawler). Reports of the same
+    crawl merge into one, in any order, so the reports of all shards tell what was done."""
+    shard_count: int
+    shards: list[int]
+    owners: list[str]
+    started: str = ''
+    finished: str = ''
+    entries: list[dict] = field(default_factory=list)
+
+    @classmethod
+    def load(cls, filename: str) -> 'ShardReport':
+        """Load a report saved as JSON"""
+        with open(filename, 'r', encoding='UTF-8') as file:
+            return cls(**json.load(file))
+
+    def save(self, filename: str):
+        """Save the report as JSON, replacing the file in one step"""
+        partial = f'{filename}.partial'
+
+        with open(partial, 'w', encoding='UTF-8') as file:
+            json.dump(asdict(self), file, indent=1)
+
+        os.replace(partial, filename)
+
+    @classmethod
+    def merge(cls, reports: list['ShardReport']) -> 'ShardReport':
+        """Merge the reports of shards of the same crawl"""
+        if len({report.shard_count for report in reports}) != 1:
+            raise ValueError("Only the reports of the same crawl can be merged")
+
+        started = [report.started for report in reports if report.started]
+        finished = [report.finished for report in reports if report.finished]
+        entries = [entry for report in reports for entry in report.entries]
+
+        return cls(reports[0].shard_count,
+                   sorted({shard for report in reports for shard in report.shards}),
+                   list(dict.fromkeys(owner for report in reports for owner in report.owners)),
+                   min(started, default=''), max(finished, default=''),
+                   sorted(entries, key=lambda entry: task_key(CrawlTask(**entry['task']))))
+
+    def missing(self, tasks: list[CrawlTask]) -> list[CrawlTask]:
+        """The tasks the report has no entry for"""
+        done = {task_key(CrawlTask(**entry['task'])) for entry in self.entries}
+        return [task for task in tasks if task_key(task) not in done]
+
+    def summary(self) -> dict:
+        """Totals of the entries: tasks, processed tasks, bytes, seconds, headers and rows"""
+        return {
+            'tasks': len(self.entries),
+            'processed': sum(entry['processed'] for entry in self.entries),
+            'size': sum(entry['task']['size'] for entry in self.entries),
+            'seconds': sum(entry['seconds'] for entry in self.entries),
+            'headers': sum(entry.get('headers', 0) for entry in self.entries),
+            'rows': sum(entry.get('rows', 0) for entry in self.entries)
+        }
+
+
+class ShardedCrawler:
+    """Crawl one shard of a directory of Igra2 files and archives, so several nodes can
+    split a crawl. Every node lists the same tasks (plain files and archive members) and
+    assign_shards deals them out deterministically, balanced by uncompressed size. The
+    Crawler does the work, with its callbacks, manifest, cache and station selection.
+
+    With a lock_dir on a filesystem shared by the nodes, a task is only run by the node
+    that creates its lock file first. A node that finished its own shard then steals the
+    tasks other shards haven't claimed yet, smallest first, so fast nodes pick up the slack
+    of slow ones. Use a fresh lock_dir for every crawl: a lock is never taken back, except
+    when its task fails."""
+
+    def __init__(self, crawler: Crawler, shard_index: int = 0, shard_count: int = 1,
+                 lock_dir: str | None = None, owner: str | None = None):
+        if not 0 <= shard_index < shard_count:
+            raise ValueError(f"Invalid shard {shard_index} of {shard_count}")
+
+        self.crawler = crawler
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.lock_dir = lock_dir
+        self.owner = owner or f'{socket.gethostname()}-{os.getpid()}'
+        self.archives = ArchiveCache()
+
+    def crawl(self, path: str) -> ShardReport:
+        """Crawl the shard of a directory and report the tasks that were run"""
+        report = ShardReport(self.shard_count, [self.shard_index], [self.owner],
+                             started=datetime.now().isoformat())
+        tasks = list_tasks(self.crawler.io, path, self.crawler.stations)
+        shards = assign_shards(tasks, self.shard_count)
+
+        if self.lock_dir is not None:
+            os.makedirs(self.lock_dir, exist_ok=True)
+
+        try:
+            for task, shard in self.schedule(tasks, shards):
+                if self.lock_dir is None or claim(self.lock_dir, task, self.owner):
+                    report.entries.append(self.run(task, shard))
+        finally:
+            self.archives.close()
+
+        report.finished = datetime.now().isoformat()
+        return report
+
+    def schedule(self, tasks: list[CrawlTask], shards: list[int]
+                 ) -> Iterator[tuple[CrawlTask, int]]:
+        """The tasks of this shard, largest first. With a lock_dir, followed by the tasks of
+        the other shards to steal, smallest first."""
+        yield from ((task, shard) for task, shard in zip(tasks, shards)
+                    if shard == self.shard_index)
+
+        if self.lock_dir is None:
+            return
+
+        for offset in range(1, self.shard_count):
+            victim = (self.shard_index + offset) % self.shard_count
+            yield from ((task, shard) for task, shard in zip(reversed(tasks), reversed(shards))
+                        if shard == victim)
+
+    def run(self, task: CrawlTask, shard: int) -> dict:
+        """Offer a task to the Crawler and describe how it went. A task that fails gives
+        its lock back."""
+        start = time.perf_counter()
+        stats = len(self.crawler.file_stats)
+
+        try:
+            if task.archive is None:
+                processed = self.crawler.offer_file(task.path, task.filename)
+            else:
+                archive_path = f'{task.path}/{task.archive}'
+                archive = self.archives.open(self.crawler.io, archive_path)
+                processed = self.crawler.offer_member(archive_path, archive,
+                                                      archive.getinfo(task.filename))
+        except Exception:
+            if self.lock_dir is not None:
+                release(self.lock_dir, task)
+            raise
+
+        entry = {'task': asdict(task), 'shard': shard, 'owner': self.owner,
+                 'processed': processed, 'seconds': time.perf_counter() - start}
+
+        if len(self.crawler.file_stats) > stats:
+            entry['headers'] = self.crawler.file_stats[-1].headers
+            entry['rows'] = self.crawler.file_stats[-1].rows
+
+        return entry
+
+
+def assign_shards(tasks: list[CrawlTask], shard_count: int) -> list[int]:
+    """Assign every task to a shard, largest task first to the shard with the fewest bytes
+    so far (lowest index on a tie). The result only depends on the names and sizes of the
+    tasks, not on their order, so every node computes the same assignment."""
+    order = sorted(range(len(tasks)), key=lambda i: (-tasks[i].size, task_key(tasks[i])))
+    loads = [0] * shard_count
+    result = [0] * len(tasks)
+
+    for i in order:
+        shard = loads.index(min(loads))
+        result[i] = shard
+        loads[shard] += tasks[i].size
+
+    return result
+
+
+def task_key(task: CrawlTask) -> str:
+    """Name of a task, unique within a crawl"""
+    return task.filename if task.archive is None else f'{task.archive}/{task.filename}'
+
+
+def lock_filename(lock_dir: str, task: CrawlTask) -> str:
+    """The lock file of a task"""
+    return f"{lock_dir}/{task_key(task).replace('/', '.')}.lock"
+
+
+def claim(lock_dir: str, task: CrawlTask, owner: str) -> bool:
+    """Claim a task by creating its lock file, which fails if another node created it
+    first. Returns whether the task was claimed."""
+    try:
+        descriptor = os.open(lock_filename(lock_dir, task), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return False
+
+    with os.fdopen(descriptor, 'w', encoding='UTF-8') as file:
+        file.write(f'{owner}\n')
+
+    return True
+
+
+def release(lock_dir: str, task: CrawlTask):
+    """Give the claim of a task back"""
+    os.remove(lock_filename(lock_dir, task))
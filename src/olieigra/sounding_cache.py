@@ -0,0 +1,230 @@
+"""Compact binary cache of the parsed soundings of an Igra2 file"""
+import os
+from typing import IO, Iterator
+
+import numpy as np
+
+from .body_decoder import BODY_DTYPE, FLOAT_FIELDS
+from .header_model import HeaderModel
+from .reader import Reader
+from .sounding_filter import SoundingFilter
+from .sounding_iterator import Sounding, SoundingBody
+
+CACHE_VERSION = 1
+BATCH_SIZE = 4096
+
+CACHE_KEY_DTYPE = np.dtype([
+    ('version', np.int32),
+    ('size', np.int64),
+    ('crc', np.int64),
+    ('mtime', 'U32')
+])
+
+CACHE_HEADER_DTYPE = np.dtype([
+    ('id', 'S11'),
+    ('year', np.int16),
+    ('month', np.int8),
+    ('day', np.int8),
+    ('hour', np.int8),
+    ('reltime', np.int16),
+    ('numlev', np.int32),
+    ('p_src', 'S8'),
+    ('np_src', 'S8'),
+    ('lat', np.int32),
+    ('lon', np.int32),
+    ('start', np.int64)
+])
+
+# The Igra2 values in their scaled integer units. A missing value is stored as 0 with its
+# bit in the valid mask cleared, bit i standing for FLOAT_FIELDS[i].
+CACHE_LEVEL_DTYPE = np.dtype([
+    ('type', 'S2'),
+    ('pres', np.int32),
+    ('gph', np.int32),
+    ('temp', np.int16),
+    ('rh', np.int16),
+    ('dpdp', np.int16),
+    ('wdir', np.int16),
+    ('wspd', np.int16)
+])
+
+
+class SoundingCache:
+    """Compact binary cache of the parsed soundings of an Igra2 file: a header table, the
+    levels as int16/int32 columns and a validity mask, about a third of the text size.
+    The size, CRC and modification time of the source are stored with it so a stale cache
+    is detected. A cache is a directory of .npy files, loaded memory mapped."""
+
+    def __init__(self, headers: np.ndarray, levels: np.ndarray, valid: np.ndarray, size: int,
+                 crc: int = 0, mtime: str = ''):
+        self.headers = headers
+        self.levels = levels
+        self.valid = valid
+        self.size = size
+        self.crc = crc
+        self.mtime = mtime
+
+    @staticmethod
+    def build(stream: IO[bytes], size: int, crc: int = 0, mtime: str = '') -> 'SoundingCache':
+        """Parse every sounding of a binary Igra2 stream into a cache. Throws a ValueError
+        when a value doesn't fit its column."""
+        headers = []
+        bodies = []
+        start = 0
+
+        for sounding in Reader().iter_soundings(stream):
+            header = sounding.header
+            headers.append((header.id, header.year, header.month, header.day, header.hour,
+                            header.reltime, header.numlev, header.p_src, header.np_src,
+                            header.lat, header.lon, start))
+            bodies.append(sounding.body.array())
+            start += header.numlev
+
+        levels, valid = pack_body(np.concatenate(bodies) if bodies else
+                                  np.empty(0, dtype=BODY_DTYPE))
+
+        return SoundingCache(np.array(headers, dtype=CACHE_HEADER_DTYPE), levels, valid, size,
+                             crc, mtime)
+
+    @staticmethod
+    def load(path: str, mmap_mode: str | None = 'r') -> 'SoundingCache':
+        """Load a cache directory, memory mapping the arrays by default"""
+        key = np.load(f'{path}/key.npy')[0]
+        if key['version'] != CACHE_VERSION:
+            raise ValueError(f"Unsupported cache version {key['version']}")
+
+        return SoundingCache(np.load(f'{path}/headers.npy', mmap_mode=mmap_mode),
+                             np.load(f'{path}/levels.npy', mmap_mode=mmap_mode),
+                             np.load(f'{path}/valid.npy', mmap_mode=mmap_mode),
+                             int(key['size']), int(key['crc']), str(key['mtime']))
+
+    def save(self, path: str):
+        """Save the cache to a directory. The key is written last, so a cache interrupted
+        while saving is never loaded."""
+        os.makedirs(path, exist_ok=True)
+        for name in ('key.npy', 'unfit.npy'):
+            if os.path.exists(f'{path}/{name}'):
+                os.remove(f'{path}/{name}')
+
+        np.save(f'{path}/headers.npy', self.headers)
+        np.save(f'{path}/levels.npy', self.levels)
+        np.save(f'{path}/valid.npy', self.valid)
+        np.save(f'{path}/key.npy', np.array([(CACHE_VERSION, self.size, self.crc, self.mtime)],
+                                            dtype=CACHE_KEY_DTYPE))
+
+    @staticmethod
+    def mark_unfit(path: str, size: int, crc: int = 0, mtime: str = ''):
+        """Record in a cache directory that the source of this size, CRC and mtime doesn't
+        fit a cache, so it isn't built again until the source changes"""
+        os.makedirs(path, exist_ok=True)
+        if os.path.exists(f'{path}/key.npy'):
+            os.remove(f'{path}/key.npy')
+
+        np.save(f'{path}/unfit.npy', np.array([(CACHE_VERSION, size, crc, mtime)],
+                                              dtype=CACHE_KEY_DTYPE))
+
+    @staticmethod
+    def is_unfit(path: str, size: int, crc: int = 0, mtime: str = '') -> bool:
+        """Check if a cache directory records that this source doesn't fit a cache"""
+        if not os.path.exists(f'{path}/unfit.npy'):
+            return False
+
+        key = np.load(f'{path}/unfit.npy')[0]
+        return key.tolist() == (CACHE_VERSION, size, crc, mtime)
+
+    def matches(self, size: int, crc: int = 0, mtime: str = '') -> bool:
+        """Check if the cache was built from a source of this size, CRC and mtime"""
+        return self.size == size and self.crc == crc and self.mtime == mtime
+
+    def header(self, i: int) -> HeaderModel:
+        """The header of sounding i"""
+        return to_header_model(self.headers[i].tolist())
+
+    def body(self, i: int) -> np.ndarray:
+        """The body of sounding i as a structured array of BODY_DTYPE"""
+        start = int(self.headers['start'][i])
+        end = start + int(self.headers['numlev'][i])
+
+        return unpack_body(self.levels[start:end], self.valid[start:end])
+
+    def select(self, header_filter: SoundingFilter | None) -> np.ndarray:
+        """The positions of the soundings the header filter accepts"""
+        if header_filter is None:
+            return np.arange(len(self.headers))
+
+        return np.flatnonzero(header_filter.mask(self.headers))
+
+    def read(self, selected: np.ndarray) -> Iterator[tuple[HeaderModel, np.ndarray]]:
+        """Yield the header and body of the selected soundings. The bodies are unpacked
+        BATCH_SIZE soundings at a time rather than one by one."""
+        levels = np.asarray(self.levels)
+        valid = np.asarray(self.valid)
+
+        for first in range(0, len(selected), BATCH_SIZE):
+            headers = np.asarray(self.headers)[selected[first:first + BATCH_SIZE]]
+            rows = row_positions(headers['start'], headers['numlev'])
+            bodies = unpack_body(levels[rows], valid[rows])
+            ends = np.cumsum(headers['numlev'])
+
+            for row, body in zip(headers.tolist(), np.split(bodies, ends[:-1])):
+                yield to_header_model(row), body
+
+    def iter_soundings(self, source: str = '', header_filter: SoundingFilter | None = None
+                       ) -> Iterator[Sounding]:
+        """Yield the soundings the header filter accepts, with their bodies decoded"""
+        for header, array in self.read(self.select(header_filter)):
+            body = SoundingBody(None, None, header.numlev)
+            body.value = array
+            yield Sounding(source, header, body)
+
+
+def pack_body(body: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Pack a decoded body into cache levels and their valid mask"""
+    levels = np.empty(len(body), dtype=CACHE_LEVEL_DTYPE)
+    valid = np.zeros(len(body), dtype=np.uint8)
+    levels['type'] = body['type'].astype('S2')
+    levels['pres'] = body['pres']
+
+    for bit, name in enumerate(FLOAT_FIELDS):
+        present = ~np.isnan(body[name])
+        values = np.where(present, body[name], 0)
+        limit = np.iinfo(CACHE_LEVEL_DTYPE[name]).max
+        if np.any(np.abs(values) > limit):
+            raise ValueError(f"A {name} value doesn't fit the cache")
+        levels[name] = values
+        valid |= present.astype(np.uint8) << bit
+
+    return levels, valid
+
+
+def unpack_body(levels: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """Unpack cache levels into a decoded body of BODY_DTYPE"""
+    body = np.empty(len(levels), dtype=BODY_DTYPE)
+    body['type'] = levels['type']
+    body['pres'] = levels['pres']
+
+    for bit, name in enumerate(FLOAT_FIELDS):
+        body[name] = np.where(valid & (1 << bit), levels[name], np.nan)
+
+    return body
+
+
+def row_positions(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """The level rows of soundings starting at starts with counts levels each, in order"""
+    ends = np.cumsum(counts)
+    return np.arange(ends[-1] if len(ends) else 0) + np.repeat(starts - ends + counts, counts)
+
+
+def to_header_model(row: tuple) -> HeaderModel:
+    """Convert a row of the header table into a HeaderModel"""
+    return HeaderModel(row[0].decode(), *row[1:7], row[7].decode(), row[8].decode(), row[9],
+                       row[10])
+
+
+def cache_path(cache_dir: str, filename: str, member: str | None = None) -> str:
+    """The cache directory of an Igra2 file, or of a member within a zip archive"""
+    name = os.path.basename(filename)
+    if member is None:
+        return f'{cache_dir}/{name}.cache'
+
+    return f'{cache_dir}/{name}.{member}.cache'
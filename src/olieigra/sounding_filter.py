@@ -0,0 +1,94 @@
+"""Select soundings by date range, hour, station, number of levels and location"""
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+
+
+@dataclass
+class SoundingFilter:
+    """Select soundings by date range, hour, station, number of levels and location. The
+    start date is inclusive and the end date is exclusive. The bounding box is
+    (min_lat, min_lon, max_lat, max_lon) in degrees. None means unbounded.
+
+    accepts is evaluated against the raw header line, before a HeaderModel is built, so
+    rejected soundings only cost a few integer conversions and a bulk body skip."""
+    start: date | None = None
+    end: date | None = None
+    hours: set[int] | None = None
+    stations: set[str] | None = None
+    min_numlev: int | None = None
+    bbox: tuple[float, float, float, float] | None = None
+
+    def accepts(self, header_line: str | bytes) -> bool:
+        """Check a raw header line against the filter"""
+        if self.stations is not None:
+            station = header_line[1:12]
+            if (station if isinstance(station, str) else station.decode()) not in self.stations:
+                return False
+
+        if self.hours is not None and int(header_line[24:26]) not in self.hours:
+            return False
+
+        if self.min_numlev is not None and int(header_line[32:36]) < self.min_numlev:
+            return False
+
+        if self.start is not None or self.end is not None:
+            key = int(header_line[13:17]) * 10000 + int(header_line[18:20]) * 100 + \
+                int(header_line[21:23])
+            if self.start is not None and key < date_key(self.start):
+                return False
+            if self.end is not None and key >= date_key(self.end):
+                return False
+
+        if self.bbox is not None:
+            lat = int(header_line[55:62]) / 10000
+            lon = int(header_line[63:71]) / 10000
+            if not (self.bbox[0] <= lat <= self.bbox[2] and self.bbox[1] <= lon <= self.bbox[3]):
+                return False
+
+        return True
+
+    def select(self, entries: np.ndarray) -> np.ndarray:
+        """Return the index entries that match the filter"""
+        return entries[self.mask(entries)]
+
+    def mask(self, entries: np.ndarray) -> np.ndarray:
+        """Mask the index entries or header table rows that match the filter. The bounding
+        box is only checked for tables with a location (lat, lon scaled by 10000), the index
+        has none so it is left to accepts."""
+        keys = date_keys(entries['year'], entries['month'], entries['day'])
+        mask = np.ones(len(entries), dtype=bool)
+
+        if self.start is not None:
+            mask &= keys >= date_key(self.start)
+
+        if self.end is not None:
+            mask &= keys < date_key(self.end)
+
+        if self.hours is not None:
+            mask &= np.isin(entries['hour'], list(self.hours))
+
+        if self.stations is not None:
+            mask &= np.isin(entries['id'], [station.encode() for station in self.stations])
+
+        if self.min_numlev is not None:
+            mask &= entries['numlev'] >= self.min_numlev
+
+        if self.bbox is not None and 'lat' in entries.dtype.names:
+            lat = entries['lat'] / 10000
+            lon = entries['lon'] / 10000
+            mask &= (lat >= self.bbox[0]) & (lat <= self.bbox[2]) & \
+                (lon >= self.bbox[1]) & (lon <= self.bbox[3])
+
+        return mask
+
+
+def date_key(value: date) -> int:
+    """Convert a date into a sortable yyyymmdd integer"""
+    return value.year * 10000 + value.month * 100 + value.day
+
+
+def date_keys(year: np.ndarray, month: np.ndarray, day: np.ndarray) -> np.ndarray:
+    """Convert date columns into sortable yyyymmdd integers"""
+    return year.astype(np.int32) * 10000 + month.astype(np.int32) * 100 + day
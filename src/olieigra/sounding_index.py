@@ -0,0 +1,89 @@
+"""Byte-offset index of the soundings in an Igra2 file"""
+from typing import IO
+
+import numpy as np
+
+from .body_decoder import BODY_LINE_LENGTH
+from .body_skipper import seek_lines
+
+INDEX_SUFFIX = '.idx.npz'
+
+INDEX_DTYPE = np.dtype([
+    ('id', 'S11'),
+    ('year', np.int16),
+    ('month', np.int8),
+    ('day', np.int8),
+    ('hour', np.int8),
+    ('numlev', np.int32),
+    ('offset', np.int64)
+])
+
+
+class SoundingIndex:
+    """Byte-offset index of the soundings in an Igra2 file. The size and modification time
+    (or CRC for archive members) of the source are stored with the entries so a stale index
+    can be detected."""
+
+    def __init__(self, entries: np.ndarray, size: int, crc: int = 0, mtime: str = ''):
+        self.entries = entries
+        self.size = size
+        self.crc = crc
+        self.mtime = mtime
+
+    @staticmethod
+    def build(stream: IO[bytes], size: int, crc: int = 0, mtime: str = '') -> 'SoundingIndex':
+        """Scan a binary stream and record the position of every header"""
+        rows = []
+        offset = 0
+
+        while True:
+            line = stream.readline()
+
+            if line == b"":
+                break
+
+            if line[0:1] != b"#":
+                raise ValueError(f"This line isn't a header row: {line}")
+
+            numlev = int(line[32:36])
+            rows.append((line[1:12], int(line[13:17]), int(line[18:20]), int(line[21:23]),
+                         int(line[24:26]), numlev, offset))
+            offset += len(line)
+
+            if numlev > 0 and seek_lines(stream, numlev):
+                offset += numlev * BODY_LINE_LENGTH
+            else:
+                for _ in range(numlev):
+                    offset += len(stream.readline())
+
+        return SoundingIndex(np.array(rows, dtype=INDEX_DTYPE), size, crc, mtime)
+
+    @staticmethod
+    def load(filename: str) -> 'SoundingIndex':
+        """Load an index from a sidecar file. Sidecars saved without a modification time
+        load with an empty one."""
+        with np.load(filename) as data:
+            mtime = str(data['mtime']) if 'mtime' in data else ''
+            return SoundingIndex(data['entries'], int(data['size']), int(data['crc']), mtime)
+
+    def save(self, filename: str):
+        """Save the index to a sidecar file"""
+        with open(filename, 'wb') as file:
+            np.savez(file, entries=self.entries, size=self.size, crc=self.crc, mtime=self.mtime)
+
+    def matches(self, size: int, crc: int = 0, mtime: str = '') -> bool:
+        """Check if the index was built from a source of this size, CRC and mtime"""
+        return self.size == size and self.crc == crc and self.mtime == mtime
+
+
+def index_filename(filename: str, member: str | None = None) -> str:
+    """The sidecar filename of an Igra2 file, or of a member within a zip archive"""
+    if member is None:
+        return f'{filename}{INDEX_SUFFIX}'
+
+    return f'{filename}.{member}{INDEX_SUFFIX}'
+
+
+def is_sidecar(filename: str) -> bool:
+    """Whether a file is a sidecar index rather than data, so crawlers pass it by"""
+    return filename.endswith(INDEX_SUFFIX)
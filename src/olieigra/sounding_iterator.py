@@ -0,0 +1,76 @@
+"""Soundings yielded by the iter_soundings generators"""
+from typing import Iterable, Iterator, NamedTuple
+
+import numpy as np
+
+from .body_decoder import to_body_array, to_body_models
+from .body_model import BodyModel
+from .header_model import HeaderModel
+
+
+class SoundingBody:
+    """Body of a sounding yielded by iter_soundings. It is only read from the stream when
+    models() or array() is called, and skipped in bulk otherwise. Ask for it before
+    advancing the iterator: once the stream moves on the body can't be read anymore."""
+    __slots__ = ('reader', 'stream', 'records', 'value', 'expired')
+
+    def __init__(self, reader, stream, records: int):
+        self.reader = reader
+        self.stream = stream
+        self.records = records
+        self.value = None
+        self.expired = False
+
+    @property
+    def is_read(self) -> bool:
+        """Check if the body was taken from the stream"""
+        return self.value is not None
+
+    def models(self) -> list[BodyModel]:
+        """The body as BodyModel records (LazyBodyModel for a lazy Reader)"""
+        value = self.read(False)
+        return value if isinstance(value, list) else to_body_models(value)
+
+    def array(self) -> np.ndarray:
+        """The body as a structured array of BODY_DTYPE"""
+        value = self.read(True)
+        return value if isinstance(value, np.ndarray) else to_body_array(value)
+
+    def read(self, vectorized: bool) -> list[BodyModel] | np.ndarray:
+        """Read the body from the stream the first time it is asked for"""
+        if self.value is None:
+            if self.expired:
+                raise ValueError("The body must be read before the iterator is advanced")
+
+            if vectorized:
+                self.value = self.reader.parse_body_array(self.stream, self.records)
+            else:
+                self.value = self.reader.parse_body(self.stream, self.records)
+
+        return self.value
+
+
+class Sounding(NamedTuple):
+    """A sounding: where it came from, its header and its body. The body is a SoundingBody
+    as yielded by iter_soundings, or the decoded body once batched."""
+    source: str
+    header: HeaderModel
+    body: SoundingBody | list[BodyModel] | np.ndarray
+
+
+def batched(soundings: Iterable[Sounding], size: int,
+            vectorized: bool = True) -> Iterator[list[Sounding]]:
+    """Group soundings into lists of up to size. Each body is read as it is pulled in,
+    as a structured array or as list[BodyModel], so a batch outlives the stream position."""
+    batch = []
+
+    for sounding in soundings:
+        body = sounding.body.array() if vectorized else sounding.body.models()
+        batch.append(sounding._replace(body=body))
+
+        if len(batch) == size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
@@ -0,0 +1,172 @@
+"""Catalog of the Igra2 stations, from igra2-station-list.txt"""
+import re
+from dataclasses import dataclass
+
+import numpy as np
+
+from .io_wrapper import IOWrapper
+
+EARTH_RADIUS_KM = 6371.0
+STATION_FILE = re.compile(r'([A-Z0-9]{11})-')
+
+
+@dataclass(slots=True)
+class Station:
+    """A line of the Igra2 station list"""
+    id: str
+    lat: float
+    lon: float
+    elevation: float
+    state: str
+    name: str
+    first_year: int
+    last_year: int
+    nobs: int
+
+
+class StationCatalog:
+    """Catalog of the Igra2 stations, with lookups by bounding box, radius, maidenhead
+    locator and active years. Each lookup returns a set of station ids, so they combine with
+    & and | and can be handed to the Crawler or a SoundingFilter as a station selection.
+
+    The stations are kept sorted by latitude, so spatial lookups only examine the latitude
+    band they cover."""
+
+    def __init__(self, stations: list[Station]):
+        self.stations = sorted(stations, key=lambda station: station.lat)
+        self.by_id = {station.id: station for station in self.stations}
+        self.ids = np.array([station.id for station in self.stations], dtype=str)
+        self.lat = np.array([station.lat for station in self.stations], dtype=np.float64)
+        self.lon = np.array([station.lon for station in self.stations], dtype=np.float64)
+        self.first_year = np.array([s.first_year for s in self.stations], dtype=np.int32)
+        self.last_year = np.array([s.last_year for s in self.stations], dtype=np.int32)
+
+    @classmethod
+    def load(cls, filename: str, io=IOWrapper()) -> 'StationCatalog':
+        """Load igra2-station-list.txt"""
+        with io.open_file(filename) as reader:
+            return cls([parse_station_line(line) for line in reader if line.strip()])
+
+    def __len__(self) -> int:
+        return len(self.stations)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.by_id
+
+    def __getitem__(self, key: str) -> Station:
+        return self.by_id[key]
+
+    def in_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float
+                ) -> set[str]:
+        """The stations within a box, edges included. A box with min_lon above max_lon
+        crosses the antimeridian."""
+        band = self.band(min_lat, max_lat)
+        lon = self.lon[band]
+
+        if min_lon <= max_lon:
+            inside = (lon >= min_lon) & (lon <= max_lon)
+        else:
+            inside = (lon >= min_lon) | (lon <= max_lon)
+
+        return set(self.ids[band][inside].tolist())
+
+    def within(self, lat: float, lon: float, radius_km: float) -> set[str]:
+        """The stations within a great circle distance of a point"""
+        spread = np.degrees(radius_km / EARTH_RADIUS_KM)
+        band = self.band(lat - spread, lat + spread)
+        inside = haversine(lat, lon, self.lat[band], self.lon[band]) <= radius_km
+
+        return set(self.ids[band][inside].tolist())
+
+    def nearest(self, lat: float, lon: float, limit: int) -> list[str]:
+        """The limit stations closest to a point, closest first"""
+        order = np.argsort(haversine(lat, lon, self.lat, self.lon), kind='stable')
+        return self.ids[order[:limit]].tolist()
+
+    def in_maidenhead(self, locator: str) -> set[str]:
+        """The stations within a maidenhead grid field, square or subsquare (e.g. 'EM',
+        'EM12' or 'EM12ab')"""
+        return self.in_bbox(*maidenhead_bbox(locator))
+
+    def active(self, first_year: int, last_year: int) -> set[str]:
+        """The stations with observations in any year from first_year to last_year"""
+        inside = (self.first_year <= last_year) & (self.last_year >= first_year)
+        return set(self.ids[inside].tolist())
+
+    def band(self, min_lat: float, max_lat: float) -> slice:
+        """The slice of the stations with a latitude from min_lat to max_lat"""
+        return slice(np.searchsorted(self.lat, min_lat, 'left'),
+                     np.searchsorted(self.lat, max_lat, 'right'))
+
+
+def parse_station_line(line: str) -> Station:
+    """Parse a fixed-width line of igra2-station-list.txt"""
+    return Station(
+        line[0:11],                     # id
+        float(line[12:20]),             # latitude
+        float(line[21:30]),             # longitude
+        float(line[31:37]),             # elevation
+        line[38:40].strip(),            # state
+        line[41:71].strip(),            # name
+        int(line[72:76]),               # first year
+        int(line[77:81]),               # last year
+        int(line[82:88])                # number of observations
+    )
+
+
+def station_id(filename: str) -> str | None:
+    """The station id an Igra2 file or archive is named after (e.g. USM00072201-data.txt
+    or USM00072201-data.txt.zip), None if the name doesn't start with one"""
+    match = STATION_FILE.match(filename.rsplit('/', 1)[-1])
+    return None if match is None else match.group(1)
+
+
+def in_selection(stations: set[str] | None, filename: str, archive: bool = False) -> bool:
+    """Whether a file belongs to a station selection, None selecting every file. Files that
+    are not named after a station are left out, except archives, which may hold members of
+    several stations."""
+    if stations is None:
+        return True
+
+    station = station_id(filename)
+    return archive if station is None else station in stations
+
+
+def maidenhead_bbox(locator: str) -> tuple[float, float, float, float]:
+    """The (min_lat, min_lon, max_lat, max_lon) of a maidenhead locator of 2 to 8
+    characters"""
+    if len(locator) not in (2, 4, 6, 8):
+        raise ValueError(f"Invalid maidenhead locator {locator}")
+
+    locator = locator.upper()
+    lat, lon = -90.0, -180.0
+    lat_size, lon_size = 180.0, 360.0
+
+    for pair in range(len(locator) // 2):
+        divisions = 18 if pair == 0 else 10 if pair % 2 == 1 else 24
+        lon_index, lat_index = (maidenhead_index(c, divisions) for c in locator[2 * pair:][:2])
+        lat_size /= divisions
+        lon_size /= divisions
+        lat += lat_index * lat_size
+        lon += lon_index * lon_size
+
+    return lat, lon, lat + lat_size, lon + lon_size
+
+
+def maidenhead_index(character: str, divisions: int) -> int:
+    """Decode a character of a maidenhead pair, a letter or a digit for squares"""
+    index = int(character) if divisions == 10 and character.isdigit() else \
+        ord(character) - ord('A')
+
+    if not 0 <= index < divisions or (divisions == 10) != character.isdigit():
+        raise ValueError(f"Invalid maidenhead character {character}")
+
+    return index
+
+
+def haversine(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great circle distance in km from a point to each of the points"""
+    lat, lon, lats, lons = (np.radians(value) for value in (lat, lon, lats, lons))
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
@@ -0,0 +1,107 @@
+"""Generate deterministic, realistic looking Igra2 files for tests and benchmarks"""
+import math
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+from zipfile import ZIP_DEFLATED, ZipFile
+
+MISSING = -9999
+REMOVED = -8888
+
+
+@dataclass
+class SyntheticIgra2:
+    """Generate deterministic, realistic looking Igra2 files for tests and benchmarks.
+
+    Every station gets soundings for each day of the years at each of the hours, each with
+    the given number of levels. A missing_ratio share of the measured values is set to the
+    missing or removed sentinel. The same settings always produce the same bytes."""
+    stations: int = 1
+    start_year: int = 2000
+    years: int = 1
+    hours: tuple[int, ...] = (0, 12)
+    levels: int = 100
+    missing_ratio: float = 0.1
+    seed: int = 42
+
+    def station_ids(self) -> list[str]:
+        """The station ids, in the fixed-width Igra2 layout"""
+        return [f'USM000{72201 + i:05d}' for i in range(self.stations)]
+
+    def filenames(self) -> list[str]:
+        """The Igra2 file names of the stations"""
+        return [f'{station}-data.txt' for station in self.station_ids()]
+
+    def soundings(self) -> int:
+        """The number of soundings in one station file"""
+        days = (date(self.start_year + self.years, 1, 1) - date(self.start_year, 1, 1)).days
+        return days * len(self.hours)
+
+    def station_bytes(self, station: int) -> bytes:
+        """Generate the Igra2 file of a station"""
+        rng = random.Random(self.seed * 100003 + station)
+        station_id = self.station_ids()[station]
+        lat = 300000 + rng.randint(0, 200000)
+        lon = -1200000 + rng.randint(0, 450000)
+        lines = []
+        day = date(self.start_year, 1, 1)
+        end = date(self.start_year + self.years, 1, 1)
+
+        while day < end:
+            for hour in self.hours:
+                lines.append(header_line(station_id, day, hour, self.levels, lat, lon))
+                lines.extend(self.body_lines(rng))
+            day += timedelta(days=1)
+
+        return ''.join(lines).encode('ascii')
+
+    def body_lines(self, rng: random.Random) -> list[str]:
+        """Generate the body of a sounding, from the surface up"""
+        lines = []
+        top = rng.uniform(20000, 33000)
+
+        for level in range(self.levels):
+            gph = 150 + top * level / max(self.levels - 1, 1) + rng.uniform(-20, 20)
+            pres = int(101325 * math.exp(-gph / 7400))
+            temp = (15 - 6.5 * min(gph, 11000) / 1000 + rng.uniform(-5, 5)) * 10
+            values = [gph, temp, rng.uniform(50, 1000), rng.uniform(0, 300), rng.randrange(360),
+                      rng.uniform(0, 400)]
+            values = [self.maybe_missing(rng, int(value)) for value in values]
+            level_type = '21' if level == 0 else rng.choice(['10', '20'])
+            lines.append(body_line(level_type, pres, *values))
+
+        return lines
+
+    def maybe_missing(self, rng: random.Random, value: int) -> int:
+        """Replace a value by a sentinel with probability missing_ratio"""
+        if rng.random() < self.missing_ratio:
+            return rng.choice([MISSING, REMOVED])
+
+        return value
+
+    def write_directory(self, path: str) -> list[str]:
+        """Write one plain Igra2 file per station into a folder"""
+        for station, filename in enumerate(self.filenames()):
+            with open(f'{path}/{filename}', 'wb') as file:
+                file.write(self.station_bytes(station))
+
+        return self.filenames()
+
+    def write_archive(self, filename: str):
+        """Write every station into one deflated zip archive, like the NCEI downloads"""
+        with ZipFile(filename, 'w', ZIP_DEFLATED) as archive:
+            for station, member in enumerate(self.filenames()):
+                archive.writestr(member, self.station_bytes(station))
+
+
+def header_line(station_id: str, day: date, hour: int, numlev: int, lat: int, lon: int) -> str:
+    """Format a header line in the fixed-width Igra2 layout"""
+    return f'#{station_id:11s} {day.year:4d} {day.month:02d} {day.day:02d} {hour:02d} ' \
+        f'{hour:02d}00 {numlev:4d} {"ncdc-gts":8s} {"ncdc-gts":8s} {lat:7d} {lon:8d}\n'
+
+
+def body_line(level_type: str, pres: int, gph: int, temp: int, rh: int, dpdp: int, wdir: int,
+              wspd: int) -> str:
+    """Format a body line in the fixed-width Igra2 layout"""
+    return f'{level_type:2s}    -8 {pres:6d}B{gph:5d}B{temp:5d}B{rh:5d} {dpdp:5d} ' \
+        f'{wdir:5d} {wspd:5d} \n'
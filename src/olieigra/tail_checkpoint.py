@@ -0,0 +1,57 @@
+"""Where the processing of an append-only Igra2 file stopped, to resume at its tail"""
+import zlib
+from dataclasses import dataclass
+
+HEAD_SIZE = 1 << 16
+
+
+@dataclass
+class TailCheckpoint:
+    """Where the processing of an append-only Igra2 file stopped: the offset past the last
+    sounding read, the offset and key (id, date and hour) of that sounding, and the CRC32 of
+    its bytes and of the head of the file. If those still match, the file only grew at the
+    end and reading can resume at offset."""
+    offset: int
+    start: int
+    key: str
+    crc: int
+    head_crc: int
+
+    @classmethod
+    def build(cls, stream, start: int, offset: int) -> 'TailCheckpoint':
+        """Checkpoint a seekable binary stream after the sounding from start to offset. The
+        stream is left at offset."""
+        head_crc, key, crc = fingerprint(stream, start, offset)
+        return cls(offset, start, key, crc, head_crc)
+
+    def matches(self, stream) -> bool:
+        """Check if a seekable binary stream starts with the bytes the checkpoint was taken
+        of. The stream is left at offset when it does. Only the head of the stream and the
+        last sounding are read, so forward-only streams like archive members work too."""
+        if not stream.seekable():
+            return False
+
+        try:
+            return fingerprint(stream, self.start, self.offset) == \
+                (self.head_crc, self.key, self.crc)
+        except ValueError:
+            return False
+
+
+def fingerprint(stream, start: int, offset: int) -> tuple[int, str, int]:
+    """The CRC32 of the head of a stream, the key of the sounding at start and the CRC32 of
+    its bytes up to offset. Throws a ValueError if the stream is shorter than offset."""
+    stream.seek(0)
+    head = stream.read(min(HEAD_SIZE, start))
+    stream.seek(start)
+    sounding = stream.read(offset - start)
+
+    if len(head) != min(HEAD_SIZE, start) or len(sounding) != offset - start:
+        raise ValueError("The stream ends before the checkpoint")
+
+    return zlib.crc32(head), sounding_key(sounding), zlib.crc32(sounding)
+
+
+def sounding_key(header_line: bytes) -> str:
+    """The station id, date and hour of a header line, e.g. 'USM00072201 2024 01 31 12'"""
+    return header_line[1:26].decode('ascii', errors='replace')
@@ -0,0 +1,132 @@
+"""Unit tests for module arrow_callbacks"""
+import io
+import unittest
+from unittest.mock import MagicMock
+from src import olieigra
+
+
+class ArrowCallbacksTests(unittest.TestCase):
+    """Unit tests for class ArrowCallbacks"""
+
+    def test_startfile_skips_notdatafile(self):
+        """Only Igra2 data files are processed by default"""
+        # arrange
+        callbacks = olieigra.ArrowCallbacks(MagicMock())
+
+        # act, assert
+        self.assertTrue(callbacks.start_file('USM00072649-data.txt'))
+        self.assertFalse(callbacks.start_file('igra2-station-list.txt'))
+
+    def test_readfromstream_writesbatches_success(self):
+        """Headers and levels are emitted as batches joined by id and sounding"""
+        # arrange
+        sink = MagicMock()
+        callbacks = olieigra.ArrowCallbacks(sink)
+        reader = olieigra.Reader(callbacks=callbacks)
+        callbacks.start_file('USM00072649-data.txt')
+
+        # act
+        reader.read_from_stream(io.StringIO(self.sample_file()))
+        callbacks.finish_file(2, 7)
+
+        # assert
+        sink.write.assert_called_once()
+        sink.flush.assert_called_once()
+        headers, levels = sink.write.call_args.args
+        self.assertEqual(olieigra.HEADER_SCHEMA, headers.schema)
+        self.assertEqual(olieigra.LEVEL_SCHEMA, levels.schema)
+        self.assertEqual([20231118121101, 20231118002303], headers.column('sounding').to_pylist())
+        self.assertEqual([20231118121101] * 2 + [20231118002303] * 3,
+                         levels.column('sounding').to_pylist())
+        self.assertEqual(['USM00072649'] * 5, levels.column('id').to_pylist())
+        self.assertEqual([98022, 97717, 98107, 97609, 95916], levels.column('pres').to_pylist())
+
+    def test_parsebodyarray_flushes_batchfull(self):
+        """A batch is written as soon as it reaches the batch size"""
+        # arrange
+        sink = MagicMock()
+        callbacks = olieigra.ArrowCallbacks(sink, batch_size=1)
+        reader = olieigra.Reader(callbacks=callbacks)
+        callbacks.start_file('USM00072649-data.txt')
+
+        # act
+        reader.read_from_stream(io.StringIO(self.sample_file()))
+
+        # assert
+        self.assertEqual(2, sink.write.call_count)
+        headers, _ = sink.write.call_args.args
+        self.assertEqual([20231118002303], headers.column('sounding').to_pylist())
+
+    def test_parseheader_keepskey_rejected(self):
+        """Rejected headers don't shift the key of the soundings after them"""
+        # arrange
+        sink = MagicMock()
+        callbacks = olieigra.ArrowCallbacks(sink)
+        callbacks.accept_header = MagicMock(side_effect=[False, True])
+        reader = olieigra.Reader(callbacks=callbacks)
+        callbacks.start_file('USM00072649-data.txt')
+
+        # act
+        reader.read_from_stream(io.StringIO(self.sample_file()))
+        callbacks.flush()
+
+        # assert
+        headers, levels = sink.write.call_args.args
+        self.assertEqual([20231118002303], headers.column('sounding').to_pylist())
+        self.assertEqual(3, levels.num_rows)
+
+    def test_soundingkey_samefiles_success(self):
+        """The same sounding gets the same key in every file, other soundings other keys"""
+        # arrange
+        sink = MagicMock()
+        callbacks = olieigra.ArrowCallbacks(sink)
+        reader = olieigra.Reader(callbacks=callbacks)
+
+        # act
+        for filename in ('USM00072649-data.txt', 'USM00072649-data.txt'):
+            callbacks.start_file(filename)
+            reader.read_from_stream(io.StringIO(self.sample_file()))
+            callbacks.finish_file(2, 7)
+
+        # assert
+        first, second = [call.args[0].column('sounding').to_pylist()
+                         for call in sink.write.call_args_list]
+        self.assertEqual(first, second)
+        self.assertEqual(2, len(set(first)))
+
+    def test_finishfile_acceptsstats_wantsstats(self):
+        """An instrumented Crawler can hand its ReadStats to finish_file"""
+        # arrange
+        sink = MagicMock()
+        callbacks = olieigra.ArrowCallbacks(sink)
+        callbacks.start_file('USM00072649-data.txt')
+
+        # act
+        callbacks.finish_file(2, 7, olieigra.ReadStats('USM00072649-data.txt'))
+
+        # assert
+        sink.flush.assert_called_once()
+
+    def test_flush_nop_empty(self):
+        """Nothing is written when there is nothing queued"""
+        # arrange
+        sink = MagicMock()
+        callbacks = olieigra.ArrowCallbacks(sink)
+
+        # act
+        callbacks.flush()
+
+        # assert
+        sink.write.assert_not_called()
+
+    def sample_file(self) -> str:
+        """Simple sample test case igra2 file"""
+        return (
+            "#USM00072649 2023 11 18 12 1101    2 ncdc-nws           448497  -935647\n"
+            "21     0  98022B  290    -9B  810    28   360     0 \n"
+            "20     4  97717   316B   -1B  771    35   275    26 \n"
+            "#USM00072649 2023 11 18 00 2303    3 ncdc-nws           448497  -935647\n"
+            "21     0  98107B  290    65B  350   143   360     0 \n"
+            "20     7  97609   332B   66B  339   147   208    45 \n"
+            "20    33  95916   476B   60B  325   152   224    73 \n"
+        )
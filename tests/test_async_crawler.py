@@ -0,0 +1,121 @@
+"""Unit tests for module async_crawler"""
+import asyncio
+import tempfile
+import unittest
+import numpy as np
+from src import olieigra
+from src.olieigra.async_callbacks import AsyncCallbacks
+
+
+class RecordingCallbacks(AsyncCallbacks):
+    """Record what the crawler hands over"""
+
+    def __init__(self):
+        super().__init__()
+        self.vectorized = True
+        self.events = []
+
+    async def start_file(self, source: str) -> bool:
+        """Accept the Igra2 data files"""
+        return source.endswith('-data.txt')
+
+    async def finish_file(self, source: str, headers: int, rows: int):
+        """Record the finish of a file and return its counts"""
+        self.events.append(('finish', source))
+        return headers, rows
+
+    def accept_header(self, header: olieigra.HeaderModel) -> bool:
+        """Accept the midnight soundings"""
+        return header.hour == 0
+
+    async def parse_batch(self, source: str, batch: list[olieigra.Sounding]) -> bool:
+        """Record the size and first body of a batch"""
+        await asyncio.sleep(0)
+        self.events.append(('batch', source, len(batch), batch[0].body))
+        return True
+
+
+class DefaultCallbacks(AsyncCallbacks):
+    """Keep the batches, with the default accept_header and vectorized"""
+
+    def __init__(self, min_numlev: int = 0):
+        super().__init__()
+        self.min_numlev = min_numlev
+        self.batches = []
+
+    async def start_file(self, source: str) -> bool:
+        """Accept the Igra2 data files"""
+        return source.endswith('-data.txt')
+
+    async def parse_batch(self, source: str, batch: list[olieigra.Sounding]) -> bool:
+        """Keep the batch"""
+        self.batches.append(batch)
+        return True
+
+
+class FailingCallbacks(RecordingCallbacks):
+    """Fail on the first batch"""
+
+    async def parse_batch(self, source: str, batch: list[olieigra.Sounding]) -> bool:
+        """Fail the crawl"""
+        raise RuntimeError(f'dillon {source}')
+
+
+class AsyncCrawlerTests(unittest.TestCase):
+    """Unit tests for class AsyncCrawler"""
+
+    def test_crawl_pipelines_success(self):
+        """Accepted soundings arrive in batches, followed by the finish of their file"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            generator = olieigra.SyntheticIgra2(stations=2, levels=3)
+            generator.write_archive(f'{path}/igra2.zip')
+            with open(f'{path}/readme.txt', 'wb') as file:
+                file.write(b'')
+            callbacks = RecordingCallbacks()
+            crawler = olieigra.AsyncCrawler(callbacks, batch_size=200, queue_depth=1)
+
+            # act
+            results = asyncio.run(crawler.crawl(path))
+
+            # assert
+            processed = {result.task.filename: result.result for result in results
+                         if result.processed}
+            self.assertEqual({'USM00072201-data.txt': (732, 732 * 4),
+                              'USM00072202-data.txt': (732, 732 * 4)}, processed)
+            self.assertEqual(3, len(results))
+            first = [event for event in callbacks.events if event[1] == 'USM00072201-data.txt']
+            self.assertEqual([200, 166], [event[2] for event in first[:-1]])
+            self.assertEqual(('finish', 'USM00072201-data.txt'), first[-1])
+            self.assertIsInstance(first[0][3], np.ndarray)
+            self.assertEqual({}, crawler.archives)
+
+    def test_crawl_raises_callbackerror(self):
+        """An error of a callback stops the pipeline and is raised"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            olieigra.SyntheticIgra2(stations=2, levels=3).write_directory(path)
+            crawler = olieigra.AsyncCrawler(FailingCallbacks(), batch_size=10, queue_depth=1)
+
+            # act, assert
+            with self.assertRaises(ExceptionGroup) as context:
+                asyncio.run(crawler.crawl(path))
+            self.assertIsInstance(context.exception.exceptions[0], RuntimeError)
+
+    def test_crawl_defaultsmodels_notvectorized(self):
+        """Like Callbacks, bodies are list[BodyModel] unless vectorized is set, and soundings
+        with fewer than min_numlev levels are left out"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            olieigra.SyntheticIgra2(levels=3, hours=(0,)).write_directory(path)
+            rejecting, accepting = DefaultCallbacks(min_numlev=4), DefaultCallbacks(min_numlev=3)
+
+            # act
+            asyncio.run(olieigra.AsyncCrawler(rejecting, batch_size=100).crawl(path))
+            asyncio.run(olieigra.AsyncCrawler(accepting, batch_size=100).crawl(path))
+
+            # assert
+            self.assertFalse(AsyncCallbacks().vectorized)
+            self.assertEqual([], rejecting.batches)
+            self.assertEqual(366, sum(len(batch) for batch in accepting.batches))
+            self.assertIsInstance(accepting.batches[0][0].body[0], olieigra.BodyModel)
@@ -0,0 +1,74 @@
+"""Unit tests for module batch_callbacks"""
+import io
+import unittest
+from unittest.mock import MagicMock
+from src import olieigra
+
+
+class BatchCallbacksTests(unittest.TestCase):
+    """Unit tests for class BatchCallbacks"""
+
+    def test_parsebodyarray_processes_batchfull(self):
+        """A batch is processed as soon as it reaches the batch size, then emptied"""
+        # arrange
+        callbacks = olieigra.BatchCallbacks(batch_size=1)
+        batches = []
+        callbacks.process_batch = MagicMock(
+            side_effect=lambda: batches.append([s for s, _ in callbacks.headers]))
+        reader = olieigra.Reader(callbacks=callbacks)
+        callbacks.start_file('USM00072649-data.txt')
+
+        # act
+        reader.read_from_stream(io.StringIO(self.sample_file()))
+
+        # assert
+        self.assertEqual([[0], [1]], batches)
+        self.assertEqual(([], []), (callbacks.headers, callbacks.bodies))
+
+    def test_parseheader_skips_minnumlev(self):
+        """Soundings with fewer levels than min_numlev are left out, keeping positions"""
+        # arrange
+        callbacks = olieigra.BatchCallbacks(min_numlev=3)
+        callbacks.process_batch = MagicMock()
+        reader = olieigra.Reader(callbacks=callbacks)
+        callbacks.start_file('USM00072649-data.txt')
+
+        # act
+        reader.read_from_stream(io.StringIO(self.sample_file()))
+
+        # assert
+        self.assertEqual([1], [s for s, _ in callbacks.headers])
+        self.assertEqual([3], [len(body) for body in callbacks.bodies])
+
+    def test_flush_nop_empty(self):
+        """An empty queue isn't processed"""
+        # arrange
+        callbacks = olieigra.BatchCallbacks()
+        callbacks.process_batch = MagicMock()
+
+        # act
+        callbacks.flush()
+
+        # assert
+        callbacks.process_batch.assert_not_called()
+
+    def test_startfile_skips_notdatafile(self):
+        """Only Igra2 data files are processed by default"""
+        # arrange
+        callbacks = olieigra.BatchCallbacks()
+
+        # act, assert
+        self.assertTrue(callbacks.start_file('USM00072649-data.txt'))
+        self.assertFalse(callbacks.start_file('igra2-station-list.txt'))
+
+    def sample_file(self) -> str:
+        """Simple sample test case igra2 file"""
+        return (
+            "#USM00072649 2023 11 18 12 1101    2 ncdc-nws           448497  -935647\n"
+            "21     0  98022B  290    -9B  810    28   360     0 \n"
+            "20     4  97717   316B   -1B  771    35   275    26 \n"
+            "#USM00072649 2023 11 18 00 2303    3 ncdc-nws           448497  -935647\n"
+            "21     0  98107B  290    65B  350   143   360     0 \n"
+            "20     7  97609   332B   66B  339   147   208    45 \n"
+            "20    33  95916   476B   60B  325   152   224    73 \n"
+        )
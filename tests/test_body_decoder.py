@@ -0,0 +1,135 @@
+"""Unit tests for module body_decoder"""
+import math
+import unittest
+from src import olieigra
+from src.olieigra.body_decoder import decode_body_block
+
+
+class BodyDecoderTests(unittest.TestCase):
+    """Unit tests for module body_decoder"""
+
+    def test_decodebody_correctbody_success(self):
+        """Decode a valid list of lines"""
+        # arrange
+        lines = self.sample_body()
+
+        # act
+        result = olieigra.decode_body(lines)
+
+        # assert
+        self.assertEqual(olieigra.BODY_DTYPE, result.dtype)
+        self.assertEqual(3, len(result))
+        self.assertEqual('21', result['type'][0])
+        self.assertEqual(747, result['pres'][1])
+        self.assertEqual(33064, result['gph'][1])
+        self.assertEqual(-542, result['temp'][1])
+        self.assertTrue(math.isnan(result['rh'][1]))
+        self.assertTrue(math.isnan(result['dpdp'][1]))
+        self.assertEqual(286, result['wdir'][1])
+        self.assertEqual(298, result['wspd'][1])
+
+    def test_decodebody_matchesparsebodyline_success(self):
+        """The vectorized decoder should agree with the line parser"""
+        # arrange
+        lines = self.sample_body()
+        reader = olieigra.Reader()
+
+        # act
+        result = olieigra.decode_body(lines)
+
+        # assert
+        for line, record in zip(lines, result):
+            expected = reader.parse_body_line(line)
+            self.assertEqual(expected.type, record['type'])
+            self.assertEqual(expected.pres, record['pres'])
+            for name in ['gph', 'temp', 'rh', 'dpdp', 'wdir', 'wspd']:
+                value = getattr(expected, name)
+                if math.isnan(value):
+                    self.assertTrue(math.isnan(record[name]))
+                else:
+                    self.assertEqual(value, record[name])
+
+    def test_decodebody_bytes_success(self):
+        """Lines read from a binary stream decode the same way"""
+        # arrange
+        lines = [line.encode('ascii') for line in self.sample_body()]
+
+        # act
+        result = olieigra.decode_body(lines)
+
+        # assert
+        self.assertEqual(98022, result['pres'][0])
+        self.assertEqual(-9999, result['pres'][2])
+
+    def test_decodebody_ragged_success(self):
+        """Lines of differing length (e.g. no trailing newline) still decode"""
+        # arrange
+        lines = self.sample_body()
+        lines[-1] = lines[-1].rstrip('\n')
+
+        # act
+        result = olieigra.decode_body(lines)
+
+        # assert
+        self.assertEqual(3, len(result))
+        self.assertEqual(-594, result['temp'][2])
+
+    def test_decodebody_empty_success(self):
+        """An empty body returns an empty array"""
+        # arrange, act
+        result = olieigra.decode_body([])
+
+        # assert
+        self.assertEqual(0, len(result))
+
+    def test_decodebody_throws_invalid(self):
+        """An invalid numeric field should throw an exception"""
+        # arrange
+        lines = ["20 10305    7x7 33064B -542B-9999 -9999   286   298 \n"]
+
+        # act, assert
+        self.assertRaises(ValueError, olieigra.decode_body, lines)
+
+    def test_decodebodyblock_correctcount_success(self):
+        """Decode a contiguous block of lines"""
+        # arrange
+        block = ''.join(self.sample_body()).encode('ascii')
+
+        # act
+        result = decode_body_block(block, 3)
+
+        # assert
+        self.assertEqual(3, len(result))
+        self.assertEqual(-9, result['temp'][0])
+
+    def test_decodebodyblock_throws_wrongcount(self):
+        """A block that doesn't hold the expected number of lines should throw"""
+        # arrange
+        block = ''.join(self.sample_body()).encode('ascii')
+
+        # act, assert
+        self.assertRaises(ValueError, decode_body_block, block, 2)
+
+    def test_tobodymodels_matchesparsebodyline_success(self):
+        """Converting a decoded body gives the same models as the line parser"""
+        # arrange
+        lines = self.sample_body()
+        reader = olieigra.Reader()
+
+        # act
+        result = olieigra.to_body_models(olieigra.decode_body(lines))
+
+        # assert
+        self.assertEqual(3, len(result))
+        self.assertEqual(reader.parse_body_line(lines[0]), result[0])
+        self.assertIsInstance(result[0].pres, int)
+        self.assertEqual('20', result[1].type)
+        self.assertTrue(math.isnan(result[1].rh))
+
+    def sample_body(self) -> list[str]:
+        """Simple sample body"""
+        return [
+            "21     0  98022B  290    -9B  810    28   360     0 \n",
+            "20 10305    747 33064B -542B-9999 -9999   286   298 \n",
+            "30 -9999  -9999 16780B -594B-9999 -8888   277   281 \n"
+        ]
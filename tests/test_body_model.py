@@ -1,4 +1,5 @@
 """Unit tests for module body_model"""
+import math
 import unittest
 from src import olieigra
 
@@ -21,3 +22,55 @@ class BodyModelTests(unittest.TestCase):
         self.assertEqual(5, model.dpdp)
         self.assertEqual(6, model.wdir)
         self.assertEqual(7, model.wspd)
+
+    def test_init_slots_nodict(self):
+        """The model stores its fields in slots"""
+        # arrange, act
+        model = olieigra.BodyModel("a", 1, 2, 3, 4, 5, 6, 7)
+
+        # assert
+        self.assertFalse(hasattr(model, '__dict__'))
+
+
+class LazyBodyModelTests(unittest.TestCase):
+    """Unit tests for class LazyBodyModel"""
+
+    def test_fields_decodes_success(self):
+        """Fields are decoded from a text or binary line"""
+        for line in ["20 10305    747 33064B -542B-9999 -8888   286   298 \n",
+                     b"20 10305    747 33064B -542B-9999 -8888   286   298 \n"]:
+            # arrange, act
+            model = olieigra.LazyBodyModel(line)
+
+            # assert
+            self.assertEqual("20", model.type)
+            self.assertEqual(747, model.pres)
+            self.assertEqual(33064, model.gph)
+            self.assertEqual(-542, model.temp)
+            self.assertTrue(math.isnan(model.rh))
+            self.assertTrue(math.isnan(model.dpdp))
+            self.assertEqual(286, model.wdir)
+            self.assertEqual(298, model.wspd)
+
+    def test_fields_decodes_once(self):
+        """A field is decoded on first access and then kept"""
+        # arrange
+        model = olieigra.LazyBodyModel("20 10305    747 33064B -542B-9999 -8888   286   298 \n")
+
+        # act
+        first = model.gph
+        model.line = ""
+
+        # assert
+        self.assertEqual(first, model.gph)
+
+    def test_tomodel_converts_success(self):
+        """A lazy record converts into an equal BodyModel"""
+        # arrange
+        line = "20 10305    747 33064B -542B   11   291   286   298 \n"
+
+        # act
+        result = olieigra.LazyBodyModel(line).to_model()
+
+        # assert
+        self.assertEqual(olieigra.Reader().parse_body_line(line), result)
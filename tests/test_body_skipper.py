@@ -0,0 +1,113 @@
+"""Unit tests for module body_skipper"""
+import io
+import unittest
+from src.olieigra.body_skipper import count_lines, seek_lines
+
+
+class NonSeekable(io.RawIOBase):
+    """A raw binary stream that can't seek, like a pipe"""
+
+    def __init__(self, data: bytes):
+        self.data = io.BytesIO(data)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        return self.data.readinto(buffer)
+
+
+class BodySkipperTests(unittest.TestCase):
+    """Unit tests for module body_skipper"""
+
+    def test_seeklines_jumps_fixedwidth(self):
+        """Fixed-width lines are skipped with a single seek"""
+        # arrange
+        stream = io.BytesIO(self.sample_file())
+        stream.readline()
+
+        # act
+        result = seek_lines(stream, 2)
+
+        # assert
+        self.assertTrue(result)
+        self.assertEqual(b"#", stream.readline()[0:1])
+
+    def test_seeklines_false_text(self):
+        """Text streams are read line by line"""
+        # arrange
+        stream = io.StringIO(self.sample_file().decode())
+        stream.readline()
+
+        # act
+        result = seek_lines(stream, 2)
+
+        # assert
+        self.assertFalse(result)
+        self.assertEqual("2", stream.readline()[0:1])
+
+    def test_seeklines_restores_ragged(self):
+        """Lines that aren't fixed-width leave the stream where it was"""
+        # arrange
+        stream = io.BytesIO(b"a\nb\nc\n")
+        stream.readline()
+
+        # act
+        result = seek_lines(stream, 1)
+
+        # assert
+        self.assertFalse(result)
+        self.assertEqual(b"b\n", stream.readline())
+
+    def test_seeklines_restores_crlf(self):
+        """CRLF lines are not taken for fixed-width ones, even when a newline sits where the
+        jump lands"""
+        # arrange
+        body = b"21     0  98022B  290    -9B  810    28   360     0 \r\n" * 54
+        stream = io.BytesIO(body + b"#USM00072649\r\n")
+
+        # act
+        result = seek_lines(stream, 54)
+
+        # assert
+        self.assertFalse(result)
+        self.assertEqual(0, stream.tell())
+
+    def test_seeklines_false_notseekable(self):
+        """Streams that can't seek are reported as such"""
+        # arrange
+        stream = io.BufferedReader(NonSeekable(self.sample_file()))
+
+        # act, assert
+        self.assertFalse(seek_lines(stream, 2))
+
+    def test_countlines_skips_buffered(self):
+        """Buffered binary streams are skipped by counting newlines"""
+        # arrange
+        stream = io.BufferedReader(NonSeekable(self.sample_file() + b"x\ny\n"), buffer_size=64)
+        stream.readline()
+
+        # act
+        result = count_lines(stream, 5)
+
+        # assert
+        self.assertTrue(result)
+        self.assertEqual(b"y\n", stream.readline())
+
+    def test_countlines_false_nopeek(self):
+        """Streams that can't peek are reported as such"""
+        # arrange
+        stream = io.StringIO("a\nb\n")
+
+        # act, assert
+        self.assertFalse(count_lines(stream, 1))
+
+    def sample_file(self) -> bytes:
+        """Simple sample test case igra2 file"""
+        return (
+            b"#USM00072649 2023 11 18 12 1101    2 ncdc-nws           448497  -935647\n"
+            b"21     0  98022B  290    -9B  810    28   360     0 \n"
+            b"20     4  97717   316B   -1B  771    35   275    26 \n"
+            b"#USM00072649 2023 11 18 00 2303    1 ncdc-nws           448497  -935647\n"
+            b"21     0  98107B  290    65B  350   143   360     0 \n"
+        )
@@ -0,0 +1,144 @@
+"""Unit tests for module cli"""
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from src import olieigra
+from src.olieigra import cli
+
+
+class CliTests(unittest.TestCase):
+    """Unit tests for the olieigra command"""
+
+    def test_main_throws_workersshards(self):
+        """Workers can't be combined with shards"""
+        # arrange
+        args = ['stats', 'src', 'dst', '--workers', '2', '--shard-count', '2']
+
+        # act, assert
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertRaises(SystemExit, cli.main, args)
+
+    def test_index_poolshard_workers(self):
+        """index builds the indexes of its shard across a pool of workers"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            olieigra.SyntheticIgra2(stations=2, levels=10).write_directory(path)
+            args = ['index', path, '--workers', '2', '--shard-index', '1', '--shard-count', '2']
+
+            # act
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = cli.main(args)
+
+            # assert
+            self.assertEqual(0, result)
+            self.assertEqual(1, len([f for f in os.listdir(path) if f.endswith('.idx.npz')]))
+
+    def test_main_throws_invalidshard(self):
+        """A shard index outside the shard count is rejected"""
+        # arrange
+        args = ['index', 'src', '--shard-index', '2', '--shard-count', '2']
+
+        # act, assert
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertRaises(SystemExit, cli.main, args)
+
+    def test_stationlist_success(self):
+        """Station ids are split on commas, blanks dropped"""
+        # arrange, act
+        result = cli.station_list('USM00072201, USM00072202,')
+
+        # assert
+        self.assertEqual({'USM00072201', 'USM00072202'}, result)
+
+    def test_stats_writestables_success(self):
+        """Every file gets its quality table and every station a summary row"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            olieigra.SyntheticIgra2(stations=2, levels=10).write_directory(path)
+            dst = f'{path}/out'
+
+            # act
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = cli.main(['stats', path, dst, '--start', '2000-07-01'])
+
+            # assert
+            self.assertEqual(0, result)
+            self.assertEqual(['USM00072201-quality.csv', 'USM00072202-quality.csv',
+                              'stations.csv'], sorted(os.listdir(dst)))
+            with open(f'{dst}/USM00072201-quality.csv', encoding='UTF-8') as file:
+                self.assertEqual(1 + 184 * 2, len(file.readlines()))
+            with open(f'{dst}/stations.csv', encoding='UTF-8') as file:
+                self.assertEqual(3, len(file.readlines()))
+
+    def test_stats_mergesarchives_success(self):
+        """The same station in two archives gets two tables and one summary row"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            generator = olieigra.SyntheticIgra2(stations=2, levels=10)
+            generator.write_archive(f'{path}/igra2-por.zip')
+            generator.write_archive(f'{path}/igra2-y2d.zip')
+            dst = f'{path}/out'
+
+            # act
+            with contextlib.redirect_stdout(io.StringIO()):
+                cli.main(['stats', path, dst, '--stations', 'USM00072201'])
+
+            # assert
+            self.assertEqual(['igra2-por.USM00072201-quality.csv',
+                              'igra2-y2d.USM00072201-quality.csv', 'stations.csv'],
+                             sorted(os.listdir(dst)))
+            with open(f'{dst}/stations.csv', encoding='UTF-8') as file:
+                rows = file.readlines()
+            self.assertEqual(2, len(rows))
+            self.assertEqual('USM00072201,1464,', rows[1][:17])
+
+    def test_index_splitsshards_success(self):
+        """The shards together build every index exactly once"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            generator = olieigra.SyntheticIgra2(stations=3, levels=10)
+            generator.write_directory(path)
+            generator.write_archive(f'{path}/all.zip')
+
+            # act
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                for shard in range(2):
+                    cli.main(['index', path, '--shard-index', str(shard), '--shard-count', '2'])
+                cli.main(['index', path])
+
+            # assert
+            self.assertEqual(6, len([f for f in os.listdir(path) if f.endswith('.idx.npz')]))
+            self.assertIn("Built 0 indexes", output.getvalue().splitlines()[-1])
+
+    def test_convert_writesdataset_success(self):
+        """Every station becomes a partition of the Parquet dataset"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            olieigra.SyntheticIgra2(stations=2, levels=10).write_directory(path)
+            dst = f'{path}/dataset'
+
+            # act
+            with contextlib.redirect_stdout(io.StringIO()):
+                cli.main(['convert', path, dst, '--stations', 'USM00072202',
+                          '--report', f'{path}/report.json'])
+
+            # assert
+            self.assertEqual(['id=USM00072202'], os.listdir(f'{dst}/headers'))
+            self.assertEqual(1, olieigra.ShardReport.load(f'{path}/report.json')
+                             .summary()['processed'])
+
+    def test_import_skipspyarrow_success(self):
+        """The command starts without importing pyarrow"""
+        # arrange
+        code = "import sys; import src.olieigra.cli; print('pyarrow' in sys.modules)"
+
+        # act
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, check=True,
+                                text=True)
+
+        # assert
+        self.assertEqual('False', result.stdout.strip())
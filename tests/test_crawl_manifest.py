@@ -0,0 +1,85 @@
+"""Unit tests for module crawl_manifest"""
+import os
+import tempfile
+import unittest
+from src import olieigra
+
+
+class CrawlManifestTests(unittest.TestCase):
+    """Unit tests for class CrawlManifest"""
+
+    def test_isdone_finished_success(self):
+        """A finished file that is unchanged is done"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            manifest = olieigra.CrawlManifest(f'{path}/manifest.jsonl')
+
+            # act
+            manifest.start('a', 10, 7, '2024-01-01T00:00:00')
+            started = manifest.is_done('a', 10, 7, '2024-01-01T00:00:00')
+            manifest.finish('a', 10, 7, '2024-01-01T00:00:00')
+
+            # assert
+            self.assertFalse(started)
+            self.assertTrue(manifest.is_done('a', 10, 7, '2024-01-01T00:00:00'))
+            self.assertFalse(manifest.is_done('a', 10, 8, '2024-01-01T00:00:00'))
+            self.assertFalse(manifest.is_done('a', 11, 7, '2024-01-01T00:00:00'))
+            self.assertFalse(manifest.is_done('a', 10, 7, '2024-01-02T00:00:00'))
+            self.assertFalse(manifest.is_done('b', 10, 7, '2024-01-01T00:00:00'))
+
+    def test_load_resumes_success(self):
+        """A new manifest replays the journal and ignores a truncated last line"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            filename = f'{path}/manifest.jsonl'
+            manifest = olieigra.CrawlManifest(filename)
+            manifest.finish('a', 10, 7, '2024-01-01T00:00:00')
+            manifest.start('b', 20, 8, '2024-01-01T00:00:00')
+            with open(filename, 'a', encoding='UTF-8') as file:
+                file.write('{"key": "c", "si')
+
+            # act
+            result = olieigra.CrawlManifest(filename)
+
+            # assert
+            self.assertTrue(result.is_done('a', 10, 7, '2024-01-01T00:00:00'))
+            self.assertFalse(result.is_done('b', 20, 8, '2024-01-01T00:00:00'))
+            self.assertEqual(['a', 'b'], list(result.entries))
+
+    def test_tail_keptacrossstart_success(self):
+        """The checkpoint of a finished file survives a restart until the next finish"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            filename = f'{path}/manifest.jsonl'
+            manifest = olieigra.CrawlManifest(filename)
+            checkpoint = olieigra.TailCheckpoint(409, 178, 'USM00072649 2023 11 18 00', 1, 2)
+
+            # act
+            manifest.finish('a', 10, 7, '2024-01-01T00:00:00', checkpoint)
+            manifest.start('a', 20, 7, '2024-01-02T00:00:00')
+            resumed = olieigra.CrawlManifest(filename)
+            manifest.finish('a', 20, 7, '2024-01-02T00:00:00')
+
+            # assert
+            self.assertEqual(checkpoint, resumed.tail('a'))
+            self.assertIsNone(manifest.tail('a'))
+            self.assertIsNone(manifest.tail('b'))
+
+    def test_compact_keepslast_success(self):
+        """Compacting keeps one record per key"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            filename = f'{path}/manifest.jsonl'
+            manifest = olieigra.CrawlManifest(filename)
+            manifest.start('a', 10, 7, '2024-01-01T00:00:00')
+            manifest.finish('a', 10, 7, '2024-01-01T00:00:00')
+
+            # act
+            manifest.compact()
+
+            # assert
+            with open(filename, 'r', encoding='UTF-8') as file:
+                self.assertEqual(1, len(file.readlines()))
+            self.assertFalse(os.path.exists(f'{filename}.partial'))
+            self.assertTrue(olieigra.CrawlManifest(filename).is_done(
+                'a', 10, 7, '2024-01-01T00:00:00'))
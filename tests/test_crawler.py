@@ -1,7 +1,10 @@
 """Unit tests for module igra2_body_crawler"""
+import os
+import tempfile
 import unittest
-from unittest.mock import MagicMock
-from zipfile import ZipInfo
+from datetime import date
+from unittest.mock import MagicMock, patch
+from zipfile import ZipFile, ZipInfo
 from src import olieigra
 from src.olieigra.io_wrapper import IOWrapper
 
@@ -157,7 +160,7 @@ class CrawlerTests(unittest.TestCase):
         reader = olieigra.Reader(callbacks=callbacks)
         reader.read_from_stream = MagicMock(return_value=(10, 20))
         io = IOWrapper()
-        io.open_file = MagicMock(return_value=io)
+        io.open_binary_file = MagicMock(return_value=io)
         io.close = MagicMock()
         crawler = olieigra.Crawler(reader=reader, io=io)
 
@@ -166,7 +169,7 @@ class CrawlerTests(unittest.TestCase):
 
         # assert
         reader.read_from_stream.assert_called_once()
-        io.open_file.assert_called_once()
+        io.open_binary_file.assert_called_once()
         io.close.assert_called_once()
         callbacks.finish_file.assert_called_once_with(10, 20)
 
@@ -179,7 +182,7 @@ class CrawlerTests(unittest.TestCase):
         reader.read_from_stream = MagicMock(return_value=(10, 20))
         io = IOWrapper()
         io.open_archive_file = MagicMock(return_value=io)
-        io.read_as_text = MagicMock(return_value=io)
+        io.open_buffered = MagicMock(return_value=io)
         io.close = MagicMock()
         crawler = olieigra.Crawler(reader=reader, io=io)
 
@@ -191,3 +194,405 @@ class CrawlerTests(unittest.TestCase):
         io.open_archive_file.assert_called_once()
         self.assertEqual(2, io.close.call_count)
         callbacks.finish_file.assert_called_once_with(10, 20)
+
+    def test_crawlarchive_skipsunchanged_manifest(self):
+        """Members the manifest marks as done are skipped, the others are recorded"""
+        # arrange
+        wrapper = IOWrapper()
+        wrapper.close = MagicMock()
+        wrapper.filelist = [ZipInfo('a'), ZipInfo('b')]
+        for info in wrapper.filelist:
+            info.CRC = 7
+        wrapper.open_archive = MagicMock(return_value=wrapper)
+        wrapper.file_size = MagicMock(return_value=100)
+        wrapper.file_mtime = MagicMock(return_value='2024-01-01T00:00:00')
+        manifest = MagicMock()
+        manifest.is_done = MagicMock(side_effect=lambda key, *_: key.endswith('/a'))
+        callbacks = olieigra.Callbacks()
+        callbacks.start_file = MagicMock(return_value=True)
+        reader = olieigra.Reader(callbacks=callbacks)
+        crawler = olieigra.Crawler(io=wrapper, reader=reader, manifest=manifest)
+        crawler.process_igra2_archive_file = MagicMock()
+
+        # act
+        crawler.crawl_archive('/path', 'dillon.zip')
+
+        # assert
+        callbacks.start_file.assert_called_once_with('b')
+        crawler.process_igra2_archive_file.assert_called_once_with(wrapper, 'b')
+        manifest.start.assert_called_once_with('/path/dillon.zip/b', 0, 7, '1980-01-01T00:00:00')
+        self.assertEqual([('/path/dillon.zip/b', 0, 7, '1980-01-01T00:00:00'),
+                          ('/path/dillon.zip', 100, 0, '2024-01-01T00:00:00')],
+                         [c.args for c in manifest.finish.call_args_list])
+
+    def test_crawlarchive_keepsarchiveopen_stations(self):
+        """A crawl of some stations doesn't mark the archive done for the other stations"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            olieigra.SyntheticIgra2(stations=2, levels=2).write_archive(f'{path}/igra2.zip')
+            manifest = olieigra.CrawlManifest(f'{path}/manifest.jsonl')
+            offered = []
+            callbacks = olieigra.Callbacks()
+            callbacks.start_file = MagicMock(
+                side_effect=lambda f: offered.append(f) or f.endswith('-data.txt'))
+            callbacks.finish_file = MagicMock()
+            reader = olieigra.Reader(callbacks=callbacks)
+
+            # act
+            olieigra.Crawler(reader=reader, manifest=manifest,
+                             stations={'USM00072201'}).crawl(path)
+            olieigra.Crawler(reader=reader, manifest=manifest).crawl(path)
+            olieigra.Crawler(reader=reader, manifest=manifest).crawl(path)
+
+            # assert
+            self.assertEqual(['USM00072201-data.txt', 'USM00072202-data.txt'],
+                             [f for f in offered if f.endswith('-data.txt')])
+            self.assertTrue(manifest.is_done(f'{path}/igra2.zip',
+                                             os.path.getsize(f'{path}/igra2.zip'), 0,
+                                             IOWrapper().file_mtime(f'{path}/igra2.zip')))
+
+    def test_crawlarchive_skipsarchive_manifestdone(self):
+        """An unchanged archive that was finished is not opened"""
+        # arrange
+        wrapper = IOWrapper()
+        wrapper.open_archive = MagicMock()
+        wrapper.file_size = MagicMock(return_value=100)
+        wrapper.file_mtime = MagicMock(return_value='2024-01-01T00:00:00')
+        manifest = MagicMock()
+        manifest.is_done = MagicMock(return_value=True)
+        crawler = olieigra.Crawler(io=wrapper, manifest=manifest)
+
+        # act
+        crawler.crawl_archive('/path', 'dillon.zip')
+
+        # assert
+        wrapper.open_archive.assert_not_called()
+        manifest.is_done.assert_called_once_with('/path/dillon.zip', 100, 0,
+                                                 '2024-01-01T00:00:00')
+
+    def test_processfile_skipsfile_manifestdone(self):
+        """A plain file the manifest marks as done is skipped"""
+        # arrange
+        wrapper = IOWrapper()
+        wrapper.file_size = MagicMock(return_value=100)
+        wrapper.file_mtime = MagicMock(return_value='2024-01-01T00:00:00')
+        manifest = MagicMock()
+        manifest.is_done = MagicMock(return_value=True)
+        callbacks = olieigra.Callbacks()
+        callbacks.start_file = MagicMock(return_value=True)
+        crawler = olieigra.Crawler(reader=olieigra.Reader(callbacks=callbacks), io=wrapper,
+                                   manifest=manifest)
+        crawler.process_igra2_file = MagicMock()
+
+        # act
+        crawler.process_file('/path', 'dillon-data.txt')
+
+        # assert
+        callbacks.start_file.assert_not_called()
+        crawler.process_igra2_file.assert_not_called()
+
+    def test_crawl_collectsstats_instrument(self):
+        """An instrumented crawl keeps stats per file and per archive and hands them over"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            generator = olieigra.SyntheticIgra2(stations=2, levels=3, hours=(0,))
+            generator.write_archive(f'{path}/igra2.zip')
+            callbacks = olieigra.Callbacks()
+            callbacks.wants_stats = True
+            callbacks.start_file = MagicMock(return_value=True)
+            callbacks.finish_file = MagicMock()
+            callbacks.parse_header = MagicMock(return_value=False)
+            crawler = olieigra.Crawler(reader=olieigra.Reader(callbacks=callbacks),
+                                       instrument=True)
+
+            # act
+            crawler.crawl(path)
+
+            # assert
+            self.assertEqual(2, len(crawler.file_stats))
+            stats = crawler.file_stats[0]
+            self.assertEqual('USM00072201-data.txt', stats.filename)
+            self.assertEqual(f'{path}/igra2.zip', stats.archive)
+            self.assertEqual(366 * 4 * 53 - 366 * (53 - 72), stats.bytes_read)
+            self.assertEqual(366, stats.skipped)
+            callbacks.finish_file.assert_any_call(366, 366 * 4, stats)
+            total = crawler.archive_stats[f'{path}/igra2.zip']
+            self.assertEqual(2 * stats.bytes_read, total.bytes_read)
+            self.assertIsNone(crawler.reader.stats)
+
+    def test_processigrafile_mapsfile_mapped(self):
+        """A mapped crawler reads plain files through a memory map"""
+        # arrange
+        callbacks = olieigra.Callbacks()
+        callbacks.finish_file = MagicMock()
+        reader = olieigra.Reader(callbacks=callbacks)
+        reader.read_from_stream = MagicMock(return_value=(10, 20))
+        io = IOWrapper()
+        io.open_mapped_file = MagicMock(return_value=io)
+        io.open_binary_file = MagicMock()
+        io.close = MagicMock()
+        crawler = olieigra.Crawler(reader=reader, io=io, mapped=True)
+
+        # act
+        crawler.process_igra2_file('some/random/path', 'dillon.txt')
+
+        # assert
+        io.open_mapped_file.assert_called_once_with('some/random/path/dillon.txt')
+        io.open_binary_file.assert_not_called()
+        callbacks.finish_file.assert_called_once_with(10, 20)
+
+    def test_itersoundings_yields_success(self):
+        """Soundings of plain files and archive members are yielded with their source"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            generator = olieigra.SyntheticIgra2(stations=2, levels=2, hours=(0,))
+            generator.write_archive(f'{path}/igra2.zip')
+            with open(f'{path}/USM00072649-data.txt', 'wb') as file:
+                file.write(generator.station_bytes(0))
+            with open(f'{path}/readme.txt', 'wb') as file:
+                file.write(b'')
+            crawler = olieigra.Crawler()
+
+            # act
+            sources = {}
+            for sounding in crawler.iter_soundings(path, lambda f: f.endswith('-data.txt')):
+                sources[sounding.source] = sources.get(sounding.source, 0) + \
+                    len(sounding.body.array())
+
+            # assert
+            self.assertEqual({f'{path}/igra2.zip/USM00072201-data.txt': 732,
+                              f'{path}/igra2.zip/USM00072202-data.txt': 732,
+                              f'{path}/USM00072649-data.txt': 732}, sources)
+
+    def test_processfile_skipsunselected_stations(self):
+        """Files and archives of other stations are never offered or opened"""
+        # arrange
+        wrapper = IOWrapper()
+        wrapper.open_archive = MagicMock()
+        callbacks = olieigra.Callbacks()
+        callbacks.start_file = MagicMock(return_value=True)
+        reader = olieigra.Reader(callbacks=callbacks)
+        crawler = olieigra.Crawler(reader=reader, io=wrapper, stations={'USM00072201'})
+        crawler.process_igra2_file = MagicMock()
+
+        # act
+        crawler.process_file('/some/random/path', 'USM00072250-data.txt.zip')
+        crawler.process_file('/some/random/path', 'USM00072250-data.txt')
+        crawler.process_file('/some/random/path', 'readme.txt')
+        crawler.process_file('/some/random/path', 'USM00072201-data.txt')
+
+        # assert
+        wrapper.open_archive.assert_not_called()
+        callbacks.start_file.assert_called_once_with('USM00072201-data.txt')
+        crawler.process_igra2_file.assert_called_once()
+
+    def test_crawlarchive_skipsunselected_stations(self):
+        """Members of other stations in an archive are skipped"""
+        # arrange
+        wrapper = IOWrapper()
+        wrapper.close = MagicMock()
+        wrapper.filelist = [ZipInfo('USM00072201-data.txt'), ZipInfo('USM00072250-data.txt')]
+        wrapper.open_archive = MagicMock(return_value=wrapper)
+        callbacks = olieigra.Callbacks()
+        callbacks.start_file = MagicMock(return_value=True)
+        reader = olieigra.Reader(callbacks=callbacks)
+        crawler = olieigra.Crawler(io=wrapper, reader=reader, stations={'USM00072250'})
+        crawler.process_igra2_archive_file = MagicMock()
+
+        # act
+        crawler.crawl_archive('/some/random/path', 'igra2.zip')
+
+        # assert
+        callbacks.start_file.assert_called_once_with('USM00072250-data.txt')
+        crawler.process_igra2_archive_file.assert_called_once()
+
+    def test_itersoundings_selects_stations(self):
+        """Only the soundings of the selected stations are yielded"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            generator = olieigra.SyntheticIgra2(stations=2, levels=2, hours=(0,))
+            generator.write_archive(f'{path}/igra2.zip')
+            crawler = olieigra.Crawler(stations={'USM00072202'})
+
+            # act
+            sources = {sounding.source for sounding in crawler.iter_soundings(path)}
+
+            # assert
+            self.assertEqual({f'{path}/igra2.zip/USM00072202-data.txt'}, sources)
+
+    def test_processigraarchivefile_prefetches_prefetchdepth(self):
+        """With a prefetch depth, members are read ahead on a thread"""
+        # arrange
+        callbacks = olieigra.Callbacks()
+        callbacks.finish_file = MagicMock()
+        reader = olieigra.Reader(callbacks=callbacks)
+        reader.read_from_stream = MagicMock(return_value=(10, 20))
+        io = IOWrapper()
+        io.open_archive_file = MagicMock(return_value=io)
+        io.open_prefetched = MagicMock(return_value='prefetched')
+        io.open_buffered = MagicMock(return_value=io)
+        io.close = MagicMock()
+        crawler = olieigra.Crawler(reader=reader, io=io, prefetch_depth=3,
+                                   prefetch_chunk_size=100)
+
+        # act
+        crawler.process_igra2_archive_file(None, 'dillon.txt')
+
+        # assert
+        io.open_prefetched.assert_called_once_with(io, 100, 3)
+        io.open_buffered.assert_called_once_with('prefetched')
+        callbacks.finish_file.assert_called_once_with(10, 20)
+
+    def test_crawl_servescache_cachedir(self):
+        """With a cache_dir, files and members are parsed once and then read from the cache"""
+        with tempfile.TemporaryDirectory() as path, tempfile.TemporaryDirectory() as cache:
+            # arrange
+            generator = olieigra.SyntheticIgra2(stations=2, levels=2, hours=(0,))
+            generator.write_archive(f'{path}/igra2.zip')
+            with open(f'{path}/USM00072649-data.txt', 'wb') as file:
+                file.write(generator.station_bytes(0))
+            callbacks = olieigra.Callbacks()
+            callbacks.start_file = MagicMock(return_value=True)
+            callbacks.parse_header = MagicMock(return_value=True)
+            callbacks.parse_body = MagicMock()
+            callbacks.finish_file = MagicMock()
+            crawler = olieigra.Crawler(reader=olieigra.Reader(callbacks=callbacks),
+                                       cache_dir=cache)
+
+            # act
+            crawler.crawl(path)
+            first = callbacks.parse_body.call_args_list
+            callbacks.parse_body.reset_mock()
+            crawler.reader.read_from_stream = MagicMock()
+            crawler.crawl(path)
+
+            # assert
+            self.assertEqual(3, len(os.listdir(cache)))
+            crawler.reader.read_from_stream.assert_not_called()
+            self.assertEqual(str(first), str(callbacks.parse_body.call_args_list))
+            callbacks.finish_file.assert_called_with(366, 366 * 3)
+            self.assertEqual(6, callbacks.finish_file.call_count)
+
+    def test_processigrafile_rebuildsstale_cachedir(self):
+        """A cache built from another version of a file is rebuilt"""
+        with tempfile.TemporaryDirectory() as path, tempfile.TemporaryDirectory() as cache:
+            # arrange
+            generator = olieigra.SyntheticIgra2(levels=2, hours=(0,))
+            with open(f'{path}/a-data.txt', 'wb') as file:
+                file.write(generator.station_bytes(0))
+            callbacks = olieigra.Callbacks()
+            callbacks.parse_header = MagicMock(return_value=False)
+            callbacks.finish_file = MagicMock()
+            crawler = olieigra.Crawler(reader=olieigra.Reader(callbacks=callbacks),
+                                       cache_dir=cache)
+            crawler.process_igra2_file(path, 'a-data.txt')
+            with open(f'{path}/a-data.txt', 'ab') as file:
+                file.write(generator.station_bytes(0)[:178])
+
+            # act
+            crawler.process_igra2_file(path, 'a-data.txt')
+
+            # assert
+            callbacks.finish_file.assert_called_with(367, 367 * 3)
+
+    def test_processigrafile_buildsonce_unfit(self):
+        """A file that doesn't fit a cache is parsed, and the build isn't tried again"""
+        with tempfile.TemporaryDirectory() as path, tempfile.TemporaryDirectory() as cache:
+            # arrange
+            with open(f'{path}/a-data.txt', 'w', encoding='UTF-8') as file:
+                file.write(olieigra.synthetic.header_line('USM00072201', date(2000, 1, 1), 0,
+                                                          1, 0, 0))
+                file.write(olieigra.synthetic.body_line('21', 98000, 300, 40000, 800, 50, 180,
+                                                        30))
+            callbacks = olieigra.Callbacks()
+            callbacks.parse_header = MagicMock(return_value=False)
+            callbacks.finish_file = MagicMock()
+            crawler = olieigra.Crawler(reader=olieigra.Reader(callbacks=callbacks),
+                                       cache_dir=cache)
+
+            # act
+            with patch.object(olieigra.SoundingCache, 'build',
+                              wraps=olieigra.SoundingCache.build) as build:
+                crawler.process_igra2_file(path, 'a-data.txt')
+                crawler.process_igra2_file(path, 'a-data.txt')
+
+            # assert
+            self.assertEqual(1, build.call_count)
+            callbacks.finish_file.assert_called_with(1, 2)
+
+    def test_processigrafile_rebuildscorrupt_cachedir(self):
+        """A cache that fails to load is rebuilt instead of failing the crawl"""
+        with tempfile.TemporaryDirectory() as path, tempfile.TemporaryDirectory() as cache:
+            # arrange
+            generator = olieigra.SyntheticIgra2(levels=2, hours=(0,))
+            with open(f'{path}/a-data.txt', 'wb') as file:
+                file.write(generator.station_bytes(0))
+            callbacks = olieigra.Callbacks()
+            callbacks.parse_header = MagicMock(return_value=False)
+            callbacks.finish_file = MagicMock()
+            crawler = olieigra.Crawler(reader=olieigra.Reader(callbacks=callbacks),
+                                       cache_dir=cache)
+            crawler.process_igra2_file(path, 'a-data.txt')
+            with open(f'{cache}/a-data.txt.cache/key.npy', 'r+b') as file:
+                file.truncate(0)
+
+            # act
+            crawler.process_igra2_file(path, 'a-data.txt')
+
+            # assert
+            callbacks.finish_file.assert_called_with(366, 366 * 3)
+            self.assertEqual(366, len(olieigra.SoundingCache.load(
+                f'{cache}/a-data.txt.cache').headers))
+
+    def test_itersoundings_servescache_cachedir(self):
+        """Soundings come from the cache, with the header filter applied to its table"""
+        with tempfile.TemporaryDirectory() as path, tempfile.TemporaryDirectory() as cache:
+            # arrange
+            generator = olieigra.SyntheticIgra2(levels=2, hours=(0, 12))
+            generator.write_archive(f'{path}/igra2.zip')
+            reader = olieigra.Reader(header_filter=olieigra.SoundingFilter(hours={12}))
+            crawler = olieigra.Crawler(reader=reader, cache_dir=cache)
+            expected = [sounding.body.array().tolist()
+                        for sounding in olieigra.Crawler(reader=reader).iter_soundings(path)]
+
+            # act
+            result = [sounding.body.array().tolist() for sounding in crawler.iter_soundings(path)]
+
+            # assert
+            self.assertTrue(os.path.exists(f'{cache}/igra2.zip.USM00072201-data.txt.cache'))
+            self.assertEqual(366, len(result))
+            self.assertEqual(str(expected), str(result))
+
+    def test_init_throws_incrementalnomanifest(self):
+        """Incremental crawling needs a manifest to keep the checkpoints in"""
+        # arrange, act, assert
+        self.assertRaises(ValueError, olieigra.Crawler, incremental=True)
+
+    def test_crawl_readstail_incremental(self):
+        """Appended soundings of plain files and archive members are read on their own"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            data = olieigra.SyntheticIgra2(levels=2, hours=(0,)).station_bytes(0)
+            cut = data.index(b'#', len(data) // 3)
+            callbacks = olieigra.Callbacks()
+            callbacks.start_file = MagicMock(return_value=True)
+            callbacks.parse_header = MagicMock(return_value=False)
+            callbacks.finish_file = MagicMock()
+            manifest = olieigra.CrawlManifest(f'{path}/manifest.jsonl')
+            crawler = olieigra.Crawler(reader=olieigra.Reader(callbacks=callbacks),
+                                       manifest=manifest, incremental=True)
+            os.mkdir(f'{path}/data')
+            for content in (data[:cut], data):
+                with open(f'{path}/data/a-data.txt', 'wb') as file:
+                    file.write(content)
+                with ZipFile(f'{path}/data/b.zip', 'w') as archive:
+                    archive.writestr('b-data.txt', content)
+
+                # act
+                crawler.crawl(f'{path}/data')
+
+            # assert
+            self.assertEqual([(122, 366)] * 2 + [(244, 732)] * 2,
+                             [c.args for c in callbacks.finish_file.call_args_list])
+            self.assertEqual(len(data), manifest.tail(f'{path}/data/a-data.txt').offset)
+            self.assertEqual(len(data), manifest.tail(f'{path}/data/b.zip/b-data.txt').offset)
@@ -0,0 +1,65 @@
+"""Unit tests for module derived"""
+import math
+import unittest
+import numpy as np
+from src import olieigra
+from src.olieigra import derived
+
+
+class DerivedTests(unittest.TestCase):
+    """Unit tests for module derived"""
+
+    def test_derive_scalesunits_success(self):
+        """The Igra2 units are scaled and the quantities derived per level"""
+        # arrange
+        body = olieigra.decode_body([
+            "21    -8 100000B  165B  152B  850   100   180   100 \n",
+            "10    -8  50000B 5678B -200B-9999    50   270    50 \n"])
+
+        # act
+        result = olieigra.derive(body)
+
+        # assert
+        self.assertEqual(olieigra.DERIVED_DTYPE, result.dtype)
+        np.testing.assert_allclose([1000.0, 500.0], result['pres'])
+        np.testing.assert_allclose([15.2, -20.0], result['temp'])
+        np.testing.assert_allclose([5.2, -25.0], result['dewpoint'])
+        self.assertAlmostEqual(85.0, result['rh'][0])
+        self.assertAlmostEqual(100 * derived.saturation_vapor_pressure(-25) /
+                               derived.saturation_vapor_pressure(-20), result['rh'][1])
+        np.testing.assert_allclose([0.0, 5.0], result['u'], atol=1e-12)
+        np.testing.assert_allclose([10.0, 0.0], result['v'], atol=1e-12)
+        self.assertAlmostEqual(288.35, result['theta'][0])
+        self.assertAlmostEqual(253.15 * 2 ** derived.KAPPA, result['theta'][1])
+
+    def test_derive_missing_nan(self):
+        """Missing pressures and values give NaN"""
+        # arrange
+        body = olieigra.decode_body(["20    -8  -9999B-9999B-8888B-9999 -9999 -9999 -8888 \n"])
+
+        # act
+        result = olieigra.derive(body)
+
+        # assert
+        for name in olieigra.DERIVED_DTYPE.names:
+            self.assertTrue(math.isnan(result[name][0]), name)
+
+    def test_derive_batchshape_preserved(self):
+        """Bodies of any shape are derived element-wise"""
+        # arrange
+        body = olieigra.decode_body(["21    -8 100000B  165B  152B  850   100   180   100 \n"] * 6)
+
+        # act
+        result = olieigra.derive(body.reshape(2, 3))
+
+        # assert
+        self.assertEqual((2, 3), result.shape)
+        np.testing.assert_allclose(result['mixing_ratio'][0, 0], result['mixing_ratio'])
+
+    def test_mixingratio_reference_success(self):
+        """The mixing ratio at saturation matches a reference value"""
+        # arrange, act
+        result = derived.mixing_ratio(1000.0, 20.0)
+
+        # assert
+        self.assertAlmostEqual(14.88, result, places=2)
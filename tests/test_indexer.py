@@ -0,0 +1,133 @@
+"""Unit tests for module indexer"""
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from datetime import date
+from zipfile import ZipFile
+from src import olieigra
+from src.olieigra.io_wrapper import IOWrapper
+from src.olieigra.sounding_index import index_filename
+
+
+class IndexerTests(unittest.TestCase):
+    """Unit tests for class Indexer"""
+
+    def test_crawl_dispatches_success(self):
+        """Archives and data files are indexed, anything else is ignored"""
+        # arrange
+        wrapper = IOWrapper()
+        wrapper.list_dir = MagicMock(return_value=['a.zip', 'b-data.txt', 'c.txt'])
+        indexer = olieigra.Indexer(io=wrapper)
+        indexer.index_archive = MagicMock(return_value=2)
+        indexer.index_file = MagicMock(return_value=1)
+
+        # act
+        built = indexer.crawl('/some/random/path')
+
+        # assert
+        self.assertEqual(3, built)
+        indexer.index_archive.assert_called_once_with('/some/random/path', 'a.zip')
+        indexer.index_file.assert_called_once_with('/some/random/path', 'b-data.txt')
+
+    def test_indexarchive_skips_current(self):
+        """Members with an up to date index are not rescanned"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            with ZipFile(f'{path}/a.zip', 'w') as archive:
+                archive.writestr('a-data.txt', self.sample_file())
+            indexer = olieigra.Indexer()
+
+            # act
+            first = indexer.index_archive(path, 'a.zip')
+            second = indexer.index_archive(path, 'a.zip')
+
+            # assert
+            self.assertEqual(1, first)
+            self.assertEqual(0, second)
+            index = olieigra.SoundingIndex.load(index_filename(f'{path}/a.zip', 'a-data.txt'))
+            self.assertEqual(3, len(index.entries))
+
+    def test_indexfile_rebuilds_rewrittensamesize(self):
+        """A file rewritten at the same size gets a new index"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            with open(f'{path}/b-data.txt', 'w', encoding='UTF-8') as file:
+                file.write(self.sample_file())
+            indexer = olieigra.Indexer()
+            indexer.index_file(path, 'b-data.txt')
+            with open(f'{path}/b-data.txt', 'w', encoding='UTF-8') as file:
+                file.write(self.sample_file().replace('2022', '2021'))
+            os.utime(f'{path}/b-data.txt', (0, 0))
+
+            # act
+            built = indexer.index_file(path, 'b-data.txt')
+
+            # assert
+            self.assertEqual(1, built)
+            index = olieigra.SoundingIndex.load(index_filename(f'{path}/b-data.txt'))
+            self.assertEqual(2021, index.entries['year'][0])
+
+    def test_crawl_skipssidecars_success(self):
+        """Sidecar indexes next to the data are never offered to the callbacks"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            with ZipFile(f'{path}/a.zip', 'w') as archive:
+                archive.writestr('a-data.txt', self.sample_file())
+            with open(f'{path}/b-data.txt', 'w', encoding='UTF-8') as file:
+                file.write(self.sample_file())
+            olieigra.Indexer().crawl(path)
+            callbacks = olieigra.Callbacks()
+            callbacks.start_file = MagicMock(return_value=True)
+            callbacks.finish_file = MagicMock()
+            crawler = olieigra.Crawler(reader=olieigra.Reader(callbacks=callbacks))
+
+            # act
+            crawler.crawl(path)
+            tasks = olieigra.parallel_crawler.list_tasks(IOWrapper(), path)
+
+            # assert
+            self.assertEqual(['a-data.txt', 'b-data.txt'],
+                             sorted(call.args[0] for call in callbacks.start_file.call_args_list))
+            self.assertEqual(['a-data.txt', 'b-data.txt'],
+                             sorted(task.filename for task in tasks))
+
+    def test_crawl_seeksindex_selection(self):
+        """With a header filter and an index, the crawler only reads the selected soundings"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            with ZipFile(f'{path}/a.zip', 'w') as archive:
+                archive.writestr('a-data.txt', self.sample_file())
+            with open(f'{path}/b-data.txt', 'w', encoding='UTF-8') as file:
+                file.write(self.sample_file())
+            olieigra.Indexer().crawl(path)
+            callbacks = olieigra.Callbacks()
+            callbacks.start_file = MagicMock(side_effect=lambda f: f.endswith('-data.txt'))
+            callbacks.finish_file = MagicMock()
+            callbacks.parse_header = MagicMock(return_value=True)
+            callbacks.parse_body = MagicMock()
+            selection = olieigra.SoundingFilter(start=date(2023, 1, 1), hours={0})
+            reader = olieigra.Reader(callbacks=callbacks, header_filter=selection)
+            crawler = olieigra.Crawler(reader=reader)
+
+            # act
+            crawler.crawl(path)
+
+            # assert
+            self.assertEqual(2, callbacks.finish_file.call_count)
+            callbacks.finish_file.assert_called_with(3, 6)
+            self.assertEqual(2, callbacks.parse_header.call_count)
+            header = callbacks.parse_header.call_args.args[0]
+            self.assertEqual((2023, 0), (header.year, header.hour))
+            self.assertEqual(65, callbacks.parse_body.call_args.args[0][0].temp)
+
+    def sample_file(self) -> str:
+        """Simple sample test case igra2 file"""
+        return (
+            "#USM00072649 2022 11 18 00 1101    1 ncdc-nws           448497  -935647\n"
+            "21     0  98022B  290    -9B  810    28   360     0 \n"
+            "#USM00072649 2023 11 18 12 1101    1 ncdc-nws           448497  -935647\n"
+            "21     0  98022B  290    -9B  810    28   360     0 \n"
+            "#USM00072649 2023 11 19 00 2303    1 ncdc-nws           448497  -935647\n"
+            "21     0  98107B  290    65B  350   143   360     0 \n"
+        )
@@ -0,0 +1,91 @@
+"""Unit tests for module interpolation"""
+import unittest
+import numpy as np
+from src import olieigra
+
+
+class InterpolateTests(unittest.TestCase):
+    """Unit tests for function interpolate"""
+
+    def test_interpolate_matchesinterp_padded(self):
+        """Every padded sounding matches np.interp, outside targets are NaN"""
+        # arrange
+        rng = np.random.default_rng(7)
+        counts = np.array([5, 3, 0, 1])
+        x = np.sort(rng.uniform(0, 1000, (4, 5)), axis=1)
+        values = rng.normal(size=(4, 5, 2))
+        targets = np.array([-10.0, 100.0, 500.0, 900.0, 2000.0])
+
+        # act
+        result = olieigra.interpolate(x, values, targets, counts)
+        clamped = olieigra.interpolate(x, values, targets, counts, clamp=True)
+
+        # assert
+        self.assertEqual((4, 5, 2), result.shape)
+        for i in [0, 1]:
+            for k in [0, 1]:
+                expected = np.interp(targets, x[i, :counts[i]], values[i, :counts[i], k])
+                np.testing.assert_allclose(expected, clamped[i, :, k])
+                inside = (targets >= x[i, 0]) & (targets <= x[i, counts[i] - 1])
+                np.testing.assert_allclose(expected[inside], result[i, inside, k])
+                self.assertTrue(np.all(np.isnan(result[i, ~inside, k])))
+        self.assertTrue(np.all(np.isnan(clamped[2])))
+        np.testing.assert_allclose(values[3, 0], clamped[3, 1])
+
+    def test_interpolate_logpressure_decreasing(self):
+        """Pressure rows may decrease and are interpolated linearly in ln(p)"""
+        # arrange
+        pres = np.array([[100000.0, 50000.0, 10000.0]])
+        temp = np.array([[15.0, -20.0, -60.0]])
+
+        # act
+        linear = olieigra.interpolate(pres, temp, [75000.0])
+        log = olieigra.interpolate(pres, temp, [75000.0], method='log')
+
+        # assert
+        self.assertAlmostEqual(-2.5, linear[0, 0])
+        weight = np.log(75000 / 100000) / np.log(50000 / 100000)
+        self.assertAlmostEqual(15 - 35 * weight, log[0, 0])
+
+    def test_interpolate_pertargets_success(self):
+        """Each sounding can have its own targets"""
+        # arrange
+        x = np.array([[0.0, 10.0], [0.0, 20.0]])
+        values = np.array([[0.0, 1.0], [0.0, 1.0]])
+
+        # act
+        result = olieigra.interpolate(x, values, np.array([[5.0], [5.0]]))
+
+        # assert
+        np.testing.assert_allclose([[0.5], [0.25]], result)
+
+    def test_interpolate_throws_unknownmethod(self):
+        """An unknown method throws an exception"""
+        self.assertRaises(ValueError, olieigra.interpolate, [[1.0]], [[1.0]], [1.0],
+                          method='cubic')
+
+
+class PadTests(unittest.TestCase):
+    """Unit tests for functions pad_ragged and pad_bodies"""
+
+    def test_padragged_pads_success(self):
+        """Concatenated rows are padded with NaN"""
+        # arrange, act
+        result = olieigra.pad_ragged(np.arange(5.0), np.array([2, 0, 3]))
+
+        # assert
+        np.testing.assert_array_equal([[0, 1, np.nan], [np.nan] * 3, [2, 3, 4]], result)
+
+    def test_padbodies_stacks_success(self):
+        """Decoded bodies are stacked by field"""
+        # arrange
+        bodies = [olieigra.decode_body(["20 10305    747 33064B -542B-9999 -8888   286   298 \n"]),
+                  olieigra.decode_body([])]
+
+        # act
+        values, counts = olieigra.pad_bodies(bodies, ['pres', 'gph'])
+
+        # assert
+        self.assertEqual((2, 1, 2), values.shape)
+        np.testing.assert_array_equal([1, 0], counts)
+        np.testing.assert_array_equal([747, 33064], values[0, 0])
@@ -0,0 +1,94 @@
+"""Unit tests for module mapped_stream"""
+import tempfile
+import unittest
+from src import olieigra
+from src.olieigra.io_wrapper import IOWrapper
+
+
+class MappedStreamTests(unittest.TestCase):
+    """Unit tests for class MappedStream"""
+
+    def test_read_streamlike_success(self):
+        """The stream reads, seeks and tells like a binary file"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            filename = self.write(path, b"ab\ncdef\ngh")
+
+            # act
+            with IOWrapper().open_mapped_file(filename) as stream:
+                first = stream.readline()
+                part = stream.readline(2)
+                rest = stream.readline()
+                stream.seek(1)
+                middle = stream.read(3)
+                position = stream.tell()
+                last = stream.readline()
+                end = stream.readline()
+
+            # assert
+            self.assertEqual(b"ab\n", first)
+            self.assertEqual(b"cd", part)
+            self.assertEqual(b"ef\n", rest)
+            self.assertEqual(b"b\nc", middle)
+            self.assertEqual(4, position)
+            self.assertEqual(b"def\n", last)
+            self.assertEqual(b"gh", end)
+
+    def test_readview_zerocopy_success(self):
+        """A view reads into the map and survives the close of the stream"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            filename = self.write(path, b"ab\ncd\n")
+            stream = IOWrapper().open_mapped_file(filename)
+
+            # act
+            stream.readline()
+            view = stream.read_view(10)
+            stream.close()
+
+            # assert
+            self.assertIsInstance(view, memoryview)
+            self.assertEqual(b"cd\n", bytes(view))
+            self.assertTrue(stream.closed)
+
+    def test_read_empty_success(self):
+        """An empty file can't be mapped but still reads as empty"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            filename = self.write(path, b"")
+
+            # act
+            with IOWrapper().open_mapped_file(filename) as stream:
+                result = stream.readline()
+
+            # assert
+            self.assertEqual(b"", result)
+
+    def test_readfromstream_vectorized_success(self):
+        """The Reader decodes body blocks straight from the map"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            generator = olieigra.SyntheticIgra2(levels=4, hours=(0,))
+            filename = self.write(path, generator.station_bytes(0))
+            callbacks = olieigra.Callbacks()
+            callbacks.vectorized = True
+            callbacks.parse_header = lambda header: True
+            bodies = []
+            callbacks.parse_body_array = bodies.append
+            reader = olieigra.Reader(callbacks=callbacks)
+
+            # act
+            with IOWrapper().open_mapped_file(filename) as stream:
+                result = reader.read_from_stream(stream)
+
+            # assert
+            self.assertEqual((366, 366 * 5), result)
+            self.assertEqual(366, len(bodies))
+            self.assertEqual('21', bodies[0]['type'][0])
+
+    def write(self, path: str, data: bytes) -> str:
+        """Write a file to map"""
+        filename = f'{path}/USM00072201-data.txt'
+        with open(filename, 'wb') as file:
+            file.write(data)
+        return filename
@@ -0,0 +1,149 @@
+"""Unit tests for module multi_callbacks"""
+import io
+import unittest
+from unittest.mock import MagicMock
+from src import olieigra
+
+
+class MultiCallbacksTests(unittest.TestCase):
+    """Unit tests for class MultiCallbacks"""
+
+    def test_startfile_active_anyaccepts(self):
+        """A file is processed if at least one consumer accepts it"""
+        # arrange
+        first, second = self.consumer(), self.consumer()
+        first.start_file = MagicMock(return_value=False)
+        second.start_file = MagicMock(return_value=True)
+        callbacks = olieigra.MultiCallbacks([first, second])
+
+        # act
+        result = callbacks.start_file('dillon.txt')
+
+        # assert
+        self.assertTrue(result)
+        self.assertEqual([second], callbacks.active)
+
+    def test_startfile_skips_noneaccepts(self):
+        """A file is skipped if no consumer accepts it"""
+        # arrange
+        callbacks = olieigra.MultiCallbacks([self.consumer(), self.consumer()])
+
+        # act, assert
+        self.assertFalse(callbacks.start_file('dillon.txt'))
+
+    def test_finishfile_results_activeonly(self):
+        """Only the consumers that accepted the file are finished"""
+        # arrange
+        first, second = self.consumer(), self.consumer()
+        second.start_file = MagicMock(return_value=True)
+        second.finish_file = MagicMock(return_value='dillon')
+        callbacks = olieigra.MultiCallbacks([first, second])
+        callbacks.start_file('dillon.txt')
+
+        # act
+        result = callbacks.finish_file(10, 20)
+
+        # assert
+        self.assertEqual([None, 'dillon'], result)
+        first.finish_file.assert_not_called()
+        second.finish_file.assert_called_once_with(10, 20)
+
+    def test_finishfile_stats_wantsstats(self):
+        """Only the consumers that want stats are given them"""
+        # arrange
+        first, second = self.consumer(), self.consumer()
+        first.start_file = MagicMock(return_value=True)
+        second.start_file = MagicMock(return_value=True)
+        second.wants_stats = True
+        callbacks = olieigra.MultiCallbacks([first, second])
+        callbacks.start_file('dillon.txt')
+        stats = olieigra.ReadStats()
+
+        # act
+        callbacks.finish_file(10, 20, stats)
+
+        # assert
+        self.assertTrue(callbacks.wants_stats)
+        first.finish_file.assert_called_once_with(10, 20)
+        second.finish_file.assert_called_once_with(10, 20, stats)
+
+    def test_readfromstream_parsesonce_success(self):
+        """Each body is parsed once and only handed to the consumers that want it"""
+        # arrange
+        first, second = self.consumer(True), self.consumer(True)
+        first.parse_header = MagicMock(side_effect=[True, False])
+        second.parse_header = MagicMock(side_effect=[True, True])
+        callbacks = olieigra.MultiCallbacks([first, second])
+        reader = olieigra.Reader(callbacks=callbacks)
+        reader.parse_body = MagicMock(wraps=reader.parse_body)
+        callbacks.start_file('dillon.txt')
+
+        # act
+        reader.read_from_stream(io.StringIO(self.sample_file()))
+
+        # assert
+        self.assertEqual(2, reader.parse_body.call_count)
+        self.assertEqual(1, first.parse_body.call_count)
+        self.assertEqual(2, second.parse_body.call_count)
+        shared = second.parse_body.call_args_list[0].args[0]
+        self.assertIs(first.parse_body.call_args.args[0], shared)
+
+    def test_readfromstream_skipsbody_nonewants(self):
+        """A body nobody asked for is skipped"""
+        # arrange
+        consumer = self.consumer(True)
+        callbacks = olieigra.MultiCallbacks([consumer])
+        reader = olieigra.Reader(callbacks=callbacks)
+        reader.skip_body = MagicMock(wraps=reader.skip_body)
+        callbacks.start_file('dillon.txt')
+
+        # act
+        reader.read_from_stream(io.StringIO(self.sample_file()))
+
+        # assert
+        self.assertEqual(2, reader.skip_body.call_count)
+        consumer.parse_body.assert_not_called()
+
+    def test_parsebodyarray_mixed_success(self):
+        """Vectorized consumers get the array, the others get BodyModels"""
+        # arrange
+        vectorized, plain = self.consumer(True), self.consumer(True)
+        vectorized.vectorized = True
+        vectorized.parse_header = MagicMock(return_value=True)
+        plain.parse_header = MagicMock(return_value=True)
+        callbacks = olieigra.MultiCallbacks([vectorized, plain])
+        reader = olieigra.Reader(callbacks=callbacks)
+        callbacks.start_file('dillon.txt')
+
+        # act
+        reader.read_from_stream(io.StringIO(self.sample_file()))
+
+        # assert
+        self.assertTrue(callbacks.vectorized)
+        self.assertEqual(2, vectorized.parse_body_array.call_count)
+        vectorized.parse_body.assert_not_called()
+        body = plain.parse_body.call_args.args[0]
+        self.assertIsInstance(body[0], olieigra.BodyModel)
+        self.assertEqual([98107, 97609, 95916], [item.pres for item in body])
+
+    def consumer(self, accept_file: bool = False) -> olieigra.Callbacks:
+        """A consumer with mocked callbacks"""
+        consumer = olieigra.Callbacks()
+        consumer.start_file = MagicMock(return_value=accept_file)
+        consumer.finish_file = MagicMock()
+        consumer.parse_header = MagicMock(return_value=False)
+        consumer.parse_body = MagicMock()
+        consumer.parse_body_array = MagicMock()
+        return consumer
+
+    def sample_file(self) -> str:
+        """Simple sample test case igra2 file"""
+        return (
+            "#USM00072649 2023 11 18 12 1101    2 ncdc-nws           448497  -935647\n"
+            "21     0  98022B  290    -9B  810    28   360     0 \n"
+            "20     4  97717   316B   -1B  771    35   275    26 \n"
+            "#USM00072649 2023 11 18 00 2303    3 ncdc-nws           448497  -935647\n"
+            "21     0  98107B  290    65B  350   143   360     0 \n"
+            "20     7  97609   332B   66B  339   147   208    45 \n"
+            "20    33  95916   476B   60B  325   152   224    73 \n"
+        )
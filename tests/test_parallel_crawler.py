@@ -0,0 +1,134 @@
+"""Unit tests for module parallel_crawler"""
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from zipfile import ZipFile, ZipInfo
+from src import olieigra
+from src.olieigra import parallel_crawler
+from src.olieigra.io_wrapper import IOWrapper
+
+
+class CountingCallbacks(olieigra.Callbacks):
+    """Accept data files and report the counts back to the parent"""
+
+    def start_file(self, filename: str) -> bool:
+        return filename.endswith('-data.txt')
+
+    def finish_file(self, headers: int, rows: int):
+        return headers, rows
+
+    def parse_header(self, header: olieigra.HeaderModel) -> bool:
+        return False
+
+
+class ParallelCrawlerTests(unittest.TestCase):
+    """Unit tests for class ParallelCrawler"""
+
+    def test_listtasks_largestfirst_success(self):
+        """Tasks are scheduled by uncompressed size, largest first"""
+        # arrange
+        archive = IOWrapper()
+        archive.close = MagicMock()
+        archive.filelist = [self.zip_info('a', 10), self.zip_info('b', 30)]
+        wrapper = IOWrapper()
+        wrapper.list_dir = MagicMock(return_value=['x.zip', 'c'])
+        wrapper.open_archive = MagicMock(return_value=archive)
+        wrapper.file_size = MagicMock(return_value=20)
+        crawler = olieigra.ParallelCrawler(CountingCallbacks, io=wrapper)
+
+        # act
+        tasks = crawler.list_tasks('/some/random/path')
+
+        # assert
+        self.assertEqual(['b', 'c', 'a'], [task.filename for task in tasks])
+        self.assertEqual([30, 20, 10], [task.size for task in tasks])
+        self.assertEqual('x.zip', tasks[0].archive)
+        self.assertIsNone(tasks[1].archive)
+        archive.close.assert_called_once()
+
+    def test_listtasks_selects_stations(self):
+        """Only the files and members of the selected stations become tasks"""
+        # arrange
+        archive = IOWrapper()
+        archive.close = MagicMock()
+        archive.filelist = [self.zip_info('USM00072201-data.txt', 10),
+                            self.zip_info('USM00072250-data.txt', 30)]
+        wrapper = IOWrapper()
+        wrapper.list_dir = MagicMock(return_value=['x.zip', 'USM00072649-data.txt.zip',
+                                                   'USM00072201-data.txt'])
+        wrapper.open_archive = MagicMock(return_value=archive)
+        wrapper.file_size = MagicMock(return_value=20)
+        crawler = olieigra.ParallelCrawler(CountingCallbacks, io=wrapper,
+                                           stations={'USM00072201'})
+
+        # act
+        tasks = crawler.list_tasks('/some/random/path')
+
+        # assert
+        self.assertEqual([(None, 'USM00072201-data.txt'), ('x.zip', 'USM00072201-data.txt')],
+                         [(task.archive, task.filename) for task in tasks])
+        wrapper.open_archive.assert_called_once_with('/some/random/path/x.zip')
+
+    def test_crawltask_skips_callbackfalse(self):
+        """A task the callbacks decline is reported as not processed"""
+        # arrange
+        task = olieigra.CrawlTask('/some/random/path', None, 'dillon.txt', 0)
+
+        # act
+        result = parallel_crawler.crawl_task(CountingCallbacks, olieigra.Reader, task)
+
+        # assert
+        self.assertFalse(result.processed)
+        self.assertIsNone(result.result)
+
+    def test_crawltask_stats_instrument(self):
+        """An instrumented task returns the stats of its file"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            with open(f'{path}/USM00072649-data.txt', 'w', encoding='UTF-8') as file:
+                file.write(self.sample_file())
+            task = olieigra.CrawlTask(path, None, 'USM00072649-data.txt', 0)
+
+            # act
+            result = parallel_crawler.crawl_task(CountingCallbacks, olieigra.Reader, task, True)
+
+            # assert
+            self.assertEqual('USM00072649-data.txt', result.stats.filename)
+            self.assertEqual(len(self.sample_file()), result.stats.bytes_read)
+
+    def test_crawl_reduces_success(self):
+        """Files and archive members are processed in workers and reduced in the parent"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            with open(f'{path}/USM00072649-data.txt', 'w', encoding='UTF-8') as file:
+                file.write(self.sample_file())
+            with ZipFile(f'{path}/USM00072650-data.txt.zip', 'w') as archive:
+                archive.writestr('USM00072650-data.txt', self.sample_file() * 2)
+            reduced = []
+            crawler = olieigra.ParallelCrawler(CountingCallbacks, max_workers=2)
+
+            # act
+            results = crawler.crawl(path, reduce=reduced.append)
+
+            # assert
+            self.assertEqual(2, len(results))
+            self.assertEqual(results, reduced)
+            counts = {result.task.filename: result.result for result in results}
+            self.assertEqual((1, 3), counts['USM00072649-data.txt'])
+            self.assertEqual((2, 6), counts['USM00072650-data.txt'])
+            self.assertFalse(os.path.exists(f'{path}/USM00072650-data.txt'))
+
+    def zip_info(self, filename: str, size: int) -> ZipInfo:
+        """Build a ZipInfo with an uncompressed size"""
+        info = ZipInfo(filename)
+        info.file_size = size
+        return info
+
+    def sample_file(self) -> str:
+        """Simple sample test case igra2 file"""
+        return (
+            "#USM00072649 2023 11 18 12 1101    2 ncdc-nws           448497  -935647\n"
+            "21     0  98022B  290    -9B  810    28   360     0 \n"
+            "20     4  97717   316B   -1B  771    35   275    26 \n"
+        )
@@ -0,0 +1,103 @@
+"""Unit tests for module parcel"""
+import io
+import unittest
+import warnings
+import numpy as np
+from metpy import calc
+from metpy.units import units
+from src import olieigra
+from src.olieigra import parcel
+
+
+def synthetic_columns(soundings: int) -> tuple[np.ndarray, ...]:
+    """Padded pres, temp, dew and counts of synthetic soundings"""
+    generator = olieigra.SyntheticIgra2(levels=40, missing_ratio=0.05)
+    reader = olieigra.Reader().iter_soundings(io.BytesIO(generator.station_bytes(0)))
+    bodies = [item.body for batch in olieigra.batched(reader, soundings) for item in batch]
+    derived = olieigra.derive(np.concatenate(bodies[:soundings]))
+    columns = [olieigra.pad_ragged(derived[name], [len(b) for b in bodies[:soundings]])
+               for name in ['pres', 'temp', 'dewpoint']]
+
+    return olieigra.drop_missing(*columns)
+
+
+class ParcelTests(unittest.TestCase):
+    """Unit tests for module parcel"""
+
+    def test_lcl_matchesmetpy_success(self):
+        """The LCL agrees with MetPy"""
+        # arrange
+        pres, temp, dew = np.array([1000.0, 850.0]), np.array([30.0, 10.0]), np.array([20.0, 9.0])
+
+        # act
+        p_lcl, t_lcl = olieigra.lcl(pres, temp, dew)
+
+        # assert
+        expected_p, expected_t = calc.lcl(pres * units.hPa, temp * units.degC, dew * units.degC)
+        np.testing.assert_allclose(expected_p.m_as('hPa'), p_lcl, atol=1e-6)
+        np.testing.assert_allclose(expected_t.m_as('degC'), t_lcl, atol=1e-6)
+
+    def test_parcel_matchesmetpy_success(self):
+        """Profile, lifted index, CAPE and CIN agree with MetPy sounding by sounding"""
+        # arrange
+        pres, temp, dew, counts = synthetic_columns(40)
+
+        # act
+        profile = olieigra.parcel_profile(pres, temp, dew, counts)
+        lifted = olieigra.lifted_index(pres, temp, profile, counts)
+        cape, cin = olieigra.cape_cin(pres, temp, dew, profile, counts)
+
+        # assert
+        self.assertTrue(np.any(cape > 0))
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            for i, count in enumerate(counts):
+                p = pres[i, :count] * units.hPa
+                t = temp[i, :count] * units.degC
+                td = dew[i, :count] * units.degC
+                expected = calc.parcel_profile(p, t[0], td[0])
+                expected_cape, expected_cin = calc.cape_cin(p, t, td, expected)
+
+                np.testing.assert_allclose(expected.m_as('degC'), profile[i, :count], atol=0.01)
+                self.assertAlmostEqual(calc.lifted_index(p, t, expected).m[0], lifted[i], 2)
+                self.assertAlmostEqual(expected_cape.m, cape[i], delta=0.5)
+                self.assertAlmostEqual(expected_cin.m, cin[i], delta=0.5)
+        self.assertTrue(np.all(np.isnan(profile[np.arange(pres.shape[1]) >= counts[:, None]])))
+
+    def test_liftedindex_short_nan(self):
+        """A sounding that does not reach 500 hPa has no lifted index"""
+        # arrange
+        pres = np.array([[1000.0, 900.0, 800.0]])
+        temp = np.array([[25.0, 18.0, 10.0]])
+        profile = olieigra.parcel_profile(pres, temp, temp - 5)
+
+        # act
+        result = olieigra.lifted_index(pres, temp, profile)
+
+        # assert
+        self.assertTrue(np.isnan(result[0]))
+
+    def test_dropmissing_compacts_success(self):
+        """Levels with a NaN in any column move to the padding"""
+        # arrange
+        pres = np.array([[1000.0, 900.0, 800.0], [1000.0, 900.0, np.nan]])
+        temp = np.array([[20.0, np.nan, 10.0], [20.0, 15.0, 10.0]])
+
+        # act
+        pres, temp, counts = olieigra.drop_missing(pres, temp, counts=[3, 2])
+
+        # assert
+        np.testing.assert_array_equal([2, 2], counts)
+        np.testing.assert_array_equal([[1000, 800, np.nan], [1000, 900, np.nan]], pres)
+        np.testing.assert_array_equal([[20, 10, np.nan], [20, 15, np.nan]], temp)
+
+    def test_lambertwminus1_inverse_success(self):
+        """W(-1) inverts w * exp(w) on its branch"""
+        # arrange
+        w = -np.array([1.01, 1.5, 3.0, 10.0, 40.0])
+
+        # act
+        result = parcel.lambert_w_minus1(w * np.exp(w))
+
+        # assert
+        np.testing.assert_allclose(w, result, rtol=1e-9)
@@ -0,0 +1,78 @@
+"""Unit tests for module parquet_sink"""
+import os
+import tempfile
+import unittest
+import pyarrow as pa
+import pyarrow.parquet as pq
+from src import olieigra
+
+
+class ParquetSinkTests(unittest.TestCase):
+    """Unit tests for class ParquetSink"""
+
+    def test_write_partitions_success(self):
+        """Batches are split into one folder per partition value"""
+        with tempfile.TemporaryDirectory() as root:
+            # arrange
+            sink = olieigra.ParquetSink(root, name='w')
+            headers = pa.record_batch({'id': ['a', 'b', 'a'], 'sounding': [0, 0, 1]})
+            levels = pa.record_batch({'id': ['a', 'b'], 'pres': [1, 2]})
+
+            # act
+            sink.write(headers, levels)
+            sink.close()
+
+            # assert
+            self.assertEqual(['part-w-0.parquet'], os.listdir(f'{root}/headers/id=a'))
+            self.assertEqual(['part-w-0.parquet'], os.listdir(f'{root}/levels/id=b'))
+            table = pq.read_table(f'{root}/headers/id=a/part-w-0.parquet')
+            self.assertEqual(['sounding'], table.column_names)
+            self.assertEqual([0, 1], table.column('sounding').to_pylist())
+
+    def test_flush_newpart_reopened(self):
+        """Writing to a partition after a flush starts a new part file"""
+        with tempfile.TemporaryDirectory() as root:
+            # arrange
+            sink = olieigra.ParquetSink(root, name='w')
+            batch = pa.record_batch({'id': ['a'], 'sounding': [0]})
+
+            # act
+            sink.write_batch('headers', batch)
+            sink.flush()
+            sink.write_batch('headers', batch)
+            sink.flush()
+
+            # assert
+            self.assertEqual(['part-w-0.parquet', 'part-w-1.parquet'],
+                             sorted(os.listdir(f'{root}/headers/id=a')))
+
+    def test_flush_partial_open(self):
+        """Part files keep a .partial name until they are flushed"""
+        with tempfile.TemporaryDirectory() as root:
+            # arrange
+            sink = olieigra.ParquetSink(root, name='w')
+            batch = pa.record_batch({'id': ['a'], 'sounding': [0]})
+
+            # act
+            sink.write_batch('headers', batch)
+
+            # assert
+            self.assertEqual(['part-w-0.partial'], os.listdir(f'{root}/headers/id=a'))
+            sink.close()
+
+    def test_writer_distinctparts_twosinks(self):
+        """Two sinks writing the same partition never pick the same part file"""
+        with tempfile.TemporaryDirectory() as root:
+            # arrange
+            sinks = [olieigra.ParquetSink(root), olieigra.ParquetSink(root)]
+            batch = pa.record_batch({'id': ['a'], 'sounding': [0]})
+
+            # act
+            for sink in sinks:
+                sink.write_batch('headers', batch)
+            for sink in sinks:
+                sink.flush()
+
+            # assert
+            self.assertEqual(2, len(os.listdir(f'{root}/headers/id=a')))
+            self.assertEqual(2, pq.read_table(f'{root}/headers').num_rows)
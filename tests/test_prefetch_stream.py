@@ -0,0 +1,64 @@
+"""Unit tests for module prefetch_stream"""
+import io
+import unittest
+from unittest.mock import MagicMock
+from src import olieigra
+
+
+class PrefetchStreamTests(unittest.TestCase):
+    """Unit tests for class PrefetchStream"""
+
+    def test_read_everything_buffered(self):
+        """Everything the source holds comes through a BufferedReader in order"""
+        # arrange
+        data = bytes(range(256)) * 100
+        stream = io.BufferedReader(olieigra.PrefetchStream(io.BytesIO(data), 1000, 2), 300)
+
+        # act
+        result = stream.read()
+        stream.close()
+
+        # assert
+        self.assertEqual(data, result)
+
+    def test_seek_withinhistory_success(self):
+        """Seeking forward skips ahead and seeking back works within the history"""
+        # arrange
+        data = bytes(range(100))
+        stream = olieigra.PrefetchStream(io.BytesIO(data), 10, 2, history=1)
+
+        # act
+        stream.seek(35)
+        first = stream.read(3)
+        stream.seek(22)
+        second = stream.read(3)
+
+        # assert
+        self.assertEqual(data[35:38], first)
+        self.assertEqual(data[22:25], second)
+        self.assertRaises(io.UnsupportedOperation, stream.seek, 5)
+        stream.close()
+
+    def test_read_raises_sourceerror(self):
+        """An error of the source is raised by the reading thread"""
+        # arrange
+        source = MagicMock()
+        source.read = MagicMock(side_effect=OSError('dillon'))
+        stream = olieigra.PrefetchStream(source)
+
+        # act, assert
+        self.assertRaises(OSError, stream.read, 10)
+        stream.close()
+
+    def test_close_stopsthread_unread(self):
+        """Closing a stream that was not read to the end stops the thread"""
+        # arrange
+        source = io.BytesIO(bytes(1000))
+        stream = olieigra.PrefetchStream(source, 10, 1)
+
+        # act
+        stream.close()
+
+        # assert
+        self.assertFalse(stream.thread.is_alive())
+        self.assertTrue(source.closed)
@@ -0,0 +1,233 @@
+"""Unit tests for module quality"""
+import contextlib
+import io
+import math
+import unittest
+from unittest.mock import MagicMock
+import numpy as np
+from src import olieigra
+
+
+class QualityTests(unittest.TestCase):
+    """Unit tests for module quality"""
+
+    def test_quality_counts_success(self):
+        """Levels are counted by type and checked for missing values per sounding"""
+        # arrange
+        body = olieigra.decode_body(sample_body())
+
+        # act
+        result = olieigra.quality(body, [4, 1])
+
+        # assert
+        self.assertEqual(olieigra.QUALITY_DTYPE, result.dtype)
+        self.assertEqual([4, 1], result['levels'].tolist())
+        self.assertEqual([1, 0], result['standard_levels'].tolist())
+        self.assertEqual([2, 1], result['other_levels'].tolist())
+        self.assertEqual([1, 0], result['non_pressure_levels'].tolist())
+        self.assertEqual([1, 0], result['surface_levels'].tolist())
+        self.assertEqual([1, 1], result['tropopause_levels'].tolist())
+        self.assertEqual([2, 0], result['usable'].tolist())
+        self.assertEqual([1, 0], result['usable_low'].tolist())
+        self.assertEqual([True, False], result['has_surface'].tolist())
+        self.assertEqual([True, False], result['usable_surface'].tolist())
+        self.assertEqual([12000.0, 9000.0], result['max_gph'].tolist())
+        self.assertEqual([25000.0, 30000.0], result['min_pres'].tolist())
+        self.assertEqual(10500.0, result['usable_max_gph'][0])
+        self.assertEqual(25000.0, result['usable_min_pres'][0])
+        self.assertAlmostEqual(0.25, result['missing_rh'][0])
+        self.assertEqual([0.0, 1.0], result['missing_wspd'].tolist())
+
+    def test_quality_surfaceonly_type21(self):
+        """Only type 21 records are surface levels, not 11 or 31 ones"""
+        # arrange
+        body = olieigra.decode_body([
+            olieigra.synthetic.body_line('11', 98000, 300, 150, 800, 50, 180, 30),
+            olieigra.synthetic.body_line('31', -9999, 300, 150, 800, 50, 180, 30),
+            olieigra.synthetic.body_line('21', 98000, 300, 150, 800, 50, 180, 30)
+        ])
+
+        # act
+        result = olieigra.quality(body, [2, 1])
+
+        # assert
+        self.assertEqual([0, 1], result['surface_levels'].tolist())
+        self.assertEqual([False, True], result['has_surface'].tolist())
+        self.assertEqual([False, True], result['usable_surface'].tolist())
+
+    def test_quality_nan_nolevels(self):
+        """A sounding without levels has no ratios or extremes"""
+        # arrange
+        body = olieigra.decode_body(sample_body())
+
+        # act
+        result = olieigra.quality(body, [0, 4, 0, 1, 0])
+
+        # assert
+        self.assertEqual([0, 2, 0, 0, 0], result['usable'].tolist())
+        self.assertTrue(math.isnan(result['missing_temp'][0]))
+        self.assertTrue(math.isnan(result['max_gph'][2]))
+        self.assertTrue(math.isnan(result['usable_max_gph'][3]))
+        self.assertEqual(12000.0, result['max_gph'][1])
+
+    def test_quality_matchesloop_synthetic(self):
+        """The usable counts and surface flags match a loop over the body models"""
+        # arrange
+        generator = olieigra.SyntheticIgra2(levels=30, missing_ratio=0.2)
+        soundings = olieigra.Reader().iter_soundings(io.BytesIO(generator.station_bytes(0)))
+        bodies = [sounding.body.array() for sounding in soundings]
+
+        # act
+        result = olieigra.quality(np.concatenate(bodies), [len(body) for body in bodies])
+
+        # assert
+        for body, row in zip(bodies, result):
+            usable = [item for item in olieigra.to_body_models(body) if item.type[0] != '3'
+                      and not any(math.isnan(getattr(item, name)) for name in
+                                  ('gph', 'temp', 'rh', 'dpdp', 'wdir', 'wspd'))]
+            low = [item for item in usable if item.gph <= 10000]
+            self.assertEqual(len(usable), row['usable'])
+            self.assertEqual(len(low), row['usable_low'])
+            self.assertEqual(any(item.type == '21' for item in low), row['usable_surface'])
+
+    def test_stationquality_aggregates_success(self):
+        """Soundings are summarized per station, missing ratios weighted by levels"""
+        # arrange
+        soundings = np.zeros(3, dtype=olieigra.SOUNDING_QUALITY_DTYPE)
+        soundings['id'] = [b'B', b'A', b'B']
+        soundings['year'] = [2001, 2000, 1999]
+        soundings['levels'] = [10, 5, 30]
+        soundings['usable_low'] = [4, 1, 8]
+        soundings['usable_surface'] = [True, False, True]
+        soundings['max_gph'] = [np.nan, 100.0, 2000.0]
+        soundings['missing_temp'] = [0.5, 0.2, 0.1]
+
+        # act
+        result = olieigra.station_quality(soundings)
+
+        # assert
+        self.assertEqual(olieigra.STATION_QUALITY_DTYPE, result.dtype)
+        self.assertEqual([b'A', b'B'], result['id'].tolist())
+        self.assertEqual([1, 2], result['soundings'].tolist())
+        self.assertEqual([2000, 1999], result['first_year'].tolist())
+        self.assertEqual([2000, 2001], result['last_year'].tolist())
+        self.assertEqual([5, 40], result['levels'].tolist())
+        self.assertEqual([0, 2], result['usable_surface'].tolist())
+        self.assertEqual([5.0, 20.0], result['mean_levels'].tolist())
+        self.assertEqual([1.0, 6.0], result['mean_usable_low'].tolist())
+        self.assertEqual([100.0, 2000.0], result['max_gph'].tolist())
+        self.assertAlmostEqual(8 / 40, result['missing_temp'][1], places=6)
+
+    def test_mergestationquality_matchessoundings_success(self):
+        """Merging the summaries of two files gives the summary of all their soundings"""
+        # arrange
+        soundings = np.zeros(4, dtype=olieigra.SOUNDING_QUALITY_DTYPE)
+        soundings['id'] = [b'B', b'A', b'B', b'B']
+        soundings['year'] = [2001, 2000, 1999, 2010]
+        soundings['levels'] = [10, 5, 30, 20]
+        soundings['usable_low'] = [4, 1, 8, 3]
+        soundings['usable_surface'] = [True, False, True, True]
+        soundings['max_gph'] = [np.nan, 100.0, 2000.0, 3000.0]
+        soundings['missing_temp'] = [0.5, 0.2, 0.1, 0.25]
+        expected = olieigra.station_quality(soundings)
+
+        # act
+        result = olieigra.merge_station_quality(np.concatenate([
+            olieigra.station_quality(soundings[:3]), olieigra.station_quality(soundings[3:])]))
+
+        # assert
+        self.assertEqual([b'A', b'B'], result['id'].tolist())
+        for name in olieigra.STATION_QUALITY_DTYPE.names[1:]:
+            np.testing.assert_allclose(expected[name], result[name], rtol=1e-6, err_msg=name)
+
+
+class QualityCallbacksTests(unittest.TestCase):
+    """Unit tests for class QualityCallbacks"""
+
+    def test_finishfile_buildstable_success(self):
+        """Every sounding gets its header alongside its metrics, one batch at a time"""
+        # arrange
+        sink = MagicMock()
+        callbacks = olieigra.QualityCallbacks(sink, batch_size=1)
+        callbacks.accept_header = MagicMock(side_effect=[False, True, True])
+        reader = olieigra.Reader(callbacks=callbacks)
+        callbacks.start_file('USM00072649-data.txt')
+
+        # act
+        reader.read_from_stream(io.StringIO(self.sample_file()))
+        callbacks.finish_file(3, 10)
+
+        # assert
+        soundings = callbacks.soundings
+        sink.write.assert_called_once_with('USM00072649-data.txt', soundings)
+        self.assertEqual(olieigra.SOUNDING_QUALITY_DTYPE, soundings.dtype)
+        self.assertEqual([1, 2], soundings['sounding'].tolist())
+        self.assertEqual([0, 12], soundings['hour'].tolist())
+        self.assertEqual([4, 1], soundings['levels'].tolist())
+        self.assertEqual([True, False], soundings['usable_surface'].tolist())
+        self.assertEqual([b'USM00072649'], callbacks.stations['id'].tolist())
+        self.assertEqual([2], callbacks.stations['soundings'].tolist())
+
+    def test_finishfile_acceptsstats_wantsstats(self):
+        """An instrumented Crawler can hand its ReadStats to finish_file"""
+        # arrange
+        callbacks = olieigra.QualityCallbacks()
+        callbacks.start_file('USM00072649-data.txt')
+
+        # act
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            callbacks.finish_file(0, 0, olieigra.ReadStats('USM00072649-data.txt'))
+
+        # assert
+        self.assertIn('USM00072649-data.txt', output.getvalue().splitlines()[-1])
+
+    def test_soundings_filterable_soundingfilter(self):
+        """The table of a file can be filtered like the header index"""
+        # arrange
+        callbacks = olieigra.QualityCallbacks()
+        reader = olieigra.Reader(callbacks=callbacks)
+        callbacks.start_file('USM00072649-data.txt')
+        reader.read_from_stream(io.StringIO(self.sample_file()))
+        callbacks.finish_file(3, 10)
+
+        # act
+        mask = olieigra.SoundingFilter(hours={0}, bbox=(44, -94, 45, -93)).mask(
+            callbacks.soundings)
+
+        # assert
+        self.assertEqual([False, True, False], mask.tolist())
+
+    def test_startfile_skips_notdatafile(self):
+        """Only Igra2 data files are processed by default"""
+        # arrange
+        callbacks = olieigra.QualityCallbacks()
+
+        # act, assert
+        self.assertTrue(callbacks.start_file('USM00072649-data.txt'))
+        self.assertFalse(callbacks.start_file('igra2-station-list.txt'))
+
+    def sample_file(self) -> str:
+        """Sample igra2 file of three soundings"""
+        body = sample_body()
+        return (
+            "#USM00072649 2023 11 18 12 1101    0 ncdc-nws           448497  -935647\n"
+            "#USM00072649 2023 11 19 00 2303    4 ncdc-nws           448497  -935647\n" +
+            ''.join(body[:4]) +
+            "#USM00072649 2023 11 19 12 2303    1 ncdc-nws           448497  -935647\n" +
+            body[4]
+        )
+
+
+def sample_body() -> list[str]:
+    """Body lines of a sounding of four levels and one of a single level"""
+    return [
+        olieigra.synthetic.body_line('21', 98000, 300, 150, 800, 50, 180, 30),
+        olieigra.synthetic.body_line('10', 50000, 5600, -200, -9999, 100, 270, 150),
+        olieigra.synthetic.body_line('22', 25000, 10500, -550, 200, 120, 260, 300),
+        olieigra.synthetic.body_line('30', -9999, 12000, -600, 100, 150, 250, 350),
+        olieigra.synthetic.body_line('22', 30000, 9000, -500, 150, 100, 250, -9999)
+    ]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+"""Unit tests for module read_stats"""
+import io
+import unittest
+from src import olieigra
+from src.olieigra.read_stats import TimedStream
+
+
+class ReadStatsTests(unittest.TestCase):
+    """Unit tests for class ReadStats"""
+
+    def test_sum_adds_numbers(self):
+        """Summing adds the counters and timings and keeps the given names"""
+        # arrange
+        first = olieigra.ReadStats('a', 'x.zip', bytes_read=10, headers=1, io_seconds=0.5)
+        second = olieigra.ReadStats('b', 'x.zip', bytes_read=20, headers=2, io_seconds=0.25)
+
+        # act
+        result = olieigra.ReadStats.sum([first, second], 'x.zip')
+
+        # assert
+        self.assertEqual('x.zip', result.filename)
+        self.assertIsNone(result.archive)
+        self.assertEqual(30, result.bytes_read)
+        self.assertEqual(3, result.headers)
+        self.assertEqual(0.75, result.io_seconds)
+
+
+class TimedStreamTests(unittest.TestCase):
+    """Unit tests for class TimedStream"""
+
+    def test_read_countsbytes_buffered(self):
+        """Reads through a BufferedReader are counted and seeks are passed on"""
+        # arrange
+        stats = olieigra.ReadStats()
+        stream = io.BufferedReader(TimedStream(io.BytesIO(b"a\nbc\n"), stats), 4)
+
+        # act
+        first = stream.readline()
+        stream.seek(2)
+        second = stream.read()
+
+        # assert
+        self.assertEqual(b"a\n", first)
+        self.assertEqual(b"bc\n", second)
+        self.assertEqual(5, stats.bytes_read)
+        self.assertTrue(stream.seekable())
+        self.assertGreater(stats.io_seconds, 0)
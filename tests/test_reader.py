@@ -1,7 +1,9 @@
 """Unit tests for module reader"""
+import io
 import math
 import unittest
 from unittest.mock import MagicMock
+import numpy as np
 from src import olieigra
 
 
@@ -72,6 +74,51 @@ class ReaderTests(unittest.TestCase):
         # assert
         self.assertEqual(2, reader.readline.call_count)
 
+    def test_skipbody_seeks_fixedwidth(self):
+        """A seekable binary stream of fixed-width lines is skipped without reading each line"""
+        # arrange
+        reader = olieigra.Reader()
+        stream = io.BytesIO(''.join(self.sample_file()).encode())
+        stream.readline()
+        stream.readline = MagicMock(wraps=stream.readline)
+
+        # act
+        reader.skip_body(stream, 2)
+
+        # assert
+        stream.readline.assert_not_called()
+        self.assertTrue(reader.seek_skip)
+        self.assertEqual(b'#', stream.read(1))
+
+    def test_skipbody_readlines_ragged(self):
+        """Lines that aren't fixed-width fall back to reading line by line"""
+        # arrange
+        reader = olieigra.Reader()
+        stream = io.BytesIO(b"a\nb\nc\n")
+
+        # act
+        reader.skip_body(stream, 2)
+
+        # assert
+        self.assertFalse(reader.seek_skip)
+        self.assertEqual(b"c\n", stream.readline())
+
+    def test_readfromstream_skipsbodies_crlf(self):
+        """Rejected bodies of a CRLF file are skipped whole, even at 54 levels"""
+        # arrange
+        data = olieigra.SyntheticIgra2(stations=1, levels=54).station_bytes(0)
+        stream = io.BufferedReader(io.BytesIO(data.replace(b"\n", b"\r\n")))
+        callbacks = olieigra.Callbacks()
+        callbacks.parse_header = MagicMock(return_value=False)
+        reader = olieigra.Reader(callbacks=callbacks)
+
+        # act
+        headers, rows = reader.read_from_stream(stream)
+
+        # assert
+        self.assertEqual(data.count(b"#"), headers)
+        self.assertEqual(data.count(b"\n"), rows)
+
     def test_parsebody_correctlist_success(self):
         """When parsing the body, get a list of records"""
         # arrange
@@ -90,6 +137,23 @@ class ReaderTests(unittest.TestCase):
         self.assertEqual(1433, result[0].pres)
         self.assertEqual(1229, result[1].pres)
 
+    def test_parsebody_lazylist_lazy(self):
+        """A lazy reader keeps the lines and decodes fields on access"""
+        # arrange
+        reader = olieigra.Reader(lazy=True)
+        reader.readline = MagicMock(side_effect=[
+            b"20  9219   1433 28939B -587B   11   291   336   121 \n",
+            b"20  9447   1229 29905B-9999B   11   291   285    44 \n"])
+
+        # act
+        result = reader.parse_body(reader, 2)
+
+        # assert
+        self.assertIsInstance(result[0], olieigra.LazyBodyModel)
+        self.assertEqual(1433, result[0].pres)
+        self.assertEqual(-587, result[0].temp)
+        self.assertTrue(math.isnan(result[1].temp))
+
     def test_parseheader_throws_failure(self):
         """An invalid header should throw an exception"""
         # arrange
@@ -121,6 +185,83 @@ class ReaderTests(unittest.TestCase):
         self.assertEqual(448497, value.lat)
         self.assertEqual(-935647, value.lon)
 
+    def test_parseheader_bytes_success(self):
+        """A header read from a binary stream parses to the same text fields"""
+        # arrange
+        line = b"#USM00072649 2023 11 18 12 1101   91 ncdc-nws           448497  -935647\n"
+        reader = olieigra.Reader()
+
+        # act
+        value = reader.parse_header(line)
+
+        # assert
+        self.assertEqual('USM00072649', value.id)
+        self.assertEqual(91, value.numlev)
+        self.assertEqual("ncdc-nws", value.p_src)
+        self.assertEqual("", value.np_src)
+        self.assertEqual(-935647, value.lon)
+
+    def test_parsebodyline_bytes_success(self):
+        """A body line read from a binary stream keeps a text level type"""
+        # arrange
+        line = b"20 10305    747 33064B -542B-9999 -9999   286   298 \n"
+        reader = olieigra.Reader()
+
+        # act
+        value = reader.parse_body_line(line)
+
+        # assert
+        self.assertEqual('20', value.type)
+        self.assertEqual(747, value.pres)
+        self.assertTrue(math.isnan(value.rh))
+
+    def test_readfromstream_binary_success(self):
+        """A binary stream is read the same way as a text stream"""
+        # arrange
+        callbacks = olieigra.Callbacks()
+        callbacks.parse_header = MagicMock(side_effect=[False, True])
+        callbacks.parse_body = MagicMock()
+        reader = olieigra.Reader(callbacks=callbacks)
+        stream = io.BytesIO(''.join(self.sample_file()).encode())
+
+        # act
+        headers, rows = reader.read_from_stream(stream)
+
+        # assert
+        self.assertEqual(2, headers)
+        self.assertEqual(7, rows)
+        body = callbacks.parse_body.call_args.args[0]
+        self.assertEqual(['21', '20', '20'], [item.type for item in body])
+
+    def test_parsebodyarray_block_seekablebinary(self):
+        """A seekable binary stream reads the body as one block"""
+        # arrange
+        reader = olieigra.Reader()
+        stream = io.BytesIO(''.join(self.sample_file()[5:]).encode())
+        stream.readline = MagicMock(wraps=stream.readline)
+
+        # act
+        result = reader.parse_body_array(stream, 2)
+
+        # assert
+        stream.readline.assert_not_called()
+        self.assertEqual([97609, 95916], result['pres'].tolist())
+        self.assertEqual(b"", stream.read())
+
+    def test_parsebodyarray_readlines_ragged(self):
+        """A binary stream that isn't fixed-width is read line by line"""
+        # arrange
+        reader = olieigra.Reader()
+        lines = [line.rstrip(' \n') + '\n' for line in self.sample_file()[5:]]
+        stream = io.BytesIO(''.join(lines).encode())
+
+        # act
+        result = reader.parse_body_array(stream, 2)
+
+        # assert
+        self.assertFalse(reader.seek_skip)
+        self.assertEqual([97609, 95916], result['pres'].tolist())
+
     def test_readfromstream_correctcounts_success(self):
         """Make sure the header and row counts are accurate"""
         # arrange
@@ -154,6 +295,147 @@ class ReaderTests(unittest.TestCase):
         reader.skip_body.assert_called_once_with(reader, 3)
         reader.parse_body.assert_called_once_with(reader, 2)
 
+    def test_readfromstream_parsesarray_vectorized(self):
+        """A vectorized callback receives the body as a structured array"""
+        # arrange
+        callbacks = olieigra.Callbacks()
+        callbacks.vectorized = True
+        callbacks.parse_header = MagicMock(return_value=True)
+        callbacks.parse_body = MagicMock()
+        callbacks.parse_body_array = MagicMock()
+        reader = olieigra.Reader(callbacks=callbacks)
+        reader.readline = MagicMock(side_effect=self.sample_file())
+
+        # act
+        headers, rows = reader.read_from_stream(reader)
+
+        # assert
+        self.assertEqual(2, headers)
+        self.assertEqual(7, rows)
+        callbacks.parse_body.assert_not_called()
+        self.assertEqual(2, callbacks.parse_body_array.call_count)
+        body = callbacks.parse_body_array.call_args_list[1].args[0]
+        self.assertEqual(3, len(body))
+        self.assertEqual(95916, body['pres'][2])
+
+    def test_parsebodyarray_correctarray_success(self):
+        """When parsing the body as an array, get a structured array"""
+        # arrange
+        reader = olieigra.Reader()
+        reader.readline = MagicMock(side_effect=[
+            "20  9219   1433 28939B -587B   11   291   336   121 \n",
+            "20  9447   1229 29905B -581B   11   291   285    44 \n",
+            "20  9528   1177 30177B -578B   11   293   270    72 \n"])
+
+        # act
+        result = reader.parse_body_array(reader, 2)
+
+        # assert
+        self.assertEqual(2, reader.readline.call_count)
+        self.assertEqual(2, len(result))
+        self.assertEqual(1433, result['pres'][0])
+        self.assertEqual(1229, result['pres'][1])
+
+    def test_readfromstream_skips_headerfilter(self):
+        """Headers rejected by the header filter never reach the callbacks"""
+        # arrange
+        callbacks = olieigra.Callbacks()
+        callbacks.parse_header = MagicMock(return_value=True)
+        callbacks.parse_body = MagicMock()
+        reader = olieigra.Reader(callbacks=callbacks,
+                                 header_filter=olieigra.SoundingFilter(hours={0}))
+        reader.parse_header = MagicMock(wraps=reader.parse_header)
+        stream = io.BytesIO(''.join(self.sample_file()).encode())
+
+        # act
+        headers, rows = reader.read_from_stream(stream)
+
+        # assert
+        self.assertEqual(2, headers)
+        self.assertEqual(7, rows)
+        reader.parse_header.assert_called_once()
+        callbacks.parse_header.assert_called_once()
+        self.assertEqual(0, callbacks.parse_header.call_args.args[0].hour)
+        self.assertEqual(3, len(callbacks.parse_body.call_args.args[0]))
+
+    def test_readfromindex_seeks_success(self):
+        """Only the soundings at the index offsets are read"""
+        # arrange
+        callbacks = olieigra.Callbacks()
+        callbacks.parse_header = MagicMock(return_value=True)
+        callbacks.parse_body = MagicMock()
+        reader = olieigra.Reader(callbacks=callbacks)
+        stream = io.StringIO(''.join(self.sample_file()))
+        entries = np.array([(b'USM00072649', 2023, 11, 18, 0, 3, 178)],
+                           dtype=olieigra.INDEX_DTYPE)
+
+        # act
+        headers, rows = reader.read_from_index(stream, entries)
+
+        # assert
+        self.assertEqual(1, headers)
+        self.assertEqual(4, rows)
+        self.assertEqual(0, callbacks.parse_header.call_args.args[0].hour)
+        self.assertEqual(3, len(callbacks.parse_body.call_args.args[0]))
+
+    def test_readfromindex_countsfile_selection(self):
+        """The counts and stats cover the whole file, as read_from_stream reports them"""
+        # arrange
+        callbacks = olieigra.Callbacks()
+        callbacks.parse_header = MagicMock(side_effect=[True, False])
+        callbacks.parse_body = MagicMock()
+        reader = olieigra.Reader(callbacks=callbacks,
+                                 header_filter=olieigra.SoundingFilter(hours={0, 12}))
+        reader.stats = olieigra.ReadStats()
+        header = "#USM00072649 2023 03 31 {} 1101    1 ncdc-nws ncdc-nws  448497  -935647\n"
+        body = "20  9219   1433 28939B -587B   11   291   336   121 \n"
+        data = ''.join(header.format(hour) + body for hour in ['00', '06', '12']).encode()
+        index = olieigra.SoundingIndex.build(io.BytesIO(data), len(data))
+
+        # act
+        result = reader.read_from_index(io.BytesIO(data), index.entries)
+
+        # assert
+        self.assertEqual((3, 6), result)
+        self.assertEqual(1, reader.stats.accepted)
+        self.assertEqual(2, reader.stats.skipped)
+
+    def test_readtail_appended_checkpoint(self):
+        """With a matching checkpoint, only the appended soundings are read"""
+        # arrange
+        callbacks = olieigra.Callbacks()
+        callbacks.parse_header = MagicMock(return_value=True)
+        callbacks.parse_body = MagicMock()
+        reader = olieigra.Reader(callbacks=callbacks)
+        data = ''.join(self.sample_file()).encode()
+        _, _, checkpoint = reader.read_tail(io.BytesIO(data[:178]), None)
+        callbacks.parse_header.reset_mock()
+
+        # act
+        headers, rows, result = reader.read_tail(io.BytesIO(data), checkpoint)
+
+        # assert
+        self.assertEqual((1, 4), (headers, rows))
+        self.assertEqual(0, callbacks.parse_header.call_args.args[0].hour)
+        self.assertEqual((409, 178), (result.offset, result.start))
+
+    def test_readtail_readsall_rewritten(self):
+        """A checkpoint that doesn't match anymore reads the stream from the start"""
+        # arrange
+        callbacks = olieigra.Callbacks()
+        callbacks.parse_header = MagicMock(return_value=False)
+        reader = olieigra.Reader(callbacks=callbacks)
+        data = ''.join(self.sample_file()).encode()
+        _, _, checkpoint = reader.read_tail(io.BytesIO(data[:178]), None)
+
+        # act
+        headers, rows, result = reader.read_tail(io.BytesIO(data.replace(b'290', b'291')),
+                                                 checkpoint)
+
+        # assert
+        self.assertEqual((2, 7), (headers, rows))
+        self.assertEqual(409, result.offset)
+
     def sample_file(self) -> list[str]:
         """Simple sample test case igra2 file"""
         return [
@@ -174,3 +456,61 @@ class ReaderTests(unittest.TestCase):
             "#USM00072649 2023 11 18 00 2303    3 ncdc-nws           448497  -935647\n",
             ""
         ]
+
+    def test_readfromstream_countsstats_stats(self):
+        """With stats set, accepted and skipped soundings are counted"""
+        # arrange
+        callbacks = olieigra.Callbacks()
+        callbacks.parse_header = MagicMock(side_effect=[True, False])
+        callbacks.parse_body = MagicMock()
+        reader = olieigra.Reader(callbacks=callbacks,
+                                 header_filter=olieigra.SoundingFilter(hours={0, 12}))
+        reader.stats = olieigra.ReadStats()
+        header = "#USM00072649 2023 03 31 {} 1101    1 ncdc-nws ncdc-nws  448497  -935647\n"
+        body = "20  9219   1433 28939B -587B   11   291   336   121 \n"
+        data = ''.join(header.format(hour) + body for hour in ['00', '06', '12'])
+
+        # act
+        reader.read_from_stream(io.BytesIO(data.encode()))
+
+        # assert
+        self.assertEqual(1, reader.stats.accepted)
+        self.assertEqual(2, reader.stats.skipped)
+        callbacks.parse_body.assert_called_once()
+        self.assertGreater(reader.stats.header_seconds, 0)
+
+    def test_itersoundings_parseswhenasked_success(self):
+        """Bodies are only parsed when asked for and skipped otherwise"""
+        # arrange
+        reader = olieigra.Reader(header_filter=olieigra.SoundingFilter(hours={0, 12}))
+        reader.parse_body = MagicMock(wraps=reader.parse_body)
+        reader.skip_body = MagicMock(wraps=reader.skip_body)
+        header = "#USM00072649 2023 03 31 {} 1101    1 ncdc-nws ncdc-nws  448497  -935647\n"
+        body = "20  9219   1433 28939B -587B   11   291   336   121 \n"
+        data = ''.join(header.format(hour) + body for hour in ['00', '06', '12'])
+        bodies = []
+
+        # act
+        for sounding in reader.iter_soundings(io.BytesIO(data.encode()), 'dillon.txt'):
+            if sounding.header.hour == 12:
+                bodies.append(sounding.body.models())
+
+        # assert
+        self.assertEqual(1, len(bodies))
+        self.assertEqual(1433, bodies[0][0].pres)
+        reader.parse_body.assert_called_once()
+        self.assertEqual(2, reader.skip_body.call_count)
+
+    def test_itersoundings_expires_advanced(self):
+        """A body can't be read once the iterator moved on"""
+        # arrange
+        reader = olieigra.Reader()
+        data = olieigra.SyntheticIgra2(levels=2, hours=(0,)).station_bytes(0)
+
+        # act
+        soundings = list(reader.iter_soundings(io.BytesIO(data), 'dillon.txt'))
+
+        # assert
+        self.assertEqual(366, len(soundings))
+        self.assertEqual('dillon.txt', soundings[0].source)
+        self.assertRaises(ValueError, soundings[0].body.array)
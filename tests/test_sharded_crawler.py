@@ -0,0 +1,181 @@
+"""Unit tests for module sharded_crawler"""
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from zipfile import ZipFile
+from src import olieigra
+from src.olieigra import sharded_crawler
+
+
+class ShardedCrawlerTests(unittest.TestCase):
+    """Unit tests for class ShardedCrawler"""
+
+    def test_assignshards_balanced_success(self):
+        """Tasks are dealt out by size, whatever order they are listed in"""
+        # arrange
+        tasks = [self.task(name, size) for name, size in
+                 [('a', 50), ('b', 40), ('c', 30), ('d', 20), ('e', 20), ('f', 10)]]
+
+        # act
+        result = olieigra.assign_shards(tasks, 2)
+        shuffled = olieigra.assign_shards(tasks[::-1], 2)
+
+        # assert
+        self.assertEqual([0, 1, 1, 0, 0, 1], result)
+        self.assertEqual(result[::-1], shuffled)
+        self.assertEqual([90, 80], [sum(t.size for t, s in zip(tasks, result) if s == shard)
+                                    for shard in (0, 1)])
+
+    def test_init_throws_invalidshard(self):
+        """A shard index outside the shard count throws an exception"""
+        # arrange, act, assert
+        self.assertRaises(ValueError, olieigra.ShardedCrawler, olieigra.Crawler(), 2, 2)
+
+    def test_crawl_splitsshards_success(self):
+        """The shards together crawl every file and member exactly once"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            self.write_files(path)
+            offered = []
+            reports = []
+
+            # act
+            for shard in range(2):
+                crawler = self.crawler(offered)
+                reports.append(olieigra.ShardedCrawler(crawler, shard, 2).crawl(path))
+
+            # assert
+            self.assertEqual(4, len(offered))
+            self.assertEqual(4, len(set(offered)))
+            self.assertEqual([[0], [1]], [report.shards for report in reports])
+            self.assertEqual([2, 2], [len(report.entries) for report in reports])
+            self.assertTrue(all(entry['processed'] for entry in reports[0].entries))
+
+    def test_crawl_stealsunclaimed_lockdir(self):
+        """With a lock dir, a shard steals the tasks nobody claimed and skips claimed ones"""
+        with tempfile.TemporaryDirectory() as path, tempfile.TemporaryDirectory() as locks:
+            # arrange
+            self.write_files(path)
+            tasks = olieigra.parallel_crawler.list_tasks(olieigra.io_wrapper.IOWrapper(), path)
+            shards = olieigra.assign_shards(tasks, 2)
+            claimed = next(task for task, shard in zip(tasks, shards) if shard == 1)
+            self.assertTrue(sharded_crawler.claim(locks, claimed, 'other'))
+            offered = []
+
+            # act
+            report = olieigra.ShardedCrawler(self.crawler(offered), 0, 2, locks, 'me').crawl(path)
+
+            # assert
+            self.assertEqual(3, len(offered))
+            self.assertNotIn(claimed.filename, offered)
+            self.assertEqual([0, 0, 1], [entry['shard'] for entry in report.entries])
+            self.assertEqual(4, len(os.listdir(locks)))
+            self.assertEqual([claimed], report.missing(tasks))
+
+    def test_run_releaseslock_failure(self):
+        """A task that fails gives its lock back"""
+        with tempfile.TemporaryDirectory() as path, tempfile.TemporaryDirectory() as locks:
+            # arrange
+            self.write_files(path)
+            crawler = self.crawler([])
+            crawler.process_igra2_file = MagicMock(side_effect=OSError)
+            sharded = olieigra.ShardedCrawler(crawler, 0, 1, locks)
+
+            # act, assert
+            self.assertRaises(OSError, sharded.crawl, path)
+            self.assertEqual([], os.listdir(locks))
+
+    def test_crawl_reportscounts_instrument(self):
+        """An instrumented Crawler adds the headers and rows of every file to the report"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            self.write_files(path)
+            crawler = self.crawler([])
+            crawler.instrument = True
+
+            # act
+            report = olieigra.ShardedCrawler(crawler).crawl(path)
+
+            # assert
+            self.assertEqual({'tasks': 4, 'processed': 4, 'headers': 4 * 366,
+                              'rows': 4 * 366 * 3}, {key: value for key, value in
+                                                     report.summary().items()
+                                                     if key not in ('size', 'seconds')})
+
+    def crawler(self, offered: list) -> olieigra.Crawler:
+        """Crawler whose callbacks record the files offered to them"""
+        callbacks = olieigra.Callbacks()
+        callbacks.start_file = MagicMock(side_effect=lambda f: offered.append(f) or True)
+        callbacks.parse_header = MagicMock(return_value=False)
+        callbacks.finish_file = MagicMock()
+        return olieigra.Crawler(reader=olieigra.Reader(callbacks=callbacks))
+
+    def write_files(self, path: str):
+        """Two plain files and an archive of two members"""
+        generator = olieigra.SyntheticIgra2(stations=4, levels=2, hours=(0,))
+        with ZipFile(f'{path}/igra2.zip', 'w') as archive:
+            for station, name in enumerate(generator.filenames()[:2]):
+                archive.writestr(name, generator.station_bytes(station))
+        for station, name in enumerate(generator.filenames()[2:], 2):
+            with open(f'{path}/{name}', 'wb') as file:
+                file.write(generator.station_bytes(station))
+
+    def task(self, name: str, size: int) -> olieigra.CrawlTask:
+        """A task of a plain file"""
+        return olieigra.CrawlTask('/path', None, name, size)
+
+
+class ShardReportTests(unittest.TestCase):
+    """Unit tests for class ShardReport"""
+
+    def test_merge_combines_success(self):
+        """Reports of the shards merge into one, whatever the order"""
+        # arrange
+        first = olieigra.ShardReport(2, [1], ['b'], '2024-01-01T01:00', '2024-01-01T03:00',
+                                     [self.entry('y', 1)])
+        second = olieigra.ShardReport(2, [0], ['a'], '2024-01-01T00:00', '2024-01-01T02:00',
+                                      [self.entry('x', 0)])
+
+        # act
+        result = olieigra.ShardReport.merge([first, second])
+        again = olieigra.ShardReport.merge([second, olieigra.ShardReport.merge([first])])
+
+        # assert
+        self.assertEqual([0, 1], result.shards)
+        self.assertEqual(['b', 'a'], result.owners)
+        self.assertEqual('2024-01-01T00:00', result.started)
+        self.assertEqual('2024-01-01T03:00', result.finished)
+        self.assertEqual(['x', 'y'], [entry['task']['filename'] for entry in result.entries])
+        self.assertEqual(result.entries, again.entries)
+
+    def test_merge_throws_othercrawl(self):
+        """Reports with different shard counts don't merge"""
+        # arrange
+        reports = [olieigra.ShardReport(2, [0], ['a']), olieigra.ShardReport(3, [0], ['a'])]
+
+        # act, assert
+        self.assertRaises(ValueError, olieigra.ShardReport.merge, reports)
+
+    def test_saveload_roundtrip_success(self):
+        """A report survives a round trip through JSON"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            report = olieigra.ShardReport(2, [1], ['b'], 'x', 'y', [self.entry('y', 1)])
+
+            # act
+            report.save(f'{path}/shard-1.json')
+            result = olieigra.ShardReport.load(f'{path}/shard-1.json')
+
+            # assert
+            self.assertEqual(report, result)
+            self.assertEqual(['shard-1.json'], os.listdir(path))
+
+    def entry(self, name: str, shard: int) -> dict:
+        """A report entry of a processed plain file"""
+        return {'task': {'path': '/path', 'archive': None, 'filename': name, 'size': 10},
+                'shard': shard, 'owner': 'a', 'processed': True, 'seconds': 1.0}
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+"""Unit tests for module sounding_cache"""
+import io
+import os
+import tempfile
+import unittest
+from datetime import date
+import numpy as np
+from src import olieigra
+from src.olieigra.sounding_cache import cache_path
+
+
+class SoundingCacheTests(unittest.TestCase):
+    """Unit tests for class SoundingCache"""
+
+    def test_build_packs_success(self):
+        """Headers and levels are packed with their offsets and valid masks"""
+        # arrange
+        stream = io.BytesIO(self.sample_file())
+
+        # act
+        cache = olieigra.SoundingCache.build(stream, 500, 7, 'x')
+
+        # assert
+        self.assertEqual(2, len(cache.headers))
+        self.assertEqual([0, 2], cache.headers['start'].tolist())
+        self.assertEqual([2, 3], cache.headers['numlev'].tolist())
+        self.assertEqual(b'ncdc-nws', cache.headers['p_src'][0])
+        self.assertEqual(448497, cache.headers['lat'][1])
+        self.assertEqual(5, len(cache.levels))
+        self.assertEqual([0b111111, 0b111011], cache.valid[:2].tolist())
+        self.assertEqual(0b001111, cache.valid[4])
+        self.assertEqual(0, cache.levels['wdir'][4])
+
+    def test_body_roundtrip_success(self):
+        """Bodies unpack to what the text decoder returns, NaN where missing"""
+        # arrange
+        soundings = olieigra.Reader().iter_soundings(io.BytesIO(self.sample_file()))
+        expected = [sounding.body.array() for sounding in soundings]
+
+        # act
+        cache = olieigra.SoundingCache.build(io.BytesIO(self.sample_file()), 500)
+
+        # assert
+        for i, body in enumerate(expected):
+            result = cache.body(i)
+            self.assertEqual(body['type'].tolist(), result['type'].tolist())
+            for name in olieigra.BODY_DTYPE.names[1:]:
+                np.testing.assert_array_equal(body[name], result[name])
+
+    def test_header_roundtrip_success(self):
+        """Headers come back as the HeaderModel the text parser builds"""
+        # arrange
+        line = self.sample_file().split(b'\n', maxsplit=1)[0]
+
+        # act
+        cache = olieigra.SoundingCache.build(io.BytesIO(self.sample_file()), 500)
+
+        # assert
+        self.assertEqual(olieigra.Reader().parse_header(line), cache.header(0))
+
+    def test_build_throws_overflow(self):
+        """A value that doesn't fit its int16 column throws an exception"""
+        # arrange
+        stream = io.BytesIO(
+            b"#USM00072649 2023 11 18 12 1101    1 ncdc-nws           448497  -935647\n"
+            b"21     0  98022B  290    -9B  810    28   360 99999 \n"
+        )
+
+        # act, assert
+        self.assertRaises(ValueError, olieigra.SoundingCache.build, stream, 500)
+
+    def test_saveload_roundtrip_success(self):
+        """A cache survives a round trip through its directory, memory mapped"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            cache = olieigra.SoundingCache.build(io.BytesIO(self.sample_file()), 500, 7, 'x')
+
+            # act
+            cache.save(f'{path}/a.cache')
+            result = olieigra.SoundingCache.load(f'{path}/a.cache')
+
+            # assert
+            self.assertTrue(os.path.exists(f'{path}/a.cache/key.npy'))
+            self.assertIsInstance(result.levels, np.memmap)
+            self.assertTrue(result.matches(500, 7, 'x'))
+            self.assertFalse(result.matches(500, 8, 'x'))
+            self.assertFalse(result.matches(500, 7, 'y'))
+            self.assertEqual(cache.headers.tolist(), result.headers.tolist())
+            self.assertEqual(cache.levels.tolist(), result.levels.tolist())
+
+    def test_itersoundings_filters_success(self):
+        """Only the soundings the header filter accepts are yielded"""
+        # arrange
+        cache = olieigra.SoundingCache.build(io.BytesIO(self.sample_file()), 500)
+        header_filter = olieigra.SoundingFilter(hours={0})
+
+        # act
+        result = list(cache.iter_soundings('a.txt', header_filter))
+
+        # assert
+        self.assertEqual(1, len(result))
+        self.assertEqual('a.txt', result[0].source)
+        self.assertEqual(0, result[0].header.hour)
+        self.assertEqual(3, len(result[0].body.array()))
+        self.assertEqual(3, len(result[0].body.models()))
+
+    def test_readfromcache_matchesstream_success(self):
+        """Reading a cache calls back and counts like reading the text"""
+        # arrange
+        header_filter = olieigra.SoundingFilter(start=date(2023, 11, 18), hours={12})
+        cache = olieigra.SoundingCache.build(io.BytesIO(self.sample_file()), 500)
+        results = []
+
+        # act
+        for source in (io.BytesIO(self.sample_file()), cache):
+            callbacks = olieigra.Callbacks()
+            bodies = []
+            callbacks.parse_body = bodies.append
+            reader = olieigra.Reader(callbacks=callbacks, header_filter=header_filter)
+            if source is cache:
+                counts = reader.read_from_cache(cache)
+            else:
+                counts = reader.read_from_stream(source)
+            results.append((counts, [[model.temp for model in body] for body in bodies]))
+
+        # assert
+        self.assertEqual(results[0], results[1])
+        self.assertEqual((2, 7), results[1][0])
+
+    def test_readfromcache_countsrejected_success(self):
+        """Soundings the callbacks reject are counted as skipped"""
+        # arrange
+        cache = olieigra.SoundingCache.build(io.BytesIO(self.sample_file()), 500)
+        callbacks = olieigra.Callbacks()
+        callbacks.parse_header = lambda header: header.hour == 0
+        reader = olieigra.Reader(callbacks=callbacks)
+        reader.stats = olieigra.ReadStats()
+
+        # act
+        reader.read_from_cache(cache)
+
+        # assert
+        self.assertEqual((1, 1), (reader.stats.accepted, reader.stats.skipped))
+
+    def test_cachepath_member_success(self):
+        """Archive members get their own cache directory"""
+        # arrange, act, assert
+        self.assertEqual('c/b.txt.cache', cache_path('c', 'a/b.txt'))
+        self.assertEqual('c/b.zip.b.txt.cache', cache_path('c', 'a/b.zip', 'b.txt'))
+
+    def sample_file(self) -> bytes:
+        """Simple sample test case igra2 file"""
+        return (
+            b"#USM00072649 2023 11 18 12 1101    2 ncdc-nws           448497  -935647\n"
+            b"21     0  98022B  290    -9B  810    28   360     0 \n"
+            b"20     4  97717   316B   -1B-8888    35   275    26 \n"
+            b"#USM00072649 2023 11 18 00 2303    3 ncdc-nws           448497  -935647\n"
+            b"21     0  98107B  290    65B  350   143   360     0 \n"
+            b"20     7  97609   332B   66B  339   147   208    45 \n"
+            b"20    33  95916   476B   60B  325   152 -9999 -9999 \n"
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
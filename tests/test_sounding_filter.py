@@ -0,0 +1,111 @@
+"""Unit tests for module sounding_filter"""
+import unittest
+from datetime import date
+import numpy as np
+from src import olieigra
+
+
+class SoundingFilterTests(unittest.TestCase):
+    """Unit tests for class SoundingFilter"""
+
+    def test_select_all_empty(self):
+        """An empty filter selects everything"""
+        # arrange
+        selection = olieigra.SoundingFilter()
+
+        # act
+        result = selection.select(self.sample_entries())
+
+        # assert
+        self.assertEqual(4, len(result))
+
+    def test_select_daterange_success(self):
+        """The start date is inclusive and the end date is exclusive"""
+        # arrange
+        selection = olieigra.SoundingFilter(start=date(2000, 1, 1), end=date(2023, 11, 18))
+
+        # act
+        result = selection.select(self.sample_entries())
+
+        # assert
+        self.assertEqual([100, 200], result['offset'].tolist())
+
+    def test_select_hours_success(self):
+        """Only the requested hours are selected"""
+        # arrange
+        selection = olieigra.SoundingFilter(hours={12})
+
+        # act
+        result = selection.select(self.sample_entries())
+
+        # assert
+        self.assertEqual([0, 200, 300], result['offset'].tolist())
+
+    def test_select_stationsnumlev_success(self):
+        """Stations and the minimum number of levels are applied to the index"""
+        # arrange
+        entries = self.sample_entries()
+        entries['id'][0] = b'USM00072650'
+        entries['numlev'][3] = 1
+        selection = olieigra.SoundingFilter(stations={'USM00072649'}, min_numlev=2)
+
+        # act
+        result = selection.select(entries)
+
+        # assert
+        self.assertEqual([100, 200], result['offset'].tolist())
+
+    def test_accepts_empty_success(self):
+        """An empty filter accepts every header"""
+        # arrange
+        selection = olieigra.SoundingFilter()
+
+        # act, assert
+        self.assertTrue(selection.accepts(self.sample_header()))
+
+    def test_accepts_daterange_success(self):
+        """The start date is inclusive and the end date is exclusive"""
+        # arrange
+        line = self.sample_header()
+
+        # act, assert
+        self.assertTrue(olieigra.SoundingFilter(start=date(2023, 11, 18)).accepts(line))
+        self.assertFalse(olieigra.SoundingFilter(start=date(2023, 11, 19)).accepts(line))
+        self.assertTrue(olieigra.SoundingFilter(end=date(2023, 11, 19)).accepts(line))
+        self.assertFalse(olieigra.SoundingFilter(end=date(2023, 11, 18)).accepts(line))
+
+    def test_accepts_fields_success(self):
+        """Hours, stations and levels are checked against the raw columns"""
+        # arrange
+        line = self.sample_header()
+
+        # act, assert
+        self.assertTrue(olieigra.SoundingFilter(hours={0, 12}).accepts(line))
+        self.assertFalse(olieigra.SoundingFilter(hours={0}).accepts(line))
+        self.assertTrue(olieigra.SoundingFilter(stations={'USM00072649'}).accepts(line))
+        self.assertFalse(olieigra.SoundingFilter(stations={'USM00072650'}).accepts(line))
+        self.assertTrue(olieigra.SoundingFilter(min_numlev=91).accepts(line))
+        self.assertFalse(olieigra.SoundingFilter(min_numlev=92).accepts(line))
+
+    def test_accepts_bbox_success(self):
+        """The header location must be inside the bounding box"""
+        # arrange
+        line = self.sample_header().encode()
+
+        # act, assert
+        self.assertTrue(olieigra.SoundingFilter(bbox=(40, -100, 50, -90)).accepts(line))
+        self.assertFalse(olieigra.SoundingFilter(bbox=(40, -90, 50, -80)).accepts(line))
+        self.assertFalse(olieigra.SoundingFilter(bbox=(30, -100, 40, -90)).accepts(line))
+
+    def sample_header(self) -> str:
+        """Simple sample header"""
+        return "#USM00072649 2023 11 18 12 1101   91 ncdc-nws           448497  -935647\n"
+
+    def sample_entries(self) -> np.ndarray:
+        """Simple sample index entries"""
+        return np.array([
+            (b'USM00072649', 1999, 12, 31, 12, 2, 0),
+            (b'USM00072649', 2000, 1, 1, 0, 2, 100),
+            (b'USM00072649', 2023, 11, 17, 12, 2, 200),
+            (b'USM00072649', 2023, 11, 18, 12, 2, 300)
+        ], dtype=olieigra.INDEX_DTYPE)
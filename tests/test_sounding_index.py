@@ -0,0 +1,95 @@
+"""Unit tests for module sounding_index"""
+import io
+import os
+import tempfile
+import unittest
+import numpy as np
+from src import olieigra
+from src.olieigra.sounding_index import index_filename, is_sidecar
+
+
+class SoundingIndexTests(unittest.TestCase):
+    """Unit tests for class SoundingIndex"""
+
+    def test_build_offsets_success(self):
+        """Every header is recorded with its byte offset"""
+        # arrange
+        stream = io.BytesIO(self.sample_file())
+
+        # act
+        index = olieigra.SoundingIndex.build(stream, 500, 7)
+
+        # assert
+        self.assertEqual(2, len(index.entries))
+        self.assertEqual(b'USM00072649', index.entries['id'][0])
+        self.assertEqual([0, 178], index.entries['offset'].tolist())
+        self.assertEqual([2, 3], index.entries['numlev'].tolist())
+        self.assertEqual([12, 0], index.entries['hour'].tolist())
+        self.assertEqual(2023, index.entries['year'][1])
+
+    def test_build_throws_invalid(self):
+        """A body line where a header should be throws an exception"""
+        # arrange
+        stream = io.BytesIO(b"21     0  98022B  290    -9B  810    28   360     0 \n")
+
+        # act, assert
+        self.assertRaises(ValueError, olieigra.SoundingIndex.build, stream, 53)
+
+    def test_saveload_roundtrip_success(self):
+        """An index survives a round trip through its sidecar file"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            index = olieigra.SoundingIndex.build(io.BytesIO(self.sample_file()), 500, 7)
+            sidecar = f'{path}/a.idx.npz'
+
+            # act
+            index.save(sidecar)
+            result = olieigra.SoundingIndex.load(sidecar)
+
+            # assert
+            self.assertTrue(os.path.exists(sidecar))
+            self.assertTrue(result.matches(500, 7))
+            self.assertFalse(result.matches(501, 7))
+            self.assertEqual(index.entries.tolist(), result.entries.tolist())
+
+    def test_saveload_checksmtime_success(self):
+        """The modification time is kept, and an old sidecar without one loads empty"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            index = olieigra.SoundingIndex.build(io.BytesIO(self.sample_file()), 500,
+                                                 mtime='2024-01-31T12:00:00')
+            index.save(f'{path}/a.idx.npz')
+            np.savez(f'{path}/b.idx.npz', entries=index.entries, size=500, crc=0)
+
+            # act
+            result = olieigra.SoundingIndex.load(f'{path}/a.idx.npz')
+            old = olieigra.SoundingIndex.load(f'{path}/b.idx.npz')
+
+            # assert
+            self.assertTrue(result.matches(500, mtime='2024-01-31T12:00:00'))
+            self.assertFalse(result.matches(500, mtime='2024-02-01T12:00:00'))
+            self.assertEqual('', old.mtime)
+
+    def test_issidecar_success(self):
+        """Sidecar indexes are told apart from data files"""
+        # arrange, act, assert
+        self.assertTrue(is_sidecar('a.zip.b-data.txt.idx.npz'))
+        self.assertFalse(is_sidecar('b-data.txt'))
+
+    def test_indexfilename_member_success(self):
+        """Archive members get their own sidecar next to the archive"""
+        # arrange, act, assert
+        self.assertEqual('a/b.txt.idx.npz', index_filename('a/b.txt'))
+        self.assertEqual('a/b.zip.b.txt.idx.npz', index_filename('a/b.zip', 'b.txt'))
+
+    def sample_file(self) -> bytes:
+        """Simple sample test case igra2 file"""
+        return (
+            b"#USM00072649 2023 11 18 12 1101    2 ncdc-nws           448497  -935647\n"
+            b"21     0  98022B  290    -9B  810    28   360     0 \n"
+            b"20     4  97717   316B   -1B  771    35   275    26 \n"
+            b"#USM00072649 2023 11 18 00 2303    3 ncdc-nws           448497  -935647\n"
+            b"21     0  98107B  290    65B  350   143   360     0 \n"
+            b"20     7  97609   332B   66B  339   147   208    45 \n"
+            b"20    33  95916   476B   60B  325   152   224    73 \n"
+        )
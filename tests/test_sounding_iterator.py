@@ -0,0 +1,55 @@
+"""Unit tests for module sounding_iterator"""
+import io
+import unittest
+from unittest.mock import MagicMock
+import numpy as np
+from src import olieigra
+
+
+class SoundingBodyTests(unittest.TestCase):
+    """Unit tests for class SoundingBody"""
+
+    def test_models_readsonce_success(self):
+        """The body is parsed once and converted on demand"""
+        # arrange
+        reader = olieigra.Reader()
+        reader.parse_body = MagicMock(return_value=[olieigra.BodyModel("20", 1, 2, 3, 4, 5, 6, 7)])
+        body = olieigra.SoundingBody(reader, None, 1)
+
+        # act
+        models = body.models()
+        array = body.array()
+
+        # assert
+        reader.parse_body.assert_called_once_with(None, 1)
+        self.assertIs(models, body.models())
+        self.assertEqual(olieigra.BODY_DTYPE, array.dtype)
+        self.assertEqual(2, array['gph'][0])
+
+    def test_array_throws_expired(self):
+        """A body that was not read before the iterator moved on can't be read"""
+        # arrange
+        body = olieigra.SoundingBody(olieigra.Reader(), None, 1)
+        body.expired = True
+
+        # act, assert
+        self.assertRaises(ValueError, body.array)
+
+
+class BatchedTests(unittest.TestCase):
+    """Unit tests for function batched"""
+
+    def test_batched_readsbodies_success(self):
+        """Soundings are grouped with their bodies decoded"""
+        # arrange
+        reader = olieigra.Reader()
+        stream = io.BytesIO(olieigra.SyntheticIgra2(levels=3, hours=(0,)).station_bytes(0))
+
+        # act
+        batches = list(olieigra.batched(reader.iter_soundings(stream, 'a'), 100))
+
+        # assert
+        self.assertEqual([100, 100, 100, 66], [len(batch) for batch in batches])
+        self.assertIsInstance(batches[3][65].body, np.ndarray)
+        self.assertEqual(3, len(batches[3][65].body))
+        self.assertEqual('a', batches[0][0].source)
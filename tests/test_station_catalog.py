@@ -0,0 +1,147 @@
+"""Unit tests for module station_catalog"""
+import io
+import unittest
+from unittest.mock import MagicMock
+from src import olieigra
+from src.olieigra.io_wrapper import IOWrapper
+from src.olieigra.station_catalog import in_selection
+
+STATION_LIST = (
+    "USM00072201  24.5550  -81.7552    1.0 FL KEY WEST INTL AP               1941 2024  71016\n"
+    "USM00072250  25.9161  -97.4189   10.0 TX BROWNSVILLE                    1943 2024  69812\n"
+    "USM00072649  44.8489  -93.5656  287.0 MN CHANHASSEN                     1995 2024  22164\n"
+    "ACM00078861  17.1170  -61.7830   10.0    COOLIDGE FIELD (UA)            1947 1993  13896\n"
+    "RSM00025563  64.7300  177.5000   62.0    ANADYR                         1936 2024  50230\n"
+    "\n")
+
+
+class StationCatalogTests(unittest.TestCase):
+    """Unit tests for class StationCatalog"""
+
+    def setUp(self):
+        wrapper = IOWrapper()
+        wrapper.open_file = MagicMock(return_value=io.StringIO(STATION_LIST))
+        self.catalog = olieigra.StationCatalog.load('igra2-station-list.txt', wrapper)
+
+    def test_load_parses_success(self):
+        """The fixed-width station list is parsed"""
+        # act
+        station = self.catalog['ACM00078861']
+
+        # assert
+        self.assertEqual(5, len(self.catalog))
+        self.assertIn('USM00072649', self.catalog)
+        self.assertEqual(olieigra.Station('ACM00078861', 17.117, -61.783, 10.0, '',
+                                          'COOLIDGE FIELD (UA)', 1947, 1993, 13896), station)
+
+    def test_inbbox_selects_success(self):
+        """Stations within a box, also across the antimeridian"""
+        # arrange
+        boxes = [(20, -100, 30, -80), (60, 170, 70, -170), (0, 0, 10, 10)]
+
+        # act
+        result = [self.catalog.in_bbox(*box) for box in boxes]
+
+        # assert
+        self.assertEqual([{'USM00072201', 'USM00072250'}, {'RSM00025563'}, set()], result)
+
+    def test_within_selects_success(self):
+        """Stations within a great circle distance"""
+        # arrange
+        lat, lon = 25.0, -89.0
+
+        # act
+        near = self.catalog.within(lat, lon + 8, 100)
+        far = self.catalog.within(lat, lon, 900)
+
+        # assert
+        self.assertEqual({'USM00072201'}, near)
+        self.assertEqual({'USM00072201', 'USM00072250'}, far)
+
+    def test_nearest_ordered_success(self):
+        """The closest stations come first"""
+        # arrange
+        lat, lon = 26, -95
+
+        # act
+        result = self.catalog.nearest(lat, lon, 2)
+
+        # assert
+        self.assertEqual(['USM00072250', 'USM00072201'], result)
+
+    def test_inmaidenhead_selects_success(self):
+        """Stations within a maidenhead field or square"""
+        # arrange
+        fields = ['EL', 'EN']
+
+        # act
+        in_fields = set().union(*(self.catalog.in_maidenhead(field) for field in fields))
+        in_square = self.catalog.in_maidenhead('en34')
+
+        # assert
+        self.assertEqual({'USM00072201', 'USM00072250', 'USM00072649'}, in_fields)
+        self.assertEqual({'USM00072649'}, in_square)
+
+    def test_active_selects_success(self):
+        """Stations with observations in a range of years"""
+        # arrange
+        catalog = self.catalog
+
+        # act
+        early = catalog.active(1900, 1940)
+        stopped = catalog.active(1990, 1993) - catalog.active(1994, 2024)
+
+        # assert
+        self.assertEqual({'RSM00025563'}, early)
+        self.assertEqual({'ACM00078861'}, stopped)
+
+
+class StationFunctionTests(unittest.TestCase):
+    """Unit tests for the functions of module station_catalog"""
+
+    def test_maidenheadbbox_bounds_success(self):
+        """A locator decodes to its box"""
+        # arrange
+        locators = ['EM', 'EM12']
+
+        # act
+        result = [olieigra.maidenhead_bbox(locator) for locator in locators]
+
+        # assert
+        self.assertEqual([(30.0, -100.0, 40.0, -80.0), (32.0, -98.0, 33.0, -96.0)], result)
+
+    def test_maidenheadbbox_throws_invalid(self):
+        """Invalid locators throw an exception"""
+        # arrange
+        locators = ['E', 'ZZ', 'EMA1', 'EM1']
+
+        # act, assert
+        for locator in locators:
+            self.assertRaises(ValueError, olieigra.maidenhead_bbox, locator)
+
+    def test_stationid_parses_success(self):
+        """Files named after a station have its id"""
+        # arrange
+        filenames = ['USM00072201-data.txt.zip', '/a/b/USM00072201-data.txt',
+                     'igra2-station-list.txt']
+
+        # act
+        result = [olieigra.station_id(filename) for filename in filenames]
+
+        # assert
+        self.assertEqual(['USM00072201', 'USM00072201', None], result)
+
+    def test_inselection_selects_success(self):
+        """Only files of selected stations, and unnamed archives, are in a selection"""
+        # arrange
+        stations = {'USM00072201'}
+        cases = [(None, 'readme.txt', False), (stations, 'USM00072201-data.txt', False),
+                 (stations, 'USM00072250-data.txt', False), (stations, 'readme.txt', False),
+                 (stations, 'igra2.zip', True), (stations, 'USM00072250-data.txt.zip', True)]
+
+        # act
+        result = [in_selection(selection, filename, archive=archive)
+                  for selection, filename, archive in cases]
+
+        # assert
+        self.assertEqual([True, True, False, False, True, False], result)
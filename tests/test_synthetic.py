@@ -0,0 +1,58 @@
+"""Unit tests for module synthetic"""
+import io
+import os
+import tempfile
+import unittest
+from zipfile import ZipFile
+import numpy as np
+from src import olieigra
+
+
+class SyntheticIgra2Tests(unittest.TestCase):
+    """Unit tests for class SyntheticIgra2"""
+
+    def test_stationbytes_deterministic_success(self):
+        """The same settings produce the same bytes, another station differs"""
+        # arrange
+        generator = olieigra.SyntheticIgra2(stations=2, levels=5)
+
+        # act
+        first = generator.station_bytes(0)
+
+        # assert
+        self.assertEqual(first, olieigra.SyntheticIgra2(stations=2, levels=5).station_bytes(0))
+        self.assertNotEqual(first, generator.station_bytes(1))
+
+    def test_stationbytes_parses_success(self):
+        """The generated file is valid fixed-width Igra2"""
+        # arrange
+        generator = olieigra.SyntheticIgra2(levels=7, missing_ratio=0.5)
+        data = generator.station_bytes(0)
+
+        # act
+        headers, rows = olieigra.Reader().read_from_stream(io.BytesIO(data))
+        body = olieigra.decode_body(data.splitlines(keepends=True)[1:8])
+
+        # assert
+        self.assertEqual(732, generator.soundings())
+        self.assertEqual(732, headers)
+        self.assertEqual(732 * 8, rows)
+        self.assertEqual('21', body['type'][0])
+        self.assertTrue(np.all(np.diff(body['pres']) < 0))
+        self.assertTrue(np.isnan(body['temp']).any() or np.isnan(body['rh']).any())
+
+    def test_writearchive_members_success(self):
+        """An archive holds one member per station"""
+        with tempfile.TemporaryDirectory() as path:
+            # arrange
+            generator = olieigra.SyntheticIgra2(stations=3, levels=2, hours=(0,))
+
+            # act
+            generator.write_archive(f'{path}/igra2.zip')
+            files = generator.write_directory(path)
+
+            # assert
+            with ZipFile(f'{path}/igra2.zip') as archive:
+                self.assertEqual(files, archive.namelist())
+                self.assertEqual(generator.station_bytes(2), archive.read(files[2]))
+            self.assertTrue(os.path.exists(f'{path}/USM00072203-data.txt'))
@@ -0,0 +1,75 @@
+"""Unit tests for module tail_checkpoint"""
+import io
+import unittest
+from unittest.mock import MagicMock
+from src import olieigra
+
+
+class TailCheckpointTests(unittest.TestCase):
+    """Unit tests for class TailCheckpoint"""
+
+    def test_build_fingerprints_success(self):
+        """A checkpoint records the last sounding and leaves the stream at its end"""
+        # arrange
+        stream = io.BytesIO(self.sample_file())
+
+        # act
+        checkpoint = olieigra.TailCheckpoint.build(stream, 178, 409)
+
+        # assert
+        self.assertEqual(409, checkpoint.offset)
+        self.assertEqual(178, checkpoint.start)
+        self.assertEqual('USM00072649 2023 11 18 00', checkpoint.key)
+        self.assertEqual(409, stream.tell())
+
+    def test_matches_appended_success(self):
+        """A stream that only grew at the end matches, and is left at the offset"""
+        # arrange
+        checkpoint = olieigra.TailCheckpoint.build(io.BytesIO(self.sample_file()), 178, 409)
+        stream = io.BytesIO(self.sample_file() + self.sample_file()[:178])
+
+        # act
+        result = checkpoint.matches(stream)
+
+        # assert
+        self.assertTrue(result)
+        self.assertEqual(409, stream.tell())
+
+    def test_matches_fails_rewritten(self):
+        """A stream with a changed head, a changed last sounding or cut short doesn't match"""
+        # arrange
+        checkpoint = olieigra.TailCheckpoint.build(io.BytesIO(self.sample_file()), 178, 409)
+        head = self.sample_file().replace(b' 290 ', b' 291 ', 1)
+        tail = self.sample_file()[:-10] + b'9' + self.sample_file()[-9:]
+
+        # act, assert
+        self.assertFalse(checkpoint.matches(io.BytesIO(head)))
+        self.assertFalse(checkpoint.matches(io.BytesIO(tail)))
+        self.assertFalse(checkpoint.matches(io.BytesIO(self.sample_file()[:300])))
+
+    def test_matches_fails_notseekable(self):
+        """A stream that can't seek never matches"""
+        # arrange
+        checkpoint = olieigra.TailCheckpoint.build(io.BytesIO(self.sample_file()), 178, 409)
+        stream = MagicMock()
+        stream.seekable = MagicMock(return_value=False)
+
+        # act, assert
+        self.assertFalse(checkpoint.matches(stream))
+        stream.seek.assert_not_called()
+
+    def sample_file(self) -> bytes:
+        """Simple sample test case igra2 file"""
+        return (
+            b"#USM00072649 2023 11 18 12 1101    2 ncdc-nws           448497  -935647\n"
+            b"21     0  98022B  290    -9B  810    28   360     0 \n"
+            b"20     4  97717   316B   -1B  771    35   275    26 \n"
+            b"#USM00072649 2023 11 18 00 2303    3 ncdc-nws           448497  -935647\n"
+            b"21     0  98107B  290    65B  350   143   360     0 \n"
+            b"20     7  97609   332B   66B  339   147   208    45 \n"
+            b"20    33  95916   476B   60B  325   152   224    73 \n"
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()